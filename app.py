@@ -4,14 +4,29 @@ import json
 import time
 import logging
 import uuid
-from typing import Dict, Any
+from dataclasses import replace
+from typing import Dict, Any, Iterator, Optional, Tuple
 from dotenv import load_dotenv
 from flask import Flask, request, jsonify, render_template, Response
-from services.logging import research_logger
-from services.models import ModelFactory
-from services.research.chains import ResearchChainManager
-from services.search.search_manager import SearchManager
-from services.search.serp_provider import SerpSearchProvider
+from services.batch import BatchRunner, parse_jsonl
+from services.cache import create_cache
+from services.logging import research_logger, SQLiteSessionStore, TokenEventBuffer
+from services.metrics import RequestTrace, metrics
+from services.jobs import (
+    DeadlineExceededError,
+    JobManager,
+    PriorityScheduler,
+    QueueFullError,
+    SchedulingClass,
+    parse_class_options
+)
+from services.registry import ServiceRegistry
+from services.research.packing import parse_budgets
+from services.results import ResultStore, body_response, result_response
+from services.search import SearchResult
+from services.semantic import SemanticIndex, SemanticMatch
+from services.search.query_expansion import expand_query
+from services.throttling import SingleFlight
 
 # Configure logging
 logging.basicConfig(
@@ -54,6 +69,208 @@ if ANTHROPIC_API_KEY:
     AVAILABLE_MODELS['provider'].append('anthropic')
     AVAILABLE_MODELS['api_keys']['anthropic'] = ANTHROPIC_API_KEY
 
+# Search result cache (in-memory LRU in front of an on-disk SQLite tier)
+CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', '3600'))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '512'))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv('SEARCH_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+search_cache = create_cache(
+    'tiered',
+    os.path.join(CACHE_DIR, 'search.db'),
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=SEARCH_CACHE_MAX_BYTES,
+    default_ttl=SEARCH_CACHE_TTL
+)
+
+# LLM response cache, keyed on provider settings and the fully rendered prompt
+LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'tiered')
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '86400'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '256'))
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+llm_cache = create_cache(
+    LLM_CACHE_BACKEND,
+    os.path.join(CACHE_DIR, 'llm.db'),
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    default_ttl=LLM_CACHE_TTL
+)
+
+# Optional full-page content for sources, cached by URL and revalidated with ETag/Last-Modified
+FETCH_CONTENT = os.getenv('FETCH_CONTENT', 'false').lower() in ('1', 'true', 'yes')
+
+content_cache = create_cache(
+    'tiered',
+    os.path.join(CACHE_DIR, 'content.db'),
+    max_entries=int(os.getenv('CONTENT_CACHE_MAX_ENTRIES', '256')),
+    max_bytes=int(os.getenv('CONTENT_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    default_ttl=7 * 86400
+)
+
+# Index of past results by topic similarity: near-identical topics are answered from it,
+# similar ones reuse its sources instead of searching again
+SEMANTIC_INDEX = os.getenv('SEMANTIC_INDEX', 'false').lower() in ('1', 'true', 'yes')
+SEMANTIC_ANSWER_THRESHOLD = float(os.getenv('SEMANTIC_ANSWER_THRESHOLD', '0.9'))
+SEMANTIC_SEED_THRESHOLD = float(os.getenv('SEMANTIC_SEED_THRESHOLD', '0.7'))
+
+semantic_index = SemanticIndex(
+    os.path.join(CACHE_DIR, 'semantic.db'),
+    max_age=float(os.getenv('SEMANTIC_MAX_AGE', str(7 * 86400))),
+    max_entries=int(os.getenv('SEMANTIC_MAX_ENTRIES', '5000'))
+) if SEMANTIC_INDEX else None
+
+# Finished results, kept compressed so they can be fetched again by session id
+RESULT_STORE = os.getenv('RESULT_STORE', 'true').lower() in ('1', 'true', 'yes')
+
+result_store = ResultStore(
+    os.path.join(CACHE_DIR, 'results.db'),
+    codec=os.getenv('RESULT_STORE_CODEC', 'gzip').lower(),
+    max_age=float(os.getenv('RESULT_STORE_MAX_AGE', str(30 * 86400))),
+    max_entries=int(os.getenv('RESULT_STORE_MAX_ENTRIES', '10000'))
+) if RESULT_STORE else None
+
+# Registered search backend (see services.search.register_provider)
+SEARCH_PROVIDER = os.getenv('SEARCH_PROVIDER', 'serpapi')
+
+# Per-upstream rate limits in requests per second (0 or unset leaves the upstream unlimited)
+RATE_LIMITS = {}
+for upstream in [SEARCH_PROVIDER] + AVAILABLE_MODELS['provider']:
+    rate = float(os.getenv(f'{upstream.upper()}_RATE_LIMIT', '0'))
+    if rate > 0:
+        burst = float(os.getenv(f'{upstream.upper()}_RATE_BURST', str(max(1.0, rate))))
+        RATE_LIMITS[upstream] = (rate, burst)
+
+# Token budgets per research depth: prompt space for sources, and synthesis output
+INPUT_TOKEN_BUDGETS = parse_budgets(os.getenv('INPUT_TOKEN_BUDGETS', 'brief=1500,detailed=3000,comprehensive=6000'))
+OUTPUT_TOKEN_BUDGETS = parse_budgets(os.getenv('OUTPUT_TOKEN_BUDGETS', 'brief=500,detailed=1200,comprehensive=2500'))
+DEFAULT_OUTPUT_TOKENS = 1500
+MODEL_TEMPERATURE = 0.7
+
+# Pre-build model clients at startup; otherwise provider SDKs load on their first request
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', 'false').lower() in ('1', 'true', 'yes')
+
+# Shared model clients and search providers, built once per configuration
+registry = ServiceRegistry(
+    api_keys=AVAILABLE_MODELS['api_keys'],
+    serpapi_key=SERPAPI_API_KEY,
+    search_provider=SEARCH_PROVIDER,
+    search_cache=search_cache,
+    llm_cache=llm_cache,
+    pool_size=int(os.getenv('HTTP_POOL_SIZE', '20')),
+    analysis_options={
+        'analysis_mode': os.getenv('ANALYSIS_MODE', 'stuff'),
+        'map_concurrency': int(os.getenv('ANALYSIS_CONCURRENCY', '4')),
+        'map_timeout': float(os.getenv('ANALYSIS_TIMEOUT', '30')),
+        'input_budgets': INPUT_TOKEN_BUDGETS,
+        'quorum': float(os.getenv('PIPELINE_QUORUM', '0.75')),
+        'straggler_timeout': float(os.getenv('PIPELINE_STRAGGLER_TIMEOUT', '3'))
+    },
+    analysis_max_tokens=int(os.getenv('ANALYSIS_MAX_TOKENS', '1000')),
+    routing=os.getenv('MODEL_ROUTING', 'off'),
+    routing_timeout=float(os.getenv('MODEL_TIMEOUT', '60')),
+    routing_workers=int(os.getenv('MODEL_ROUTING_WORKERS', '32')),
+    rate_limits=RATE_LIMITS,
+    content_cache=content_cache,
+    content_options={
+        'max_workers': int(os.getenv('CONTENT_FETCH_CONCURRENCY', '8')),
+        'per_host': int(os.getenv('CONTENT_FETCH_PER_HOST', '2')),
+        'timeout': float(os.getenv('CONTENT_FETCH_TIMEOUT', '10')),
+        'deadline': float(os.getenv('CONTENT_FETCH_DEADLINE', '15')),
+        'max_bytes': int(os.getenv('CONTENT_MAX_BYTES', str(2 * 1024 * 1024))),
+        'max_chars': int(os.getenv('CONTENT_MAX_CHARS', '8000')),
+        'revalidate_after': float(os.getenv('CONTENT_REVALIDATE_AFTER', '3600')),
+        'allow_private': os.getenv('CONTENT_FETCH_ALLOW_PRIVATE', 'false').lower() in ('1', 'true', 'yes')
+    }
+)
+
+# Depth-aware scheduling: blocking requests, jobs and batch records share SCHEDULER_SLOTS
+# pipeline slots, with a weighted queue, a concurrency cap and a deadline per depth
+SCHEDULER_SLOTS = int(os.getenv('SCHEDULER_SLOTS', '8'))
+SCHEDULER_WEIGHTS = parse_class_options(os.getenv('SCHEDULER_WEIGHTS', 'brief=6,detailed=3,comprehensive=1'))
+SCHEDULER_MAX_CONCURRENCY = parse_class_options(os.getenv('SCHEDULER_MAX_CONCURRENCY', 'brief=8,detailed=6,comprehensive=4'))
+SCHEDULER_DEADLINES = parse_class_options(os.getenv('SCHEDULER_DEADLINES', 'brief=30,detailed=90,comprehensive=180'))
+SCHEDULER_MAX_QUEUE = parse_class_options(os.getenv('SCHEDULER_MAX_QUEUE', 'brief=64,detailed=32,comprehensive=16'))
+
+scheduler = PriorityScheduler(
+    {
+        depth: SchedulingClass(
+            weight=SCHEDULER_WEIGHTS.get(depth, 1.0),
+            max_concurrency=int(SCHEDULER_MAX_CONCURRENCY[depth]) if depth in SCHEDULER_MAX_CONCURRENCY else None,
+            deadline=SCHEDULER_DEADLINES.get(depth),
+            max_queue=int(SCHEDULER_MAX_QUEUE[depth]) if depth in SCHEDULER_MAX_QUEUE else None
+        )
+        for depth in ('brief', 'detailed', 'comprehensive')
+    },
+    max_concurrency=SCHEDULER_SLOTS
+) if SCHEDULER_SLOTS > 0 else None
+
+# Background research jobs
+job_manager = JobManager(
+    max_workers=int(os.getenv('JOB_WORKERS', '4')),
+    max_queue=int(os.getenv('JOB_QUEUE_SIZE', '32')),
+    scheduler=scheduler
+)
+
+# Fan-out search: detailed and comprehensive depths also search generated sub-queries
+SEARCH_FANOUT = os.getenv('SEARCH_FANOUT', 'true').lower() in ('1', 'true', 'yes')
+SEARCH_FANOUT_CONCURRENCY = int(os.getenv('SEARCH_FANOUT_CONCURRENCY', '4'))
+SEARCH_FANOUT_DEADLINE = float(os.getenv('SEARCH_FANOUT_DEADLINE', '10'))
+SEARCH_FANOUT_MAX_RESULTS = int(os.getenv('SEARCH_FANOUT_MAX_RESULTS', '8'))
+
+# Pipelined stages: analyze each source as its search returns and synthesize once a quorum is analyzed
+PIPELINE_STAGES = os.getenv('PIPELINE_STAGES', 'false').lower() in ('1', 'true', 'yes')
+
+# Identical (topic, depth, model) requests in flight at the same time share one pipeline run
+COALESCE_REQUESTS = os.getenv('COALESCE_REQUESTS', 'true').lower() in ('1', 'true', 'yes')
+research_flight = SingleFlight()
+
+# Export component statistics on /metrics alongside the per-stage histograms
+metrics.register_collector('research_jobs', job_manager.stats)
+if scheduler is not None:
+    metrics.register_collector('research_scheduler', scheduler.stats)
+metrics.register_collector('research_sessions', research_logger.stats)
+metrics.register_collector('research_coalescing', research_flight.stats)
+metrics.register_collector('research_rate_limit', lambda: registry.stats()['rate_limits'])
+metrics.register_collector('research_search_cache', search_cache.stats)
+metrics.register_collector('research_llm_cache', llm_cache.stats)
+metrics.register_collector('research_content_cache', content_cache.stats)
+if semantic_index is not None:
+    metrics.register_collector('research_semantic_index', semantic_index.stats)
+if result_store is not None:
+    metrics.register_collector('research_results', result_store.stats)
+
+# Batch research: records in flight at once overall and per provider
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+BATCH_PROVIDER_CONCURRENCY = int(os.getenv('BATCH_PROVIDER_CONCURRENCY', '2'))
+
+# Stream synthesis tokens to /stream/<session_id> as they are generated
+STREAM_SYNTHESIS = os.getenv('STREAM_SYNTHESIS', 'true').lower() in ('1', 'true', 'yes')
+
+# Research logging session retention
+research_logger.configure(
+    completed_ttl=float(os.getenv('SESSION_COMPLETED_TTL', '300')),
+    idle_timeout=float(os.getenv('SESSION_IDLE_TIMEOUT', '1800')),
+    max_events_per_session=int(os.getenv('SESSION_MAX_EVENTS', '500')),
+    max_sessions=int(os.getenv('SESSION_MAX_SESSIONS', '10000')),
+    reaper_interval=float(os.getenv('SESSION_REAPER_INTERVAL', '30'))
+)
+
+# 'memory' keeps sessions in this process; 'sqlite' shares them between worker processes
+# on one host, so /stream can be served by a different worker than the research request
+SESSION_STORE = os.getenv('SESSION_STORE', 'memory')
+if SESSION_STORE == 'sqlite':
+    research_logger.use_store(SQLiteSessionStore(
+        os.getenv('SESSION_DB', os.path.join(CACHE_DIR, 'sessions.db')),
+        poll_interval=float(os.getenv('SESSION_POLL_INTERVAL', '0.05'))
+    ))
+elif SESSION_STORE != 'memory':
+    raise ValueError(f"Invalid session store: {SESSION_STORE}. Choose from: memory, sqlite")
+
+# Server-Sent Events settings
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('SSE_HEARTBEAT_INTERVAL', '15'))
+SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))
+
 # Initialize Flask app
 app = Flask(__name__)
 
@@ -99,60 +316,244 @@ RESEARCH_PROMPTS = {
     )
 }
 
-@app.route('/research', methods=['POST'])
-def research():
-    """Handle research requests with comprehensive error handling."""
-    try:
-        # Validate and sanitize input
-        data = request.get_json()
-        topic = sanitize_input(data.get('topic', ''))
-        depth = data.get('depth', 'brief').lower()
+def parse_research_request(data: Dict[str, Any]) -> Tuple[str, str, str, Optional[str]]:
+    """Sanitize and validate a research request body.
 
-        # Validate inputs
-        if not topic:
-            return jsonify({
-                'error': 'Topic is required and must contain valid characters'
-            }), 400
+    Returns:
+        (topic, depth, model_provider, error) where error is None when the request is valid
+    """
+    data = data or {}
+    topic = sanitize_input(data.get('topic', ''))
+    depth = data.get('depth', 'brief').lower()
 
-        if depth not in RESEARCH_PROMPTS:
-            return jsonify({
-                'error': f"Invalid depth. Choose from: {', '.join(RESEARCH_PROMPTS.keys())}"
-            }), 400
+    # Validate inputs
+    if not topic:
+        return topic, depth, '', 'Topic is required and must contain valid characters'
 
-        # Log research attempt
-        logger.info(f"Research request: topic={topic}, depth={depth}")
+    if depth not in RESEARCH_PROMPTS:
+        return topic, depth, '', f"Invalid depth. Choose from: {', '.join(RESEARCH_PROMPTS.keys())}"
 
-        # Get selected model provider (default to first available)
-        model_provider = data.get('model', AVAILABLE_MODELS['provider'][0])
-        
-        if model_provider not in AVAILABLE_MODELS['provider']:
-            return jsonify({
-                'error': f"Invalid model provider. Choose from: {', '.join(AVAILABLE_MODELS['provider'])}"
-            }), 400
-            
-        # Initialize components
-        llm = ModelFactory.create_model(
-            provider=model_provider,
-            api_key=AVAILABLE_MODELS['api_keys'][model_provider],
-            temperature=0.7,
-            max_tokens=1500
+    # Get selected model provider (default to first available)
+    model_provider = data.get('model', AVAILABLE_MODELS['provider'][0])
+    
+    if model_provider not in AVAILABLE_MODELS['provider']:
+        return topic, depth, model_provider, (
+            f"Invalid model provider. Choose from: {', '.join(AVAILABLE_MODELS['provider'])}"
         )
-        research_manager = ResearchChainManager(llm)
-        
-        # Initialize search
-        search_provider = SerpSearchProvider(api_key=SERPAPI_API_KEY)
-        search_manager = SearchManager(search_provider=search_provider)
-        
-        # Create session ID for logging
-        session_id = str(uuid.uuid4())
-        research_logger.create_session(session_id)
-        
-        # Log start of search
-        research_logger.log_step(session_id, "search_started", {"topic": topic})
+
+    return topic, depth, model_provider, None
+
+def finish_token_stream(token_buffer: Optional[TokenEventBuffer], research_started_at: float) -> Optional[Dict[str, Any]]:
+    """Flush streamed synthesis text and return the research_completed event details."""
+    if token_buffer is None:
+        return None
+    token_buffer.flush()
+    if token_buffer.first_token_at is None:
+        return None
+    return {"time_to_first_token": token_buffer.first_token_at - research_started_at}
+
+def format_research_response(session_id: str, research_output: Dict[str, Any], search_results: list) -> Dict[str, Any]:
+    """Build the JSON response body for a finished research request."""
+    return {
+        'result': research_output['result'],
+        'duration': research_output['duration'],
+        'depth': research_output['depth'],
+        'session_id': session_id,
+        'sources': [
+            {
+                'title': s.title,
+                'url': s.url,
+                'domain': s.domain,
+                'snippet': s.snippet
+            } for s in (research_output.get('sources') or search_results)[:5]  # Top 5 sources
+        ]
+    }
+
+def output_tokens_for(depth: str) -> int:
+    return OUTPUT_TOKEN_BUDGETS.get(depth.lower(), DEFAULT_OUTPUT_TOKENS)
+
+def research_manager_for(model_provider: str, depth: str):
+    """Shared chain manager for a request, with the depth's output token budget."""
+    return registry.get_research_manager(
+        model_provider,
+        temperature=MODEL_TEMPERATURE,
+        max_tokens=output_tokens_for(depth)
+    )
+
+# Build every configured provider's clients in the background instead of on the first request
+if MODEL_WARMUP:
+    registry.warm_up(
+        (provider, MODEL_TEMPERATURE, output_tokens_for(depth))
+        for provider in AVAILABLE_MODELS['provider']
+        for depth in RESEARCH_PROMPTS
+    )
+
+def start_trace(session_id: str, model_provider: str, depth: str, nowait: bool = False) -> RequestTrace:
+    """Trace a request's stages, publishing each finished stage to the session stream.
+
+    Pass nowait=True when spans end on an event loop, so publishing does not wait on the session store.
+    """
+    log_step = research_logger.log_step_nowait if nowait else research_logger.log_step
+    return RequestTrace(
+        provider=model_provider,
+        depth=depth,
+        on_span=lambda span: log_step(session_id, "stage_completed", span)
+    )
+
+def search_queries(topic: str, depth: str) -> list:
+    """Queries to run for a request: the topic, plus sub-queries when fan-out is enabled."""
+    return expand_query(topic, depth) if SEARCH_FANOUT else [topic]
+
+def search_sources(search_manager, topic: str, depth: str) -> list:
+    """Search for a request's sources, fanning out over sub-queries for deeper research."""
+    queries = search_queries(topic, depth)
+    if len(queries) == 1:
+        return search_manager.search(topic, num_results=4)
+    return search_manager.search_many(
+        queries,
+        num_results=4,
+        max_results=SEARCH_FANOUT_MAX_RESULTS,
+        max_concurrency=SEARCH_FANOUT_CONCURRENCY,
+        deadline=SEARCH_FANOUT_DEADLINE
+    )
+
+def expected_sources(topic: str, depth: str, sources) -> int:
+    """Number of sources a pipelined request shares its input budget between."""
+    if isinstance(sources, list):
+        return len(sources)
+    queries = search_queries(topic, depth)
+    return 4 if len(queries) == 1 else min(4 * len(queries), SEARCH_FANOUT_MAX_RESULTS)
+
+def stream_sources(session_id: str, trace: RequestTrace, search_manager, queries: list) -> Iterator:
+    """Start a streamed search, returning a generator of sources in the order they arrive.
+
+    Logs search_started now and search_completed once the generator is exhausted.
+    """
+    research_logger.log_step(session_id, "search_started", {"topic": queries[0], "num_queries": len(queries)})
+
+    def generate():
+        num_results = 0
+        with trace.span("search", queries=len(queries), pipelined=True):
+            for result in search_manager.iter_search(
+                queries,
+                num_results=4,
+                max_results=SEARCH_FANOUT_MAX_RESULTS,
+                max_concurrency=SEARCH_FANOUT_CONCURRENCY,
+                deadline=SEARCH_FANOUT_DEADLINE
+            ):
+                num_results += 1
+                yield result
+        research_logger.log_step(session_id, "search_completed", {"num_results": num_results, "pipelined": True})
+
+    return generate()
+
+def content_preparer():
+    """Per-source page fetch for pipelined research, or None when content fetching is off."""
+    return registry.get_content_fetcher().fetch_result if FETCH_CONTENT else None
+
+def fetch_content(session_id: str, trace: RequestTrace, search_results: list) -> list:
+    """Attach extracted page text to the search results when content fetching is enabled."""
+    if not FETCH_CONTENT or not search_results:
+        return search_results
+    with trace.span("fetch", sources=len(search_results)):
+        search_results = registry.get_content_fetcher().fetch_all(search_results)
+    research_logger.log_step(session_id, "content_fetched", {
+        "num_fetched": sum(1 for result in search_results if result.content),
+        "num_sources": len(search_results)
+    })
+    return search_results
+
+def semantic_lookup(session_id: str, trace: RequestTrace, topic: str, depth: str,
+                    model_provider: str) -> Optional[SemanticMatch]:
+    """Find a fresh past result for a similar topic, logging semantic_match when there is one."""
+    if semantic_index is None:
+        return None
+    with trace.span("semantic_lookup") as span:
+        match = semantic_index.search(topic, depth, model_provider, SEMANTIC_SEED_THRESHOLD)
+        span.attributes['hit'] = match is not None
+    if match is not None:
+        research_logger.log_step(session_id, "semantic_match", {
+            "topic": match.topic,
+            "similarity": round(match.similarity, 3),
+            "mode": "answer" if match.similarity >= SEMANTIC_ANSWER_THRESHOLD else "seed"
+        })
+    return match
+
+def semantic_answer(session_id: str, trace: RequestTrace, match: SemanticMatch) -> Dict[str, Any]:
+    """Answer from a past result without searching or calling the model."""
+    research_logger.log_step(session_id, "research_completed", {"semantic": True})
+    response = {
+        **match.payload['response'],
+        'session_id': session_id,
+        'semantic_match': {
+            'topic': match.topic,
+            'similarity': round(match.similarity, 3),
+            'age': round(match.age)
+        }
+    }
+    response['timings'] = trace.timings()
+    trace.finish('ok')
+    return response
+
+def seeded_sources(session_id: str, match: SemanticMatch) -> list:
+    """Reuse a similar past result's sources in place of a new search."""
+    search_results = [SearchResult.from_dict(source) for source in match.payload['sources']]
+    research_logger.log_step(session_id, "search_completed", {"num_results": len(search_results), "seeded": True})
+    return search_results
+
+def index_result(topic: str, depth: str, model_provider: str, response: Dict[str, Any], search_results: list) -> None:
+    """Add a finished result to the semantic index. Failures are logged, not raised."""
+    if semantic_index is None:
+        return
+    try:
+        semantic_index.add(topic, depth, model_provider, {
+            'response': {key: value for key, value in response.items() if key not in ('session_id', 'timings')},
+            'sources': [replace(result, content=None).to_dict() for result in search_results]
+        })
+    except Exception as e:
+        logger.warning(f"Could not index result for topic {topic}: {str(e)}")
+
+def store_result(topic: str, depth: str, model_provider: str, response: Dict[str, Any]) -> None:
+    """Persist a finished response under its session id. Failures are logged, not raised."""
+    if result_store is None:
+        return
+    try:
+        result_store.put(response['session_id'], topic, depth, model_provider, response)
+    except Exception as e:
+        logger.warning(f"Could not store result for session {response.get('session_id')}: {str(e)}")
+
+def run_research(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Run the search and research pipeline for a validated request, logging progress to the session."""
+    trace = start_trace(session_id, model_provider, depth)
+    try:
+        # A near-identical past topic answers the request outright
+        match = semantic_lookup(session_id, trace, topic, depth, model_provider)
+        if match is not None and match.similarity >= SEMANTIC_ANSWER_THRESHOLD:
+            return semantic_answer(session_id, trace, match)
+
+        # Get shared components
+        research_manager = research_manager_for(model_provider, depth)
+        search_manager = registry.get_search_manager()
         
-        # Get search results
-        search_results = search_manager.search(topic, num_results=4)
-        research_logger.log_step(session_id, "search_completed", {"num_results": len(search_results)})
+        if match is not None:
+            search_results = seeded_sources(session_id, match)
+        elif PIPELINE_STAGES:
+            # A generator: the search runs while the first sources are analyzed
+            search_results = stream_sources(session_id, trace, search_manager, search_queries(topic, depth))
+        else:
+            # Log start of search
+            num_queries = len(search_queries(topic, depth))
+            research_logger.log_step(session_id, "search_started", {
+                "topic": topic,
+                "num_queries": num_queries
+            })
+            
+            # Get search results
+            with trace.span("search", queries=num_queries):
+                search_results = search_sources(search_manager, topic, depth)
+            research_logger.log_step(session_id, "search_completed", {"num_results": len(search_results)})
+        if not PIPELINE_STAGES:
+            search_results = fetch_content(session_id, trace, search_results)
         
         # Get research prompt
         research_prompt = RESEARCH_PROMPTS[depth](topic)
@@ -160,33 +561,229 @@ def research():
         
         # Process research
         research_logger.log_step(session_id, "research_started", {"model": model_provider})
-        research_output = research_manager.process_research(
-            query=topic,
-            prompt=research_prompt,
-            sources=search_results,
-            depth=depth
+        research_started_at = time.time()
+        token_buffer = TokenEventBuffer(research_logger, session_id) if STREAM_SYNTHESIS else None
+        if PIPELINE_STAGES:
+            research_output = research_manager.process_research_stream(
+                query=topic,
+                prompt=research_prompt,
+                sources=search_results,
+                depth=depth,
+                on_token=token_buffer,
+                trace=trace,
+                prepare=content_preparer(),
+                expected_sources=expected_sources(topic, depth, search_results)
+            )
+            search_results = research_output['sources']
+        else:
+            research_output = research_manager.process_research(
+                query=topic,
+                prompt=research_prompt,
+                sources=search_results,
+                depth=depth,
+                on_token=token_buffer,
+                trace=trace
+            )
+        research_logger.log_step(
+            session_id, "research_completed", finish_token_stream(token_buffer, research_started_at)
         )
-        research_logger.log_step(session_id, "research_completed")
-        
-        # Format response
-        response = {
-            'result': research_output['result'],
-            'duration': research_output['duration'],
-            'depth': research_output['depth'],
-            'session_id': session_id,
-            'sources': [
-                {
-                    'title': s.title,
-                    'url': s.url,
-                    'snippet': s.snippet
-                } for s in search_results[:5]  # Top 5 sources
-            ]
-        }
         
         # Log successful research
         logger.info(f"Research completed successfully for topic: {topic}")
         
-        return jsonify(response)
+        with trace.span("serialization"):
+            response = format_research_response(session_id, research_output, search_results)
+        response['timings'] = trace.timings()
+        trace.finish('ok')
+        index_result(topic, depth, model_provider, response, search_results)
+        return response
+    
+    except Exception as e:
+        trace.finish('error')
+        research_logger.log_step(session_id, "research_failed", {"error": str(e)})
+        raise
+
+def coalesce_key(topic: str, depth: str, model_provider: str) -> Tuple[str, str, str]:
+    """Identity of a research request for coalescing identical in-flight requests."""
+    return (' '.join(topic.lower().split()), depth, model_provider)
+
+def coalesced_response(session_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Hand a follower the leader's result under its own session id."""
+    research_logger.log_step(session_id, "research_completed", {"coalesced": True})
+    return {**response, 'session_id': session_id}
+
+def run_research_scheduled(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Run research once the scheduler gives the request's depth a slot.
+
+    Raises:
+        QueueFullError: If the depth's scheduler queue is full
+        DeadlineExceededError: If no slot was free before the depth's deadline
+    """
+    if scheduler is None:
+        return run_research(session_id, topic, depth, model_provider)
+    try:
+        with scheduler.slot(depth):
+            return run_research(session_id, topic, depth, model_provider)
+    except (QueueFullError, DeadlineExceededError) as e:
+        research_logger.log_step(session_id, "research_failed", {"error": str(e)})
+        raise
+
+def run_research_coalesced(session_id: str, topic: str, depth: str, model_provider: str,
+                           scheduled: bool = False) -> Dict[str, Any]:
+    """Run research, joining an identical request that is already in flight.
+
+    Followers do not search or call the model; their session reports
+    request_coalesced and then the shared result. With scheduled=True the
+    leader waits for a scheduler slot first (jobs are admitted by the job
+    manager instead). Every session's response is stored for /results.
+    """
+    run = run_research_scheduled if scheduled else run_research
+    if not COALESCE_REQUESTS:
+        response = run(session_id, topic, depth, model_provider)
+        store_result(topic, depth, model_provider, response)
+        return response
+
+    joined = []
+    def on_join():
+        joined.append(True)
+        research_logger.log_step(session_id, "request_coalesced", {"topic": topic, "depth": depth})
+
+    try:
+        response, shared = research_flight.do(
+            coalesce_key(topic, depth, model_provider),
+            lambda: run(session_id, topic, depth, model_provider),
+            on_join=on_join
+        )
+    except Exception as e:
+        if joined:
+            research_logger.log_step(session_id, "research_failed", {"error": str(e)})
+        raise
+    if shared:
+        response = coalesced_response(session_id, response)
+    store_result(topic, depth, model_provider, response)
+    return response
+
+def run_research_job(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Run research on a job worker and publish the outcome to the session stream."""
+    try:
+        response = run_research_coalesced(session_id, topic, depth, model_provider)
+        job = job_manager.get(session_id)
+        research_logger.log_step(session_id, "job_completed", {
+            "job_id": session_id,
+            "queue_wait": job.queue_wait if job else None,
+            "result": response
+        })
+        return response
+    finally:
+        research_logger.close_session(session_id)
+
+def on_job_shed(job) -> None:
+    """Report a job the scheduler shed before it started and end its stream."""
+    research_logger.log_step(job.job_id, "research_failed", {"error": job.error, "shed": True})
+    research_logger.close_session(job.job_id)
+
+def run_batch_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one batch record through the research pipeline in its own logging session."""
+    topic, depth, model_provider, error = parse_research_request(record)
+    if error:
+        raise ValueError(error)
+    session_id = str(uuid.uuid4())
+    research_logger.create_session(session_id)
+    try:
+        return run_research_coalesced(session_id, topic, depth, model_provider, scheduled=True)
+    finally:
+        research_logger.close_session(session_id)
+
+def create_batch_runner(max_concurrency: Optional[int] = None,
+                        per_provider_concurrency: Optional[int] = None) -> BatchRunner:
+    """Batch runner over the shared registry, so every record reuses the search and LLM caches."""
+    return BatchRunner(
+        run_batch_record,
+        provider_of=lambda record: record.get('model') or AVAILABLE_MODELS['provider'][0],
+        validate=lambda record: parse_research_request(record)[3],
+        max_concurrency=max_concurrency or BATCH_CONCURRENCY,
+        per_provider_concurrency=per_provider_concurrency or BATCH_PROVIDER_CONCURRENCY
+    )
+
+def stored_result_response(session_id: str, accept_encoding: Optional[str],
+                           if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """Status, body and headers for GET /results/<session_id>, shared with the ASGI app."""
+    stored = result_store.get(session_id) if result_store is not None else None
+    if stored is None:
+        return 404, json.dumps({'error': 'Result not found'}).encode('utf-8'), {}
+    return result_response(stored, accept_encoding, if_none_match)
+
+def results_page_response(params, accept_encoding: Optional[str],
+                          if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """Status, body and headers for GET /results, shared with the ASGI app.
+
+    params holds the query string: topic (exact match), q (topic contains),
+    depth, model, limit (default 20) and cursor (next_cursor of the previous page).
+    """
+    if result_store is None:
+        return 404, json.dumps({'error': 'Result store is disabled'}).encode('utf-8'), {}
+    try:
+        limit = int(params.get('limit', 20))
+    except ValueError:
+        return 400, json.dumps({'error': f"Invalid limit: {params.get('limit')}"}).encode('utf-8'), {}
+    try:
+        results, next_cursor = result_store.list(
+            topic=params.get('topic'),
+            query=params.get('q'),
+            depth=params.get('depth'),
+            provider=params.get('model'),
+            limit=limit,
+            cursor=params.get('cursor')
+        )
+    except ValueError as e:
+        return 400, json.dumps({'error': str(e)}).encode('utf-8'), {}
+    body = json.dumps({'results': results, 'next_cursor': next_cursor}).encode('utf-8')
+    return body_response(body, accept_encoding, if_none_match)
+
+@app.route('/research', methods=['POST'])
+def research():
+    """Handle research requests with comprehensive error handling.
+
+    Requests with "async": true are queued as jobs and return a job id
+    immediately; poll /jobs/<job_id> or follow /stream/<job_id> for the result.
+    """
+    try:
+        # Validate and sanitize input
+        data = request.get_json() or {}
+        topic, depth, model_provider, error = parse_research_request(data)
+        if error:
+            return jsonify({'error': error}), 400
+
+        # Log research attempt
+        logger.info(f"Research request: topic={topic}, depth={depth}")
+        
+        # Create session ID for logging
+        session_id = str(uuid.uuid4())
+        research_logger.create_session(session_id)
+
+        if data.get('async'):
+            research_logger.log_step(session_id, "job_queued", {"job_id": session_id})
+            try:
+                job_manager.submit(session_id, run_research_job, session_id, topic, depth, model_provider,
+                                   job_class=depth, on_shed=on_job_shed)
+            except QueueFullError as e:
+                research_logger.clear_session(session_id)
+                return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+            return jsonify({
+                'job_id': session_id,
+                'session_id': session_id,
+                'status_url': f"/jobs/{session_id}",
+                'stream_url': f"/stream/{session_id}"
+            }), 202
+        
+        try:
+            return jsonify(run_research_coalesced(session_id, topic, depth, model_provider, scheduled=True))
+        except QueueFullError as e:
+            return jsonify({'error': str(e)}), 429, {'Retry-After': '5'}
+        except DeadlineExceededError as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+        finally:
+            research_logger.close_session(session_id)
     
     except Exception as e:
         logger.error(f"Research error: {e}", exc_info=True)
@@ -195,22 +792,112 @@ def research():
             'details': str(e)
         }), 500
 
+@app.route('/batch', methods=['POST'])
+def batch():
+    """Run research for a JSONL body of {topic, depth, model} records.
+
+    Results stream back as JSONL in completion order, one line per record with
+    its id and status. To resume an interrupted batch, pass the ids already
+    completed as a comma-separated `skip` query parameter.
+    """
+    lines = request.get_data(as_text=True).splitlines()
+    skip = {rid for rid in request.args.get('skip', '').split(',') if rid}
+    runner = create_batch_runner()
+
+    def generate():
+        for output in runner.run(parse_jsonl(lines), skip=skip):
+            yield json.dumps(output) + "\n"
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status, timings and (once finished) the result of a research job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/results')
+def list_results():
+    """List stored research results, newest first, with filters and cursor pagination."""
+    status, body, headers = results_page_response(
+        request.args, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match')
+    )
+    return Response(body, status=status, headers=headers, mimetype='application/json')
+
+@app.route('/results/<session_id>')
+def get_result(session_id):
+    """Return a stored research result, compressed and tagged for conditional requests."""
+    status, body, headers = stored_result_response(
+        session_id, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match')
+    )
+    return Response(body, status=status, headers=headers, mimetype='application/json')
+
+def service_stats(flight, jobs) -> Dict[str, Any]:
+    """/stats body for an entry point's coalescing and job manager; reads the SQLite stores."""
+    stats = registry.stats()
+    stats['coalescing'] = flight.stats()
+    stats['jobs'] = jobs.stats()
+    if scheduler is not None:
+        stats['scheduler'] = scheduler.stats()
+    stats['sessions'] = research_logger.stats()
+    if semantic_index is not None:
+        stats['semantic_index'] = semantic_index.stats()
+    if result_store is not None:
+        stats['results'] = result_store.stats()
+    return stats
+
+@app.route('/stats')
+def stats():
+    """Report shared client, connection pool, cache, rate limit and coalescing statistics."""
+    return jsonify(service_stats(research_flight, job_manager))
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Expose per-stage latency histograms and service statistics in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/stream/<session_id>')
 def stream(session_id):
-    """Stream research progress using Server-Sent Events."""
+    """Stream research progress using Server-Sent Events.
+
+    The generator sleeps until new events arrive, sends a heartbeat comment
+    while idle, and ends once the session is finished. Reconnecting clients
+    resume after the Last-Event-ID they send.
+    """
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_event_id = 0
+
+    logs, finished = research_logger.wait_for_logs(session_id, after_id=last_event_id, timeout=0)
+    if finished and not logs:
+        # 204 tells EventSource clients not to reconnect
+        return Response(status=204)
+
     def generate():
+        cursor = last_event_id
+        yield f"retry: {SSE_RETRY_MS}\n\n"
         while True:
-            # Get any new logs
-            logs = research_logger.get_logs(session_id)
+            logs, finished = research_logger.wait_for_logs(
+                session_id, after_id=cursor, timeout=SSE_HEARTBEAT_INTERVAL
+            )
             
             # Send each log as an event
             for log in logs:
-                yield f"data: {json.dumps(log)}\n\n"
+                cursor = log['id']
+                yield f"id: {log['id']}\ndata: {json.dumps(log)}\n\n"
             
-            # Small delay to prevent excessive CPU usage
-            time.sleep(0.1)
+            if finished:
+                return
+            if not logs:
+                yield ": heartbeat\n\n"
     
-    return Response(generate(), mimetype='text/event-stream')
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, port=5004)
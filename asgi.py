@@ -0,0 +1,402 @@
+"""Async entry point serving the research API from a single event loop.
+
+Search and LLM calls are awaited instead of blocking a thread, so one process
+can hold hundreds of in-flight research requests. Configuration, validation
+and the shared service registry come from app.py, so both entry points behave
+the same.
+
+    uvicorn asgi:app --port 5004
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+from app import (
+    AVAILABLE_MODELS,
+    COALESCE_REQUESTS,
+    RESEARCH_PROMPTS,
+    SEARCH_FANOUT_CONCURRENCY,
+    SEARCH_FANOUT_DEADLINE,
+    SEARCH_FANOUT_MAX_RESULTS,
+    PIPELINE_STAGES,
+    SEMANTIC_ANSWER_THRESHOLD,
+    SSE_HEARTBEAT_INTERVAL,
+    SSE_RETRY_MS,
+    STREAM_SYNTHESIS,
+    coalesce_key,
+    content_preparer,
+    create_batch_runner,
+    expected_sources,
+    fetch_content,
+    finish_token_stream,
+    format_research_response,
+    index_result,
+    job_manager as sync_job_manager,
+    parse_research_request,
+    registry,
+    research_manager_for,
+    result_store,
+    results_page_response,
+    scheduler,
+    search_queries,
+    service_stats,
+    seeded_sources,
+    semantic_answer,
+    semantic_index,
+    semantic_lookup,
+    start_trace,
+    store_result,
+    stored_result_response
+)
+from services.batch import parse_jsonl
+from services.jobs import AsyncJobManager, DeadlineExceededError, QueueFullError
+from services.logging import research_logger, TokenEventBuffer
+from services.metrics import metrics
+from services.throttling import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+templates = Jinja2Templates(directory='templates')
+
+# Jobs run as tasks on the event loop; the limits and scheduler are the threaded app's,
+# so jobs, blocking requests and batch records share the scheduler's slots
+job_manager = AsyncJobManager(
+    max_workers=sync_job_manager.max_workers,
+    max_queue=sync_job_manager.max_queue,
+    scheduler=scheduler
+)
+
+# Coalescing is per event loop; requests served by the threaded app are not joined
+research_flight = AsyncSingleFlight()
+
+metrics.register_collector('research_async_jobs', job_manager.stats)
+metrics.register_collector('research_async_coalescing', research_flight.stats)
+
+def on_job_shed(job) -> None:
+    """Event-loop variant of app.on_job_shed(); the scheduler may call it on the event loop."""
+    research_logger.log_step_nowait(job.job_id, "research_failed", {"error": job.error, "shed": True})
+    research_logger.close_session_nowait(job.job_id)
+
+async def acoalesced_response(session_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of app.coalesced_response()."""
+    await research_logger.alog_step(session_id, "research_completed", {"coalesced": True})
+    return {**response, 'session_id': session_id}
+
+async def asearch_sources(search_manager, topic: str, depth: str) -> list:
+    """Async variant of app.search_sources()."""
+    queries = search_queries(topic, depth)
+    if len(queries) == 1:
+        return await search_manager.asearch(topic, num_results=4)
+    return await search_manager.asearch_many(
+        queries,
+        num_results=4,
+        max_results=SEARCH_FANOUT_MAX_RESULTS,
+        max_concurrency=SEARCH_FANOUT_CONCURRENCY,
+        deadline=SEARCH_FANOUT_DEADLINE
+    )
+
+def astream_sources(session_id: str, trace, search_manager, queries: list) -> AsyncIterator:
+    """Async variant of app.stream_sources()."""
+    async def generate():
+        await research_logger.alog_step(session_id, "search_started", {
+            "topic": queries[0],
+            "num_queries": len(queries)
+        })
+        num_results = 0
+        with trace.span("search", queries=len(queries), pipelined=True):
+            async for result in search_manager.aiter_search(
+                queries,
+                num_results=4,
+                max_results=SEARCH_FANOUT_MAX_RESULTS,
+                max_concurrency=SEARCH_FANOUT_CONCURRENCY,
+                deadline=SEARCH_FANOUT_DEADLINE
+            ):
+                num_results += 1
+                yield result
+        await research_logger.alog_step(
+            session_id, "search_completed", {"num_results": num_results, "pipelined": True}
+        )
+
+    return generate()
+
+async def arun_research(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Async variant of app.run_research()."""
+    trace = start_trace(session_id, model_provider, depth, nowait=True)
+    try:
+        # The lookup logs to the session store, and building a manager may construct clients,
+        # so neither runs on the event loop
+        match = await asyncio.to_thread(semantic_lookup, session_id, trace, topic, depth, model_provider)
+        if match is not None and match.similarity >= SEMANTIC_ANSWER_THRESHOLD:
+            return await asyncio.to_thread(semantic_answer, session_id, trace, match)
+
+        # Get shared components
+        research_manager = await asyncio.to_thread(research_manager_for, model_provider, depth)
+        search_manager = registry.get_search_manager()
+        
+        if match is not None:
+            search_results = await asyncio.to_thread(seeded_sources, session_id, match)
+        elif PIPELINE_STAGES:
+            search_results = astream_sources(session_id, trace, search_manager, search_queries(topic, depth))
+        else:
+            num_queries = len(search_queries(topic, depth))
+            await research_logger.alog_step(session_id, "search_started", {
+                "topic": topic,
+                "num_queries": num_queries
+            })
+            with trace.span("search", queries=num_queries):
+                search_results = await asearch_sources(search_manager, topic, depth)
+            await research_logger.alog_step(session_id, "search_completed", {"num_results": len(search_results)})
+        if not PIPELINE_STAGES:
+            # Page downloads use the pooled requests session, so run them off the event loop
+            search_results = await asyncio.to_thread(fetch_content, session_id, trace, search_results)
+        
+        research_prompt = RESEARCH_PROMPTS[depth](topic)
+        await research_logger.alog_step(session_id, "prompt_generated")
+        
+        await research_logger.alog_step(session_id, "research_started", {"model": model_provider})
+        research_started_at = time.time()
+        token_buffer = TokenEventBuffer(research_logger, session_id, nowait=True) if STREAM_SYNTHESIS else None
+        if PIPELINE_STAGES:
+            research_output = await research_manager.aprocess_research_stream(
+                query=topic,
+                prompt=research_prompt,
+                sources=search_results,
+                depth=depth,
+                on_token=token_buffer,
+                trace=trace,
+                prepare=content_preparer(),
+                expected_sources=expected_sources(topic, depth, search_results)
+            )
+            search_results = research_output['sources']
+        else:
+            research_output = await research_manager.aprocess_research(
+                query=topic,
+                prompt=research_prompt,
+                sources=search_results,
+                depth=depth,
+                on_token=token_buffer,
+                trace=trace
+            )
+        await research_logger.alog_step(
+            session_id, "research_completed", finish_token_stream(token_buffer, research_started_at)
+        )
+        
+        logger.info(f"Research completed successfully for topic: {topic}")
+        with trace.span("serialization"):
+            response = format_research_response(session_id, research_output, search_results)
+        response['timings'] = trace.timings()
+        trace.finish('ok')
+        # Indexing writes to SQLite and may compact, so keep it off the event loop
+        await asyncio.to_thread(index_result, topic, depth, model_provider, response, search_results)
+        return response
+    
+    except Exception as e:
+        trace.finish('error')
+        await research_logger.alog_step(session_id, "research_failed", {"error": str(e)})
+        raise
+
+async def arun_research_scheduled(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Async variant of app.run_research_scheduled()."""
+    if scheduler is None:
+        return await arun_research(session_id, topic, depth, model_provider)
+    try:
+        async with scheduler.aslot(depth):
+            return await arun_research(session_id, topic, depth, model_provider)
+    except (QueueFullError, DeadlineExceededError) as e:
+        await research_logger.alog_step(session_id, "research_failed", {"error": str(e)})
+        raise
+
+async def arun_research_coalesced(session_id: str, topic: str, depth: str, model_provider: str,
+                                  scheduled: bool = False) -> Dict[str, Any]:
+    """Async variant of app.run_research_coalesced()."""
+    run = arun_research_scheduled if scheduled else arun_research
+    if not COALESCE_REQUESTS:
+        response = await run(session_id, topic, depth, model_provider)
+        await asyncio.to_thread(store_result, topic, depth, model_provider, response)
+        return response
+
+    joined = []
+    def on_join():
+        joined.append(True)
+        research_logger.log_step_nowait(session_id, "request_coalesced", {"topic": topic, "depth": depth})
+
+    try:
+        response, shared = await research_flight.do(
+            coalesce_key(topic, depth, model_provider),
+            lambda: run(session_id, topic, depth, model_provider),
+            on_join=on_join
+        )
+    except Exception as e:
+        if joined:
+            await research_logger.alog_step(session_id, "research_failed", {"error": str(e)})
+        raise
+    if shared:
+        response = await acoalesced_response(session_id, response)
+    await asyncio.to_thread(store_result, topic, depth, model_provider, response)
+    return response
+
+async def arun_research_job(session_id: str, topic: str, depth: str, model_provider: str) -> Dict[str, Any]:
+    """Run research as an event-loop job and publish the outcome to the session stream."""
+    try:
+        response = await arun_research_coalesced(session_id, topic, depth, model_provider)
+        job = job_manager.get(session_id)
+        await research_logger.alog_step(session_id, "job_completed", {
+            "job_id": session_id,
+            "queue_wait": job.queue_wait if job else None,
+            "result": response
+        })
+        return response
+    finally:
+        await research_logger.aclose_session(session_id)
+
+async def index(request: Request):
+    """Serve the main dashboard page."""
+    return templates.TemplateResponse(
+        'index.html', {'request': request, 'available_models': AVAILABLE_MODELS['provider']}
+    )
+
+async def research(request: Request):
+    """Handle research requests; see app.research() for the request format."""
+    try:
+        data = await request.json()
+        topic, depth, model_provider, error = parse_research_request(data)
+        if error:
+            return JSONResponse({'error': error}, status_code=400)
+
+        logger.info(f"Research request: topic={topic}, depth={depth}")
+        
+        session_id = str(uuid.uuid4())
+        await research_logger.acreate_session(session_id)
+
+        if data.get('async'):
+            await research_logger.alog_step(session_id, "job_queued", {"job_id": session_id})
+            try:
+                job_manager.submit(session_id, arun_research_job, session_id, topic, depth, model_provider,
+                                   job_class=depth, on_shed=on_job_shed)
+            except QueueFullError as e:
+                await research_logger.aclear_session(session_id)
+                return JSONResponse({'error': str(e)}, status_code=429, headers={'Retry-After': '5'})
+            return JSONResponse({
+                'job_id': session_id,
+                'session_id': session_id,
+                'status_url': f"/jobs/{session_id}",
+                'stream_url': f"/stream/{session_id}"
+            }, status_code=202)
+
+        try:
+            return JSONResponse(await arun_research_coalesced(session_id, topic, depth, model_provider, scheduled=True))
+        except QueueFullError as e:
+            return JSONResponse({'error': str(e)}, status_code=429, headers={'Retry-After': '5'})
+        except DeadlineExceededError as e:
+            return JSONResponse({'error': str(e)}, status_code=503, headers={'Retry-After': '5'})
+        finally:
+            await research_logger.aclose_session(session_id)
+
+    except Exception as e:
+        logger.error(f"Research error: {e}", exc_info=True)
+        return JSONResponse({
+            'error': 'An unexpected error occurred during research. Please try again.',
+            'details': str(e)
+        }, status_code=500)
+
+async def batch(request: Request):
+    """Run a JSONL batch of research records; see app.batch().
+
+    Records run on the threaded pipeline; Starlette iterates the result
+    stream in its thread pool so the event loop is not blocked.
+    """
+    lines = (await request.body()).decode('utf-8').splitlines()
+    skip = {rid for rid in request.query_params.get('skip', '').split(',') if rid}
+    runner = create_batch_runner()
+
+    def generate():
+        for output in runner.run(parse_jsonl(lines), skip=skip):
+            yield json.dumps(output) + "\n"
+
+    return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+async def job_status(request: Request):
+    """Report the status, timings and (once finished) the result of a research job."""
+    job = job_manager.get(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+    return JSONResponse(job.to_dict())
+
+async def list_results(request: Request):
+    """List stored research results; see app.list_results()."""
+    status, body, headers = await asyncio.to_thread(
+        results_page_response, request.query_params,
+        request.headers.get('accept-encoding'), request.headers.get('if-none-match')
+    )
+    return Response(body, status_code=status, headers=headers, media_type='application/json')
+
+async def get_result(request: Request):
+    """Return a stored research result; see app.get_result()."""
+    status, body, headers = await asyncio.to_thread(
+        stored_result_response, request.path_params['session_id'],
+        request.headers.get('accept-encoding'), request.headers.get('if-none-match')
+    )
+    return Response(body, status_code=status, headers=headers, media_type='application/json')
+
+async def stats(request: Request):
+    """Report shared client, connection pool, cache, rate limit, coalescing, job and session statistics."""
+    # Cache, session and result store statistics query SQLite
+    return JSONResponse(await asyncio.to_thread(service_stats, research_flight, job_manager))
+
+async def prometheus_metrics(request: Request):
+    """Expose per-stage latency histograms and service statistics; see app.prometheus_metrics()."""
+    # Collectors read the same stores as /stats
+    body = await asyncio.to_thread(metrics.render)
+    return Response(body, media_type='text/plain; version=0.0.4')
+
+async def stream(request: Request):
+    """Stream research progress using Server-Sent Events; see app.stream()."""
+    session_id = request.path_params['session_id']
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_event_id = 0
+
+    logs, finished = await research_logger.await_logs(session_id, after_id=last_event_id, timeout=0)
+    if finished and not logs:
+        # 204 tells EventSource clients not to reconnect
+        return Response(status_code=204)
+
+    async def generate():
+        cursor = last_event_id
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        while True:
+            logs, finished = await research_logger.await_logs(
+                session_id, after_id=cursor, timeout=SSE_HEARTBEAT_INTERVAL
+            )
+            for log in logs:
+                cursor = log['id']
+                yield f"id: {log['id']}\ndata: {json.dumps(log)}\n\n"
+            if finished:
+                return
+            if not logs:
+                yield ": heartbeat\n\n"
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+app = Starlette(routes=[
+    Route('/', index),
+    Route('/research', research, methods=['POST']),
+    Route('/batch', batch, methods=['POST']),
+    Route('/jobs/{job_id}', job_status),
+    Route('/results', list_results),
+    Route('/results/{session_id}', get_result),
+    Route('/stats', stats),
+    Route('/metrics', prometheus_metrics),
+    Route('/stream/{session_id}', stream)
+])
@@ -0,0 +1,59 @@
+"""Run research for a JSONL file of topics without going through the web server.
+
+Each input line is {"topic": ..., "depth": ..., "model": ...} with an optional
+"id". Results are appended to the output file as JSONL as each record
+completes. Records already completed in the output file are skipped, so an
+interrupted run can simply be started again.
+
+    python batch.py topics.jsonl results.jsonl --concurrency 8 --per-provider 3
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="JSONL file of research records ('-' for stdin)")
+    parser.add_argument('output', help="JSONL file to append results to ('-' for stdout, not resumable)")
+    parser.add_argument('--concurrency', type=int, help="records in flight at once (default: BATCH_CONCURRENCY)")
+    parser.add_argument('--per-provider', type=int,
+                        help="records in flight per provider (default: BATCH_PROVIDER_CONCURRENCY)")
+    args = parser.parse_args()
+
+    # Importing the app loads configuration and the shared caches
+    from app import create_batch_runner
+    from services.batch import completed_record_ids, parse_jsonl
+
+    skip = set()
+    if args.output != '-' and os.path.exists(args.output):
+        with open(args.output) as f:
+            skip = completed_record_ids(f)
+        if skip:
+            print(f"Resuming: {len(skip)} records already completed in {args.output}", file=sys.stderr)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'a')
+    runner = create_batch_runner(args.concurrency, args.per_provider)
+    statuses = Counter()
+    try:
+        for result in runner.run(parse_jsonl(source), skip=skip):
+            output.write(json.dumps(result) + "\n")
+            # Flush per record so an interrupted run keeps everything finished so far
+            output.flush()
+            statuses[result['status']] += 1
+            print(f"[{result['status']}] {result.get('topic') or result['id']}", file=sys.stderr)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(", ".join(f"{count} {status}" for status, count in sorted(statuses.items())) or "Nothing to do",
+          file=sys.stderr)
+    if statuses['failed'] or statuses['invalid']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
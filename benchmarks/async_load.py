@@ -0,0 +1,92 @@
+"""Compare concurrent-request throughput of the sync and async pipelines
+against stubbed search and LLM providers.
+
+The sync mode runs SearchManager.search + ResearchChainManager.process_research
+on a fixed pool of threads, as a threaded WSGI server would. The async mode
+runs SearchManager.asearch + aprocess_research for every request concurrently
+on one event loop.
+
+    python -m benchmarks.async_load --requests 200 --threads 16
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.fakes import FakeLLM, FakeSearchProvider
+from services.research.chains import ResearchChainManager
+from services.search.search_manager import SearchManager
+
+def build(search_latency: float, llm_latency: float):
+    search_manager = SearchManager(search_provider=FakeSearchProvider(latency=search_latency))
+    research_manager = ResearchChainManager(FakeLLM(latency=llm_latency))
+    return search_manager, research_manager
+
+def run_sync(requests: int, threads: int, search_latency: float, llm_latency: float) -> dict:
+    search_manager, research_manager = build(search_latency, llm_latency)
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        topic = f"topic {i}"
+        sources = search_manager.search(topic, num_results=4)
+        research_manager.process_research(topic, f"Research '{topic}'", sources, depth="brief")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(one, range(requests)))
+    return summarize('sync', requests, time.perf_counter() - start, latencies)
+
+def run_async(requests: int, search_latency: float, llm_latency: float) -> dict:
+    search_manager, research_manager = build(search_latency, llm_latency)
+
+    async def one(i: int) -> float:
+        start = time.perf_counter()
+        topic = f"topic {i}"
+        sources = await search_manager.asearch(topic, num_results=4)
+        await research_manager.aprocess_research(topic, f"Research '{topic}'", sources, depth="brief")
+        return time.perf_counter() - start
+
+    async def main():
+        return await asyncio.gather(*(one(i) for i in range(requests)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(main())
+    return summarize('async', requests, time.perf_counter() - start, latencies)
+
+def summarize(mode: str, requests: int, wall: float, latencies: list) -> dict:
+    ordered = sorted(latencies)
+    return {
+        'mode': mode,
+        'requests': requests,
+        'wall_seconds': wall,
+        'throughput': requests / wall,
+        'p50': statistics.median(ordered),
+        'p95': ordered[int(0.95 * (len(ordered) - 1))]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16, help="worker threads for the sync mode")
+    parser.add_argument('--search-latency', type=float, default=0.3)
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Per-request INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+
+    results = [
+        run_sync(args.requests, args.threads, args.search_latency, args.llm_latency),
+        run_async(args.requests, args.search_latency, args.llm_latency)
+    ]
+    print(f"{'mode':<8}{'requests':>10}{'wall s':>10}{'req/s':>10}{'p50 s':>10}{'p95 s':>10}")
+    for r in results:
+        print(
+            f"{r['mode']:<8}{r['requests']:>10}{r['wall_seconds']:>10.2f}{r['throughput']:>10.1f}"
+            f"{r['p50']:>10.2f}{r['p95']:>10.2f}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""Exercise ContentFetcher against a local HTTP server.
+
+The server publishes pages that cover the fetcher's edge cases:
+- article: main text inside navigation and script boilerplate, served with an ETag
+- dated: served with Last-Modified
+- slow: answers after --slow seconds, so it misses a shorter deadline
+- huge: a multi-megabyte page that must be cut off at max_bytes
+- binary: a non-text content type
+- missing: a 404
+- utf8: UTF-8 text served as text/html with no charset
+
+Each page is fetched three times. The first pass downloads, the second is
+served from cache, and the third revalidates (forced with
+revalidate_after=0) and should get 304s. The script prints per-pass timings,
+the fetcher's counters and what the server saw, then checks that:
+- the revalidation pass sends ETag/Last-Modified validators and reuses the
+  cached text on 304
+- the huge page is cut off at max_bytes
+- binary and missing pages are skipped
+- no host ever has more than --per-host requests in flight
+- the slow page is dropped at the deadline
+- the UTF-8 page without a charset is decoded correctly
+
+Exits non-zero if any check fails.
+
+    python -m benchmarks.content_fetch --hosts 3 --per-host 2
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.cache import MemoryCache
+from services.content import ContentFetcher
+from services.search import SearchResult
+
+ARTICLE = (
+    "<html><head><title>Local article</title><script>var tracking = 'ignore me';</script></head><body>"
+    "<nav><a href='/'>Home</a> <a href='/about'>About us and everything else on this site</a></nav>"
+    "<article><h1>Fusion energy milestones</h1>"
+    + "".join(
+        f"<p>Paragraph {i}: researchers reported steady progress on plasma confinement and net energy gain.</p>"
+        for i in range(20)
+    )
+    + "</article><footer>Copyright notice that should never reach the model, repeated for length.</footer>"
+    "</body></html>"
+)
+ETAG = '"article-v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+UTF8_TEXT = "Café société: naïve façades and jalapeño crème brûlée, measured in µm and €."
+
+class Handler(BaseHTTPRequestHandler):
+    requests_seen = []
+    slow_seconds = 3.0
+    lock = threading.Lock()
+    # Requests in flight per Host header, and the most seen at once
+    in_flight = {}
+    max_in_flight = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The fetcher hung up after reading max_bytes
+            pass
+
+    def do_GET(self):
+        page = self.path.split("/")[1]
+        host = self.headers.get('Host', '')
+        conditional = 'If-None-Match' in self.headers or 'If-Modified-Since' in self.headers
+        with self.lock:
+            self.requests_seen.append((page, conditional))
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        try:
+            self._serve(page)
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+
+    def _serve(self, page):
+        if page == "article":
+            if self.headers.get('If-None-Match') == ETAG:
+                return self._send(304)
+            return self._send(200, ARTICLE.encode(), headers={'ETag': ETAG})
+        if page == "dated":
+            if self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+                return self._send(304)
+            return self._send(200, ARTICLE.replace("Fusion", "Dated").encode(), headers={'Last-Modified': LAST_MODIFIED})
+        if page == "slow":
+            time.sleep(self.slow_seconds)
+            return self._send(200, ARTICLE.encode())
+        if page == "huge":
+            # Megabytes of markup with no main text, so only max_bytes stops the download
+            filler = "<script>" + "x" * 200 + "</script>"
+            return self._send(200, (filler * 25000).encode())
+        if page == "binary":
+            return self._send(200, b"\x00" * 1024, content_type="application/octet-stream")
+        if page == "utf8":
+            body = f"<html><body><article><p>{UTF8_TEXT}</p></article></body></html>"
+            return self._send(200, body.encode("utf-8"), content_type="text/html")
+        return self._send(404, b"not found")
+
+PAGES = ("article", "dated", "slow", "huge", "binary", "missing", "utf8")
+
+def start_servers(hosts: int) -> list:
+    """One server per host, each on its own loopback address, so every host gets its own per-host limit."""
+    servers = []
+    for i in range(hosts):
+        server = ThreadingHTTPServer((f"127.0.0.{i + 1}", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+def build_results(servers: list) -> list:
+    results = []
+    for server in servers:
+        host, port = server.server_address[:2]
+        for page in PAGES:
+            results.append(SearchResult(title=page, url=f"http://{host}:{port}/{page}", snippet=f"{page} snippet"))
+    return results
+
+def run_pass(name: str, fetcher: ContentFetcher, results: list) -> tuple:
+    """Fetch every result once; returns ({page: [content per host]}, seconds)."""
+    start = time.perf_counter()
+    enriched = fetcher.fetch_all(results)
+    elapsed = time.perf_counter() - start
+    fetched = [r for r in enriched if r.content]
+    print(f"{name:<12} {elapsed:6.2f}s  {len(fetched)}/{len(results)} pages with content")
+    contents = {}
+    for result in enriched:
+        contents.setdefault(result.title, []).append(result.content)
+    return contents, elapsed
+
+def requests_for(pages: tuple, since: int = 0) -> list:
+    return [(page, conditional) for page, conditional in Handler.requests_seen[since:] if page in pages]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=2)
+    parser.add_argument('--per-host', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--slow', type=float, default=3.0, help="seconds the slow page takes")
+    parser.add_argument('--deadline', type=float, default=1.5)
+    parser.add_argument('--max-bytes', type=int, default=256 * 1024)
+    parser.add_argument('--verbose', action='store_true', help="print the extracted article text")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    Handler.slow_seconds = args.slow
+    servers = start_servers(args.hosts)
+    results = build_results(servers)
+    fetcher = ContentFetcher(
+        cache=MemoryCache(),
+        allow_private=True,
+        max_workers=args.workers,
+        per_host=args.per_host,
+        timeout=args.slow * 2,
+        deadline=args.deadline,
+        max_bytes=args.max_bytes
+    )
+    failures = []
+    validated = ("article", "dated")
+    try:
+        downloaded, elapsed = run_pass("download", fetcher, results)
+        truncated = fetcher.stats()['truncated']
+        seen = len(Handler.requests_seen)
+        cached, _ = run_pass("cached", fetcher, results)
+        cached_requests = requests_for(validated, seen)
+        fetcher.revalidate_after = 0
+        seen = len(Handler.requests_seen)
+        revalidated_before = fetcher.stats()['revalidated']
+        revalidated, _ = run_pass("revalidate", fetcher, results)
+        revalidation_requests = requests_for(validated, seen)
+        revalidated_count = fetcher.stats()['revalidated'] - revalidated_before
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    print(f"fetcher: {fetcher.stats()}")
+    conditional = sum(1 for _, is_conditional in Handler.requests_seen if is_conditional)
+    print(f"server saw {len(Handler.requests_seen)} requests, {conditional} conditional")
+    if args.verbose:
+        print(fetcher.fetch(results[0].url)[:500])
+
+    expected = len(validated) * args.hosts
+    if not all(content and "Paragraph 0" in content for page in validated for content in downloaded[page]):
+        failures.append("article and dated pages were not downloaded")
+    if cached_requests:
+        failures.append(f"cached pass re-requested {len(cached_requests)} fresh pages")
+    if len(revalidation_requests) != expected or not all(is_conditional for _, is_conditional in revalidation_requests):
+        failures.append(f"revalidation sent {sum(c for _, c in revalidation_requests)} conditional requests "
+                        f"for {expected} cached pages")
+    if revalidated_count != expected:
+        failures.append(f"{revalidated_count} of {expected} revalidated pages were served from a 304")
+    if any(revalidated[page] != downloaded[page] for page in validated):
+        failures.append("a 304 did not reuse the cached text")
+    if truncated < args.hosts or any(downloaded["huge"]):
+        failures.append(f"huge page was not cut off at max_bytes ({truncated} truncated downloads)")
+    if fetcher.stats()['bytes'] > (args.max_bytes + 16384) * args.hosts * 3 + 1024 * 1024:
+        failures.append(f"read {fetcher.stats()['bytes']} bytes, more than max_bytes allows")
+    for page in ("binary", "missing"):
+        if any(contents[page][i] for contents in (downloaded, cached, revalidated) for i in range(args.hosts)):
+            failures.append(f"{page} page was not skipped")
+    busiest = max(Handler.max_in_flight.values())
+    if busiest > args.per_host:
+        failures.append(f"{busiest} requests in flight to one host, per-host limit is {args.per_host}")
+    if any(downloaded["slow"]) or elapsed >= args.slow:
+        failures.append(f"slow page was not dropped at the {args.deadline}s deadline (pass took {elapsed:.2f}s)")
+    if not all(content and UTF8_TEXT in content for content in downloaded["utf8"]):
+        failures.append(f"UTF-8 page without a charset was decoded as {downloaded['utf8'][0]!r}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
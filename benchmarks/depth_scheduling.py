@@ -0,0 +1,71 @@
+"""Compare brief-request latency behind a burst of comprehensive jobs, with and without depth scheduling.
+
+A burst of `--comprehensive` long jobs is queued, then `--brief` short jobs
+arrive one every `--brief-interval` seconds. Jobs sleep instead of running
+research so the numbers reflect queueing only.
+
+- fifo: JobManager with `--slots` workers and no scheduler; brief jobs wait
+  behind the whole comprehensive burst
+- scheduled: the same JobManager with a PriorityScheduler using the app's
+  default weights, per-depth caps and deadlines
+
+    python -m benchmarks.depth_scheduling --comprehensive 24 --brief 20
+"""
+import argparse
+import logging
+import statistics
+import time
+from services.jobs import JobManager, PriorityScheduler, SchedulingClass
+
+def run(mode: str, args) -> dict:
+    scheduler = None
+    if mode == "scheduled":
+        scheduler = PriorityScheduler({
+            'brief': SchedulingClass(weight=6, max_concurrency=args.slots, deadline=30),
+            'detailed': SchedulingClass(weight=3, max_concurrency=6, deadline=90),
+            'comprehensive': SchedulingClass(weight=1, max_concurrency=args.comprehensive_cap, deadline=180)
+        }, max_concurrency=args.slots)
+    manager = JobManager(max_workers=args.slots, max_queue=args.comprehensive + args.brief, scheduler=scheduler)
+    jobs = {'brief': [], 'comprehensive': []}
+
+    for i in range(args.comprehensive):
+        jobs['comprehensive'].append(
+            manager.submit(f"comprehensive-{i}", time.sleep, args.comprehensive_time, job_class='comprehensive')
+        )
+    for i in range(args.brief):
+        jobs['brief'].append(manager.submit(f"brief-{i}", time.sleep, args.brief_time, job_class='brief'))
+        time.sleep(args.brief_interval)
+    while any(job.status in ('queued', 'running') for batch in jobs.values() for job in batch):
+        time.sleep(0.05)
+
+    result = {'mode': mode}
+    for depth, batch in jobs.items():
+        latencies = sorted(job.finished_at - job.submitted_at for job in batch)
+        result[depth] = {
+            'p50': statistics.median(latencies),
+            'p95': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+            'max': latencies[-1]
+        }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slots', type=int, default=8)
+    parser.add_argument('--comprehensive', type=int, default=24)
+    parser.add_argument('--comprehensive-time', type=float, default=2.0)
+    parser.add_argument('--comprehensive-cap', type=int, default=4)
+    parser.add_argument('--brief', type=int, default=20)
+    parser.add_argument('--brief-time', type=float, default=0.3)
+    parser.add_argument('--brief-interval', type=float, default=0.1)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'mode':<10} {'depth':<14} {'p50 s':>7} {'p95 s':>7} {'max s':>7}")
+    for mode in ("fifo", "scheduled"):
+        result = run(mode, args)
+        for depth in ('brief', 'comprehensive'):
+            stats = result[depth]
+            print(f"{mode:<10} {depth:<14} {stats['p50']:7.2f} {stats['p95']:7.2f} {stats['max']:7.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Deterministic, latency-configurable stand-ins for the search and LLM
+providers, so the pipeline can be exercised without network access or API
+spend."""
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+import asyncio
+import hashlib
+import time
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from langchain_core.pydantic_v1 import PrivateAttr
+from services.models.model_provider import BaseModelProvider
+from services.search import SearchProvider, SearchResult
+
+class FakeSearchProvider(SearchProvider):
+    """Returns synthetic results for any query after a fixed delay."""
+
+    def __init__(self, latency: float = 0.3):
+        self.latency = latency
+        self.calls = 0
+
+    def _results(self, query: str, num_results: int) -> List[SearchResult]:
+        slug = "-".join(query.lower().split())
+        return [
+            SearchResult(
+                title=f"{query} - result {i}",
+                url=f"https://example{i}.com/{slug}",
+                snippet=f"Synthetic snippet {i} about {query}."
+            )
+            for i in range(1, num_results + 1)
+        ]
+
+    def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._results(query, num_results)
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._results(query, num_results)
+
+class FakeLLM(LLM):
+    """LLM that answers with deterministic text after a configurable delay.
+
+    latency is the time to first token; token_latency is added per streamed token.
+    With fail_every=N every Nth call raises, and with slow_every=N every Nth
+    call takes slow_latency instead, to exercise failover and hedging paths.
+    """
+
+    latency: float = 0.5
+    token_latency: float = 0.0
+    num_tokens: int = 50
+    fail_every: int = 0
+    slow_every: int = 0
+    slow_latency: float = 5.0
+
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def _check_failure(self) -> float:
+        """Count the call, raise if it is a simulated failure, and return its latency."""
+        self._calls += 1
+        if self.fail_every and self._calls % self.fail_every == 0:
+            raise RuntimeError(f"Simulated failure on call {self._calls}")
+        if self.slow_every and self._calls % self.slow_every == 0:
+            return self.slow_latency
+        return self.latency
+
+    def _tokens(self, prompt: str) -> List[str]:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return [f"{digest[i % len(digest)]}{i} " for i in range(self.num_tokens)]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        latency = self._check_failure()
+        time.sleep(latency + self.token_latency * self.num_tokens)
+        return "".join(self._tokens(prompt))
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        latency = self._check_failure()
+        await asyncio.sleep(latency + self.token_latency * self.num_tokens)
+        return "".join(self._tokens(prompt))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        latency = self._check_failure()
+        time.sleep(latency)
+        for token in self._tokens(prompt):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            yield GenerationChunk(text=token)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        latency = self._check_failure()
+        await asyncio.sleep(latency)
+        for token in self._tokens(prompt):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield GenerationChunk(text=token)
+
+class FakeModelProvider(BaseModelProvider):
+    """ModelFactory provider slot that builds FakeLLMs.
+
+    Register it with ModelFactory.PROVIDERS['fake'] = FakeModelProvider; set
+    llm_options to configure the FakeLLM every model client is built with.
+    """
+
+    llm_options: Dict[str, Any] = {}
+
+    def __init__(self, api_key: str, temperature: float = 0.7, max_tokens: int = 1500):
+        self.api_key = api_key
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    def get_model(self) -> FakeLLM:
+        return FakeLLM(**self.llm_options)
+
+class FakeOpenAIProvider(FakeModelProvider):
+    """Fake provider that still imports the OpenAI SDK class on first use, like
+    the real OpenAIProvider, so startup measurements include that cost."""
+
+    llm_class = 'langchain_community.llms:OpenAI'
+    llm_options: Dict[str, Any] = {'latency': 0.0}
+
+    def get_model(self) -> FakeLLM:
+        self.load_llm_class()
+        return super().get_model()
@@ -0,0 +1,134 @@
+"""Check that two app worker processes share sessions and results.
+
+Starts two workers on local ports with SESSION_STORE=sqlite and one shared
+CACHE_DIR, as a multi-process server (e.g. gunicorn -w 2) would run them.
+Search uses FakeSearchProvider and the 'openai' slot is FakeModelProvider,
+so no network calls are made.
+
+1. An async /research request is queued on worker A and its /stream is read
+   from worker B; every event must arrive, in order, through job_completed.
+2. The same topic is then requested from worker B, which must answer from
+   the semantic index entry worker A wrote.
+
+Exits non-zero if either check fails.
+
+    python -m benchmarks.multiprocess_sessions
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+def worker(port: int) -> None:
+    """Runs in each worker process: serve the app on the given port."""
+    import logging
+    from services.models import ModelFactory
+    from benchmarks.fakes import FakeModelProvider, FakeSearchProvider
+    FakeModelProvider.llm_options = {'latency': 0.2}
+    ModelFactory.PROVIDERS['openai'] = FakeModelProvider
+    import app as research_app
+    logging.disable(logging.WARNING)
+    research_app.registry.set_search_provider(FakeSearchProvider(latency=0.1))
+
+    from werkzeug.serving import make_server
+    make_server('127.0.0.1', port, research_app.app, threaded=True).serve_forever()
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_ready(base_url: str, timeout: float = 30) -> None:
+    import requests
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            requests.get(f"{base_url}/stats", timeout=1).raise_for_status()
+            return
+        except requests.RequestException:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+def read_stream(url: str) -> list:
+    """Collect the events of an SSE stream until the server ends it."""
+    import requests
+    events = []
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith('data: '):
+                events.append(json.loads(line[len('data: '):]))
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--topic', default='shared session stores for multi-process servers')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.port)
+        return
+
+    import requests
+    env = dict(os.environ)
+    env.update({
+        'CACHE_DIR': tempfile.mkdtemp(prefix='multiprocess-bench-'),
+        'SESSION_STORE': 'sqlite',
+        # Off by default; check 2 needs it
+        'SEMANTIC_INDEX': 'true',
+        'MODEL_ROUTING': 'off',
+        'SERPAPI_API_KEY': env.get('SERPAPI_API_KEY', 'offline'),
+        'OPENAI_API_KEY': 'offline'
+    })
+    ports = [free_port(), free_port()]
+    workers = [
+        subprocess.Popen([sys.executable, '-m', 'benchmarks.multiprocess_sessions', '--worker', '--port', str(port)],
+                         env=env)
+        for port in ports
+    ]
+    failures = []
+    try:
+        worker_a, worker_b = (f"http://127.0.0.1:{port}" for port in ports)
+        wait_ready(worker_a)
+        wait_ready(worker_b)
+
+        request = {'topic': args.topic, 'depth': 'brief', 'model': 'openai'}
+        started = time.perf_counter()
+        queued = requests.post(f"{worker_a}/research", json={**request, 'async': True}, timeout=10)
+        queued.raise_for_status()
+        events = read_stream(worker_b + queued.json()['stream_url'])
+        elapsed = time.perf_counter() - started
+        steps = [event['step'] for event in events]
+        ids = [event['id'] for event in events]
+        print(f"worker B streamed {len(events)} events of worker A's job in {elapsed:.2f}s: {', '.join(steps)}")
+        if 'research_completed' not in steps or steps[-1] != 'job_completed':
+            failures.append("stream from worker B did not end with the completed job")
+        if ids != list(range(1, len(ids) + 1)):
+            failures.append(f"stream from worker B skipped or reordered events: {ids}")
+
+        started = time.perf_counter()
+        repeated = requests.post(f"{worker_b}/research", json=request, timeout=60)
+        repeated.raise_for_status()
+        elapsed = time.perf_counter() - started
+        match = repeated.json().get('semantic_match')
+        print(f"worker B answered the repeated topic in {elapsed:.2f}s, semantic_match={match}")
+        if not match:
+            failures.append("worker B did not reuse worker A's result from the semantic index")
+    finally:
+        for process in workers:
+            process.terminate()
+            process.wait()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
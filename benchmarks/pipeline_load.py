@@ -0,0 +1,280 @@
+"""Offline load test of the Flask app, end to end over HTTP.
+
+The app is served by a threaded WSGI server in this process, with FakeSearchProvider
+in place of SerpAPI and FakeLLM registered in the ModelFactory provider slot,
+so nothing leaves the machine. Virtual users submit research jobs to /research
+and follow /stream/<session_id> until the result arrives (or, with
+--mode sync, wait on the blocking /research response).
+
+Reports p50/p95/p99 latency, time to first synthesis token, throughput, peak
+RSS and peak thread count (the latter includes one client thread per virtual
+user). Save a run with --json and pass it to --compare on a later run to fail
+when p95 latency or throughput regress by more than --tolerance.
+
+    python -m benchmarks.pipeline_load --requests 200 --concurrency 16 \\
+        --depth-mix brief=6,detailed=3,comprehensive=1 --json baseline.json
+    python -m benchmarks.pipeline_load --requests 200 --concurrency 16 \\
+        --depth-mix brief=6,detailed=3,comprehensive=1 --compare baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+import requests
+
+def configure_environment(cache_dir: str) -> None:
+    """Point the app at throwaway caches and keep every request on the fake provider."""
+    os.environ['CACHE_DIR'] = cache_dir
+    os.environ['MODEL_ROUTING'] = 'off'
+    # Generated topics differ only by a number, which the semantic index would answer from memory
+    os.environ.setdefault('SEMANTIC_INDEX', 'false')
+    os.environ.setdefault('SERPAPI_API_KEY', 'offline')
+    if not any(os.getenv(key) for key in ('OPENAI_API_KEY', 'GEMINI_API_KEY', 'ANTHROPIC_API_KEY')):
+        os.environ['OPENAI_API_KEY'] = 'offline'
+
+def start_server(args: argparse.Namespace):
+    """Import the app with fake providers plugged in and serve it on a free local port."""
+    from werkzeug.serving import make_server
+    import app as research_app
+    from benchmarks.fakes import FakeModelProvider, FakeSearchProvider
+    from services.models import ModelFactory
+
+    FakeModelProvider.llm_options = {
+        'latency': args.llm_latency,
+        'token_latency': args.token_latency,
+        'num_tokens': args.num_tokens
+    }
+    ModelFactory.PROVIDERS['fake'] = FakeModelProvider
+    research_app.AVAILABLE_MODELS['provider'].append('fake')
+    research_app.AVAILABLE_MODELS['api_keys']['fake'] = 'offline'
+    research_app.registry.set_search_provider(FakeSearchProvider(latency=args.search_latency))
+
+    server = make_server('127.0.0.1', 0, research_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def parse_depth_mix(spec: str) -> Dict[str, float]:
+    """Parse "brief=6,detailed=3" into relative weights."""
+    mix = {}
+    for part in spec.split(','):
+        depth, _, weight = part.partition('=')
+        mix[depth.strip()] = float(weight or 1)
+    return mix
+
+class ResourceSampler:
+    """Samples the process's thread count while the load runs."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def follow_stream(session: requests.Session, url: str, started: float, timeout: float) -> Dict[str, Any]:
+    """Read SSE events until the job finishes, noting the first synthesis token."""
+    outcome: Dict[str, Any] = {'ttft': None, 'error': 'stream ended without a result'}
+    with session.get(url, stream=True, timeout=timeout) as response:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data: '):
+                continue
+            event = json.loads(line[len('data: '):])
+            if event['step'] == 'synthesis_token' and outcome['ttft'] is None:
+                outcome['ttft'] = time.perf_counter() - started
+            elif event['step'] == 'job_completed':
+                outcome['error'] = None
+                break
+            elif event['step'] == 'research_failed':
+                outcome['error'] = event['details']['error']
+                break
+    return outcome
+
+def one_request(session: requests.Session, base_url: str, topic: str, depth: str,
+                mode: str, timeout: float) -> Dict[str, Any]:
+    payload = {'topic': topic, 'depth': depth, 'model': 'fake', 'async': mode == 'job'}
+    started = time.perf_counter()
+    rejected = 0
+    while True:
+        response = session.post(f"{base_url}/research", json=payload, timeout=timeout)
+        if response.status_code != 429:
+            break
+        # Job queue full: back off briefly instead of the advertised Retry-After
+        rejected += 1
+        time.sleep(0.2)
+
+    if response.status_code >= 400:
+        outcome = {'ttft': None, 'error': f"HTTP {response.status_code}"}
+    elif mode == 'job':
+        outcome = follow_stream(session, base_url + response.json()['stream_url'], started, timeout)
+    else:
+        outcome = {'ttft': None, 'error': None}
+    return {'depth': depth, 'latency': time.perf_counter() - started, 'rejected': rejected, **outcome}
+
+def run_load(base_url: str, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    mix = parse_depth_mix(args.depth_mix)
+    rng = random.Random(args.seed)
+    plan = [
+        (f"{args.topic_prefix} {i % args.unique_topics if args.unique_topics else i}",
+         rng.choices(list(mix), weights=list(mix.values()))[0])
+        for i in range(args.requests)
+    ]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(plan)
+    next_index = iter(range(len(plan)))
+    lock = threading.Lock()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            topic, depth = plan[i]
+            try:
+                results[i] = one_request(session, base_url, topic, depth, args.mode, args.timeout)
+            except Exception as e:
+                results[i] = {'depth': depth, 'latency': args.timeout, 'rejected': 0, 'ttft': None, 'error': str(e)}
+
+    workers = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def summarize(results: List[Dict[str, Any]], wall: float, peak_threads: int, args: argparse.Namespace) -> Dict[str, Any]:
+    ok = [r for r in results if r['error'] is None]
+    latencies = [r['latency'] for r in ok]
+    ttfts = [r['ttft'] for r in ok if r['ttft'] is not None]
+    by_depth = {}
+    for depth in sorted({r['depth'] for r in results}):
+        depth_latencies = [r['latency'] for r in ok if r['depth'] == depth]
+        by_depth[depth] = {
+            'requests': sum(1 for r in results if r['depth'] == depth),
+            'p50': percentile(depth_latencies, 50),
+            'p95': percentile(depth_latencies, 95)
+        }
+    return {
+        'mode': args.mode,
+        'requests': len(results),
+        'concurrency': args.concurrency,
+        'errors': len(results) - len(ok),
+        'rejected': sum(r['rejected'] for r in results),
+        'wall_seconds': wall,
+        'throughput': len(ok) / wall if wall else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'ttft_p50': percentile(ttfts, 50),
+        'ttft_p95': percentile(ttfts, 95),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'peak_threads': peak_threads,
+        'by_depth': by_depth,
+        'sample_errors': sorted({r['error'] for r in results if r['error'] is not None})[:5]
+    }
+
+def report(summary: Dict[str, Any]) -> None:
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.3f}"
+
+    print(f"mode={summary['mode']} requests={summary['requests']} concurrency={summary['concurrency']} "
+          f"errors={summary['errors']} rejected={summary['rejected']}")
+    print(f"wall {summary['wall_seconds']:.2f}s  throughput {summary['throughput']:.1f} req/s")
+    print(f"latency p50 {fmt(summary['p50'])}s  p95 {fmt(summary['p95'])}s  p99 {fmt(summary['p99'])}s")
+    print(f"first token p50 {fmt(summary['ttft_p50'])}s  p95 {fmt(summary['ttft_p95'])}s")
+    print(f"peak RSS {summary['peak_rss_mb']:.1f} MB  peak threads {summary['peak_threads']}")
+    print(f"{'depth':<15}{'requests':>10}{'p50 s':>10}{'p95 s':>10}")
+    for depth, stats in summary['by_depth'].items():
+        print(f"{depth:<15}{stats['requests']:>10}{fmt(stats['p50']):>10}{fmt(stats['p95']):>10}")
+    for error in summary['sample_errors']:
+        print(f"error: {error}")
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond tolerance relative to a saved baseline run."""
+    regressions = []
+    if baseline.get('p95') and summary['p95'] and summary['p95'] > baseline['p95'] * (1 + tolerance):
+        regressions.append(f"p95 latency {summary['p95']:.3f}s vs baseline {baseline['p95']:.3f}s")
+    if baseline.get('throughput') and summary['throughput'] < baseline['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {summary['throughput']:.1f} req/s vs baseline {baseline['throughput']:.1f} req/s")
+    if summary['errors'] > baseline.get('errors', 0):
+        regressions.append(f"{summary['errors']} errors vs baseline {baseline.get('errors', 0)}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8, help="concurrent virtual users")
+    parser.add_argument('--mode', choices=['job', 'sync'], default='job',
+                        help="job: async submit + /stream; sync: blocking /research")
+    parser.add_argument('--depth-mix', default='brief=1', help="relative weights, e.g. brief=6,detailed=3,comprehensive=1")
+    parser.add_argument('--unique-topics', type=int, default=0,
+                        help="cycle through this many topics to exercise caches and coalescing (0: all distinct)")
+    parser.add_argument('--topic-prefix', default='benchmark topic')
+    parser.add_argument('--search-latency', type=float, default=0.2)
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="seconds to first token per LLM call")
+    parser.add_argument('--token-latency', type=float, default=0.0, help="seconds per streamed token")
+    parser.add_argument('--num-tokens', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the summary to this file")
+    parser.add_argument('--compare', help="baseline summary to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    args = parser.parse_args()
+
+    # Per-request INFO logging would dominate the measurement
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory(prefix="research-bench-") as cache_dir:
+        configure_environment(cache_dir)
+        server = start_server(args)
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            with ResourceSampler() as sampler:
+                start = time.perf_counter()
+                results = run_load(base_url, args)
+                wall = time.perf_counter() - start
+        finally:
+            server.shutdown()
+
+    summary = summarize(results, wall, sampler.peak_threads, args)
+    report(summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(summary, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""Compare end-to-end latency of sequential and pipelined research stages.
+
+Each request fans out over the detailed-depth queries. One query in three is
+slow, and one source page in `--slow-every` takes `--slow-page` seconds to
+fetch, modelling the slow-source requests that dominate tail latency.
+
+- sequential: search_many() waits for every query, every page is fetched,
+  then map_reduce analysis and synthesis run
+- pipelined: iter_search() feeds process_research_stream(), which fetches and
+  analyzes each source as it arrives and synthesizes once the quorum is
+  analyzed, dropping stragglers after --straggler-timeout
+
+    python -m benchmarks.pipelined_stages --requests 40 --threads 8
+"""
+import argparse
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import List
+from benchmarks.fakes import FakeLLM, FakeSearchProvider
+from services.research.chains import ResearchChainManager
+from services.search import SearchResult
+from services.search.query_expansion import expand_query
+from services.search.search_manager import SearchManager
+
+class UnevenSearchProvider(FakeSearchProvider):
+    """FakeSearchProvider where every third call takes slow_latency."""
+
+    def __init__(self, latency: float, slow_latency: float):
+        super().__init__(latency)
+        self.slow_latency = slow_latency
+
+    def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        self.calls += 1
+        time.sleep(self.slow_latency if self.calls % 3 == 0 else self.latency)
+        return self._results(query, num_results)
+
+class FakePageFetcher:
+    """Per-source page fetch where every slow_every-th page is slow."""
+
+    def __init__(self, latency: float, slow_latency: float, slow_every: int):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.slow_every = slow_every
+        self.calls = 0
+
+    def fetch_result(self, result: SearchResult) -> SearchResult:
+        self.calls += 1
+        slow = self.slow_every and self.calls % self.slow_every == 0
+        time.sleep(self.slow_latency if slow else self.latency)
+        return replace(result, content=f"Page text of {result.title}. " * 20)
+
+def run(mode: str, args) -> dict:
+    search_manager = SearchManager(UnevenSearchProvider(args.search_latency, args.slow_search))
+    fetcher = FakePageFetcher(args.page_latency, args.slow_page, args.slow_every)
+    research_manager = ResearchChainManager(
+        FakeLLM(latency=args.llm_latency),
+        analysis_mode="map_reduce",
+        map_concurrency=args.analysis_concurrency,
+        quorum=args.quorum,
+        straggler_timeout=args.straggler_timeout
+    )
+    fetch_pool = ThreadPoolExecutor(max_workers=args.analysis_concurrency)
+    analyzed = []
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        topic = f"pipeline topic {i}"
+        queries = expand_query(topic, "detailed")
+        prompt = f"Research '{topic}'"
+        if mode == "sequential":
+            sources = search_manager.search_many(queries, num_results=4, max_results=8, deadline=args.search_deadline)
+            futures = [fetch_pool.submit(fetcher.fetch_result, source) for source in sources]
+            wait(futures, timeout=args.fetch_deadline)
+            sources = [future.result() if future.done() else source for future, source in zip(futures, sources)]
+            output = research_manager.process_research(topic, prompt, sources, depth="detailed")
+        else:
+            sources = search_manager.iter_search(queries, num_results=4, max_results=8, deadline=args.search_deadline)
+            output = research_manager.process_research_stream(
+                topic, prompt, sources, depth="detailed", prepare=fetcher.fetch_result, expected_sources=8
+            )
+        analyzed.append(len(output["sources"]))
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        latencies = sorted(executor.map(one, range(args.requests)))
+    wall = time.perf_counter() - start
+    fetch_pool.shutdown(wait=False)
+    return {
+        'mode': mode,
+        'p50': statistics.median(latencies),
+        'p95': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        'max': latencies[-1],
+        'throughput': args.requests / wall,
+        'sources': statistics.mean(analyzed)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--search-latency', type=float, default=0.2)
+    parser.add_argument('--slow-search', type=float, default=1.0)
+    parser.add_argument('--search-deadline', type=float, default=10.0)
+    parser.add_argument('--page-latency', type=float, default=0.2)
+    parser.add_argument('--slow-page', type=float, default=4.0)
+    parser.add_argument('--slow-every', type=int, default=6)
+    parser.add_argument('--fetch-deadline', type=float, default=15.0)
+    parser.add_argument('--llm-latency', type=float, default=0.3)
+    parser.add_argument('--analysis-concurrency', type=int, default=16)
+    parser.add_argument('--quorum', type=float, default=0.75)
+    parser.add_argument('--straggler-timeout', type=float, default=1.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'mode':<11} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'req/s':>7} {'sources':>8}")
+    for mode in ("sequential", "pipelined"):
+        result = run(mode, args)
+        print(f"{result['mode']:<11} {result['p50']:7.2f} {result['p95']:7.2f} {result['max']:7.2f} "
+              f"{result['throughput']:7.2f} {result['sources']:8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Measure the compressed result store: size on disk, write/read latency and list queries.
+
+Stores `--results` synthetic research responses (a report of `--report-words`
+words drawn from a fixed vocabulary, five sources and per-stage timings) in a
+temporary ResultStore, then reports:
+
+- bytes per result as JSON, as stored, and the compression ratio
+- put() latency, and get() latency when the blob is served as stored versus
+  decompressed for a client without gzip
+- list() latency for the newest page, a depth filter, a topic search and a
+  page deep into the cursor chain
+
+    python -m benchmarks.result_store --results 2000 --codec gzip
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from services.results import ResultStore
+from services.results.http import result_response
+
+VOCABULARY = (
+    "research model source analysis latency throughput cache request search depth provider token budget "
+    "report finding evidence trend market system data study method result the a of and to in for with "
+    "on is are was that this these by from as at recent growth risk impact performance benchmark"
+).split()
+
+def fake_response(rng: random.Random, i: int, words: int) -> dict:
+    sentences = []
+    for _ in range(words // 12):
+        sentence = ' '.join(rng.choice(VOCABULARY) for _ in range(12))
+        sentences.append(sentence.capitalize() + '.')
+    return {
+        'session_id': f"session-{i:06d}",
+        'result': ' '.join(sentences),
+        'duration': rng.uniform(5, 60),
+        'depth': rng.choice(('brief', 'detailed', 'comprehensive')),
+        'sources': [
+            {
+                'title': f"Source {j} on topic {i}",
+                'url': f"https://example{j}.com/articles/{i}",
+                'domain': f"example{j}.com",
+                'snippet': ' '.join(rng.choice(VOCABULARY) for _ in range(30))
+            }
+            for j in range(5)
+        ],
+        'timings': {stage: rng.uniform(0.1, 20) for stage in ('search', 'format', 'analysis', 'synthesis')}
+    }
+
+def timed(fn, repeat: int) -> float:
+    """Median milliseconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(1000 * (time.perf_counter() - start))
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--results', type=int, default=2000)
+    parser.add_argument('--report-words', type=int, default=2000)
+    parser.add_argument('--codec', default='gzip')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(0)
+    store = ResultStore(os.path.join(tempfile.mkdtemp(prefix='result-store-bench-'), 'results.db'),
+                        codec=args.codec, max_entries=args.results)
+    responses = [fake_response(rng, i, args.report_words) for i in range(args.results)]
+    put_ms = []
+    for i, response in enumerate(responses):
+        start = time.perf_counter()
+        store.put(response['session_id'], f"topic {i % 97} {rng.choice(VOCABULARY)}", response['depth'],
+                  'openai', response)
+        put_ms.append(1000 * (time.perf_counter() - start))
+
+    stats = store.stats()
+    print(f"{args.results} results, codec {args.codec}: {stats['bytes'] / args.results / 1024:.1f} KB JSON, "
+          f"{stats['stored_bytes'] / args.results / 1024:.1f} KB stored, ratio {stats['compression_ratio']:.2f}")
+    print(f"put                      {statistics.median(put_ms):7.2f} ms")
+
+    session_ids = [response['session_id'] for response in responses]
+    print(f"get, served as stored    "
+          f"{timed(lambda: result_response(store.get(rng.choice(session_ids)), args.codec, None), args.repeat):7.2f} ms")
+    print(f"get, decompressed        "
+          f"{timed(lambda: result_response(store.get(rng.choice(session_ids)), None, None), args.repeat):7.2f} ms")
+    etag = f'"{store.get(session_ids[0]).etag}"'
+    print(f"get, If-None-Match (304) "
+          f"{timed(lambda: result_response(store.get(session_ids[0]), args.codec, etag), args.repeat):7.2f} ms")
+
+    print(f"list newest 20           {timed(lambda: store.list(limit=20), args.repeat):7.2f} ms")
+    print(f"list depth=brief         {timed(lambda: store.list(depth='brief', limit=20), args.repeat):7.2f} ms")
+    print(f"list q=topic 42          {timed(lambda: store.list(query='topic 42', limit=20), args.repeat):7.2f} ms")
+    cursor = None
+    for _ in range(args.results // 40):
+        _, cursor = store.list(limit=20, cursor=cursor)
+    print(f"list page {args.results // 40 + 1:<5}          "
+          f"{timed(lambda: store.list(limit=20, cursor=cursor), args.repeat):7.2f} ms")
+
+if __name__ == '__main__':
+    main()
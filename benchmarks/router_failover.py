@@ -0,0 +1,125 @@
+"""Exercise RoutingLLM failover and hedging with fake local providers.
+
+Three scenarios run against FakeLLM providers and report latency
+percentiles, failovers, hedges and per-provider histograms:
+
+- failover: the primary fails every third call
+- slow-tail: the primary is fast but every 25th call stalls, without hedging
+- hedged: the same slow tail with hedging enabled
+
+Each scenario is also checked: failed calls must fail over to the backup,
+hedges must win when the primary stalls, and the per-provider stats and
+histograms must match the calls the fakes actually received. Exits
+non-zero if any check fails.
+
+    python -m benchmarks.router_failover --calls 100
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from benchmarks.fakes import FakeLLM
+from services.models.router import RoutingLLM
+
+def run(name: str, primary: FakeLLM, backup: FakeLLM, calls: int, hedge: bool, timeout: float) -> dict:
+    router = RoutingLLM(
+        providers={'primary': primary, 'backup': backup},
+        order=['primary', 'backup'],
+        provider_stats={},
+        timeout=timeout,
+        hedge=hedge,
+        hedge_min_samples=10
+    )
+    latencies = []
+    errors = 0
+    for i in range(calls):
+        start = time.perf_counter()
+        try:
+            router.invoke(f"prompt {i}")
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+
+    # Abandoned hedge losers finish in the background; let them record before the stats are read
+    time.sleep(max(primary.slow_latency if primary.slow_every else 0, backup.latency) + 0.1)
+    ordered = sorted(latencies)
+    return {
+        'scenario': name,
+        'errors': errors,
+        'p50': statistics.median(ordered),
+        'p95': ordered[int(0.95 * (len(ordered) - 1))],
+        'p99': ordered[int(0.99 * (len(ordered) - 1))],
+        'stats': router.stats()
+    }
+
+def check(result: dict, primary: FakeLLM, backup: FakeLLM, calls: int, hedge: bool) -> list:
+    """Failures of the routing behaviour a scenario must show."""
+    failures = []
+    stats = result['stats']
+    name = result['scenario']
+    if result['errors']:
+        failures.append(f"{name}: {result['errors']} calls failed despite a healthy backup")
+
+    primary_failures = calls // primary.fail_every if primary.fail_every else 0
+    if stats['failovers'] != primary_failures:
+        failures.append(f"{name}: {stats['failovers']} failovers, expected {primary_failures}")
+    if not hedge and backup.calls != primary_failures:
+        failures.append(f"{name}: backup got {backup.calls} calls, expected one per primary failure ({primary_failures})")
+
+    if hedge:
+        slow_calls = primary.calls // primary.slow_every
+        if not stats['hedges'] or stats['hedge_wins'] < slow_calls - 1:
+            failures.append(f"{name}: {stats['hedge_wins']} hedge wins over {slow_calls} stalled primary calls")
+        if result['p99'] >= primary.slow_latency:
+            failures.append(f"{name}: p99 {result['p99']:.2f}s, hedging did not cut the stalled calls short")
+    elif stats['hedges']:
+        failures.append(f"{name}: {stats['hedges']} hedges with hedging off")
+
+    for label, fake in (('primary', primary), ('backup', backup)):
+        provider = stats['providers'][label]
+        if provider['calls'] != fake.calls:
+            failures.append(f"{name}: {label} stats count {provider['calls']} calls, the fake received {fake.calls}")
+        if provider['latency_histogram']['+Inf'] != provider['calls'] - provider['errors']:
+            failures.append(f"{name}: {label} histogram holds {provider['latency_histogram']['+Inf']} calls, "
+                            f"expected {provider['calls'] - provider['errors']} successful ones")
+    if stats['providers']['primary']['errors'] != primary_failures:
+        failures.append(f"{name}: primary recorded {stats['providers']['primary']['errors']} errors, "
+                        f"expected {primary_failures}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--verbose', action='store_true', help="print per-provider histograms")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    scenarios = [
+        ('failover', FakeLLM(latency=0.05, fail_every=3), FakeLLM(latency=0.1), False),
+        ('slow-tail', FakeLLM(latency=0.05, slow_every=25, slow_latency=1.0), FakeLLM(latency=0.1), False),
+        ('hedged', FakeLLM(latency=0.05, slow_every=25, slow_latency=1.0), FakeLLM(latency=0.1), True)
+    ]
+
+    failures = []
+    print(f"{'scenario':<12}{'errors':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'failovers':>11}{'hedges':>8}{'hedge wins':>12}")
+    for name, primary, backup, hedge in scenarios:
+        result = run(name, primary, backup, args.calls, hedge, args.timeout)
+        stats = result['stats']
+        print(
+            f"{name:<12}{result['errors']:>8}{result['p50']:>8.2f}{result['p95']:>8.2f}{result['p99']:>8.2f}"
+            f"{stats['failovers']:>11}{stats['hedges']:>8}{stats['hedge_wins']:>12}"
+        )
+        if args.verbose:
+            print(json.dumps(stats['providers'], indent=2))
+        failures.extend(check(result, primary, backup, args.calls, hedge))
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Compare the cost of idle SSE streams under the old polling loop and the
+event-driven ResearchLogger subscription.
+
+Each stream runs on its own thread, as it would under a threaded WSGI server.
+The benchmark holds N idle streams open for a fixed window, measures process
+CPU time and live threads, then finishes every session and counts the
+threads that are still pinned.
+
+    python -m benchmarks.sse_idle_streams --streams 500 --seconds 10
+"""
+import argparse
+import threading
+import time
+from services.logging.research_logger import ResearchLogger
+
+def polling_stream(logger: ResearchLogger, session_id: str, stop: threading.Event) -> None:
+    """The original /stream generator: poll every 100ms, never terminate on its own."""
+    while not stop.is_set():
+        for _ in logger.get_logs(session_id):
+            pass
+        time.sleep(0.1)
+
+def event_stream(logger: ResearchLogger, session_id: str, stop: threading.Event) -> None:
+    """The current /stream generator: block until events arrive, end when finished."""
+    cursor = 0
+    while True:
+        logs, finished = logger.wait_for_logs(session_id, after_id=cursor, timeout=15)
+        for log in logs:
+            cursor = log['id']
+        if finished:
+            return
+
+def run(mode: str, streams: int, seconds: float) -> dict:
+    logger = ResearchLogger()
+    stop = threading.Event()
+    target = polling_stream if mode == 'polling' else event_stream
+    baseline_threads = threading.active_count()
+
+    threads = []
+    for i in range(streams):
+        session_id = f"{mode}-{i}"
+        logger.create_session(session_id)
+        thread = threading.Thread(target=target, args=(logger, session_id, stop), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    cpu_start = time.process_time()
+    time.sleep(seconds)
+    cpu_used = time.process_time() - cpu_start
+    idle_threads = threading.active_count() - baseline_threads
+
+    # Finish every session the way the app does once research completes
+    for i in range(streams):
+        session_id = f"{mode}-{i}"
+        logger.log_step(session_id, "research_completed")
+        logger.close_session(session_id)
+    time.sleep(1.0)
+    pinned_threads = threading.active_count() - baseline_threads
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'mode': mode,
+        'streams': streams,
+        'cpu_seconds': cpu_used,
+        'cpu_percent': 100 * cpu_used / seconds,
+        'idle_threads': idle_threads,
+        'threads_after_completion': pinned_threads
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=500)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'streams':>8}{'cpu s':>10}{'cpu %':>8}{'threads':>9}{'after done':>12}")
+    for mode in ('polling', 'event'):
+        result = run(mode, args.streams, args.seconds)
+        print(
+            f"{result['mode']:<10}{result['streams']:>8}{result['cpu_seconds']:>10.2f}"
+            f"{result['cpu_percent']:>8.1f}{result['idle_threads']:>9}{result['threads_after_completion']:>12}"
+        )
+
+if __name__ == '__main__':
+    main()
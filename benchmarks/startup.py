@@ -0,0 +1,108 @@
+"""Measure application startup: import time and time to the first served request.
+
+Each run starts a fresh interpreter, so module caches never carry over. The
+child process imports app, serves it on a local port and sends one
+/research request. Search uses FakeSearchProvider. The 'openai' provider slot
+is replaced by FakeOpenAIProvider, which still imports the real OpenAI SDK
+class, so the SDK import cost is counted without making network calls.
+
+Two configurations are compared:
+- lazy: SDKs and LangChain's chain stack load on the first request
+- warmup: MODEL_WARMUP=true builds them in the background at import
+
+With --idle, the child waits that long between listening and the first
+request. That models a worker that gets a little time before traffic
+arrives, which is when warm-up pays off.
+
+    python -m benchmarks.startup --runs 5 --idle 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+def child(idle: float) -> None:
+    """Runs in the measured interpreter; prints timings as JSON."""
+    import logging
+    start = time.perf_counter()
+    from services.models import ModelFactory
+    # A string spec, resolved on first use like any lazily registered provider
+    ModelFactory.PROVIDERS['openai'] = 'benchmarks.fakes:FakeOpenAIProvider'
+    import app as research_app
+    imported = time.perf_counter()
+    logging.disable(logging.WARNING)
+
+    from werkzeug.serving import make_server
+    import threading
+    import requests
+    from benchmarks.fakes import FakeSearchProvider
+    research_app.registry.set_search_provider(FakeSearchProvider(latency=0))
+    server = make_server('127.0.0.1', 0, research_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ready = time.perf_counter()
+
+    time.sleep(idle)
+    sent = time.perf_counter()
+    response = requests.post(
+        f"http://127.0.0.1:{server.server_port}/research",
+        json={'topic': 'startup benchmark', 'depth': 'brief', 'model': 'openai'},
+        timeout=60
+    )
+    response.raise_for_status()
+    done = time.perf_counter()
+    server.shutdown()
+    print(json.dumps({
+        'import': imported - start,
+        'ready': ready - start,
+        'first_request': done - sent
+    }))
+
+def run_once(warmup: bool, idle: float) -> dict:
+    env = dict(os.environ)
+    env.update({
+        'CACHE_DIR': tempfile.mkdtemp(prefix='startup-bench-'),
+        'MODEL_WARMUP': 'true' if warmup else 'false',
+        'MODEL_ROUTING': 'off',
+        'SEMANTIC_INDEX': 'false',
+        'SERPAPI_API_KEY': env.get('SERPAPI_API_KEY', 'offline'),
+        'OPENAI_API_KEY': 'offline'
+    })
+    # Only the fake-backed provider, so warm-up does not load other SDKs
+    env.pop('GEMINI_API_KEY', None)
+    env.pop('ANTHROPIC_API_KEY', None)
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.startup', '--child', '--idle', str(idle)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - started
+    timings = json.loads(output.strip().splitlines()[-1])
+    # Process start to first response, including interpreter startup and the idle wait
+    timings['total'] = total
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--idle', type=float, default=0.0,
+                        help="seconds between the server listening and the first request")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.idle)
+        return
+
+    print(f"{'config':<8} {'import s':>9} {'ready s':>9} {'first req s':>12} {'total s':>9}   (medians of {args.runs})")
+    for name, warmup in (('lazy', False), ('warmup', True)):
+        runs = [run_once(warmup, args.idle) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print(f"{name:<8} {median['import']:9.3f} {median['ready']:9.3f} "
+              f"{median['first_request']:12.3f} {median['total']:9.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# This file makes the batch directory a Python package
+from .runner import BatchRunner, completed_record_ids, parse_jsonl, record_id
@@ -0,0 +1,142 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import hashlib
+import json
+import logging
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+def record_id(record: Dict[str, Any]) -> str:
+    """Stable id of a batch record: its "id" field, or a hash of topic, depth and model."""
+    if record.get('id') is not None:
+        return str(record['id'])
+    topic = ' '.join(str(record.get('topic', '')).lower().split())
+    material = json.dumps([topic, str(record.get('depth', '')).lower(), record.get('model', '')])
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()[:16]
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse JSONL records, yielding {"invalid": reason} placeholders for malformed lines."""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {'id': f"line-{line_number}", 'invalid': f"Invalid JSON on line {line_number}: {e.msg}"}
+            continue
+        if not isinstance(record, dict):
+            yield {'id': f"line-{line_number}", 'invalid': f"Line {line_number} is not a JSON object"}
+            continue
+        yield record
+
+def completed_record_ids(lines: Iterable[str]) -> Set[str]:
+    """Ids of records already completed in a previous batch output, so a rerun can skip them."""
+    completed = set()
+    for line in lines:
+        try:
+            output = json.loads(line)
+        except json.JSONDecodeError:
+            # A run killed mid-write can leave a truncated last line
+            continue
+        if isinstance(output, dict) and output.get('status') == 'completed':
+            completed.add(output.get('id'))
+    return completed
+
+class BatchRunner:
+    """Runs batch research records with bounded concurrency, overall and per provider.
+
+    Records are queued per provider and dispatched round-robin across providers
+    that have a free slot, so a backlog for one provider never holds up the
+    others. Outputs are yielded as records complete, not in input order.
+    """
+
+    def __init__(self, run_one: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 provider_of: Callable[[Dict[str, Any]], str],
+                 validate: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+                 max_concurrency: int = 4, per_provider_concurrency: int = 2):
+        """
+        Args:
+            run_one: Runs one record and returns its research response; raises on failure
+            provider_of: Provider a record will be sent to
+            validate: Optional check returning an error message for records that cannot run
+            max_concurrency: Records in flight at once across all providers
+            per_provider_concurrency: Records in flight at once per provider
+        """
+        self.run_one = run_one
+        self.provider_of = provider_of
+        self.validate = validate
+        self.max_concurrency = max_concurrency
+        self.per_provider_concurrency = per_provider_concurrency
+
+    def _run_record(self, rid: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.time()
+        output = {'id': rid, 'topic': record.get('topic'), 'depth': record.get('depth'), 'model': record.get('model')}
+        try:
+            output['result'] = self.run_one(record)
+            output['status'] = 'completed'
+        except Exception as e:
+            logger.warning(f"Batch record {rid} failed: {str(e)}")
+            output['status'] = 'failed'
+            output['error'] = str(e)
+        output['duration'] = time.time() - start
+        return output
+
+    def run(self, records: Iterable[Dict[str, Any]], skip: Optional[Set[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run records and yield one output per record as it finishes.
+
+        Args:
+            records: Parsed batch records (see parse_jsonl)
+            skip: Record ids to skip, e.g. those completed by an earlier run
+
+        Yields:
+            Output dicts with id, topic, depth, model, status ("completed",
+            "failed" or "invalid"), duration and result or error
+        """
+        skip = skip or set()
+        queues: Dict[str, deque] = {}
+        seen: Set[str] = set()
+        skipped = 0
+        for record in records:
+            rid = record_id(record)
+            error = record.get('invalid') or (self.validate(record) if self.validate else None)
+            if error:
+                yield {'id': rid, 'topic': record.get('topic'), 'status': 'invalid', 'error': error}
+                continue
+            if rid in skip or rid in seen:
+                skipped += 1
+                continue
+            seen.add(rid)
+            queues.setdefault(self.provider_of(record), deque()).append((rid, record))
+        if skipped:
+            logger.info(f"Skipping {skipped} batch records already completed or repeated")
+
+        in_flight = {provider: 0 for provider in queues}
+        providers: List[str] = list(queues)
+        futures: Dict[Future, str] = {}
+        turn = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="batch") as executor:
+            while futures or any(queues.values()):
+                # Fill free slots, taking providers in turn
+                while len(futures) < self.max_concurrency:
+                    ready = [
+                        p for p in providers
+                        if queues[p] and in_flight[p] < self.per_provider_concurrency
+                    ]
+                    if not ready:
+                        break
+                    provider = ready[turn % len(ready)]
+                    turn += 1
+                    rid, record = queues[provider].popleft()
+                    in_flight[provider] += 1
+                    futures[executor.submit(self._run_record, rid, record)] = provider
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight[futures.pop(future)] -= 1
+                    yield future.result()
@@ -0,0 +1,2 @@
+# This file makes the cache directory a Python package
+from .backends import CacheBackend, MemoryCache, SQLiteCache, TieredCache, create_cache
@@ -0,0 +1,352 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CacheBackend(ABC):
+    """Abstract base class for key/value caches with per-entry TTL.
+
+    Values must be JSON-serializable so every backend can store them.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expired entry."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value. ttl is in seconds; None uses the backend default."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present."""
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current size."""
+        pass
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for the event loop; runs in a worker thread unless the backend never blocks."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """set() for the event loop; runs in a worker thread unless the backend never blocks."""
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def _expires_at(self, ttl: Optional[float], default_ttl: Optional[float]) -> Optional[float]:
+        ttl = default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU cache."""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_until(key, value, self._expires_at(ttl, self.default_ttl))
+
+    async def aget(self, key: str) -> Optional[Any]:
+        # A dict lookup under a short lock; not worth a thread hop
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    def set_until(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Store a value with an absolute expiry timestamp."""
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache backed by SQLite that survives restarts.
+
+    Entries are evicted least-recently-used first once the stored values
+    exceed max_bytes. The entry count and stored bytes are kept in a meta
+    table by triggers, so checking the budget on every write and serving
+    stats() never scan the cache, and processes sharing the file agree on them.
+    """
+
+    # LRU candidates read per eviction query
+    EVICT_BATCH = 64
+
+    def __init__(self, path: str, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Seeded from the table once, for files written before the meta table existed
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_meta (name, value) SELECT 'entries', COUNT(*) FROM cache"
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_meta (name, value) SELECT 'bytes', COALESCE(SUM(size), 0) FROM cache"
+        )
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+                UPDATE cache_meta SET value = value + 1 WHERE name = 'entries';
+                UPDATE cache_meta SET value = value + NEW.size WHERE name = 'bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+                UPDATE cache_meta SET value = value - 1 WHERE name = 'entries';
+                UPDATE cache_meta SET value = value - OLD.size WHERE name = 'bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS cache_resize AFTER UPDATE OF size ON cache BEGIN
+                UPDATE cache_meta SET value = value - OLD.size + NEW.size WHERE name = 'bytes';
+            END;
+        """)
+        self._conn.commit()
+
+    def _meta(self, name: str) -> int:
+        return self._conn.execute("SELECT value FROM cache_meta WHERE name = ?", (name,)).fetchone()[0]
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_with_expiry(key)[0]
+
+    def get_with_expiry(self, key: str) -> tuple:
+        """Return (value, expires_at) for a key, or (None, None) on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None, None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self._expirations += 1
+                self._misses += 1
+                return None, None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self._hits += 1
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        payload = json.dumps(value)
+        expires_at = self._expires_at(ttl, self.default_ttl)
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the triggers
+            self._conn.execute(
+                "INSERT INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, payload, len(payload), expires_at, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """
+        Once over max_bytes, drop expired entries, then LRU entries in batches
+        until back under it. Caller holds the lock.
+        """
+        total = self._meta('bytes')
+        if total <= self.max_bytes:
+            return
+        cursor = self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        self._expirations += max(cursor.rowcount, 0)
+
+        total = self._meta('bytes')
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT ?", (self.EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+            self._evictions += len(victims)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._meta('entries'), self._meta('bytes')
+            return {
+                'backend': 'sqlite',
+                'path': self.path,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes
+            }
+
+class TieredCache(CacheBackend):
+    """In-memory LRU tier in front of a persistent SQLite tier.
+
+    Disk hits are promoted into memory with their remaining TTL.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: SQLiteCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        value, expires_at = self.disk.get_with_expiry(key)
+        if value is not None:
+            self.memory.set_until(key, value, expires_at)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = self._expires_at(ttl, self.disk.default_ttl)
+        self.memory.set_until(key, value, expires_at)
+        self.disk.set(key, value, ttl if ttl is not None else self.disk.default_ttl)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Memory hits are served on the event loop; only the disk tier runs in a worker thread."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.memory.set_until(key, value, self._expires_at(ttl, self.disk.default_ttl))
+        await asyncio.to_thread(self.disk.set, key, value, ttl if ttl is not None else self.disk.default_ttl)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'tiered',
+            'memory': self.memory.stats(),
+            'disk': self.disk.stats()
+        }
+
+def create_cache(backend: str, path: str, max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = None) -> CacheBackend:
+    """
+    Build a cache backend by name.
+
+    Args:
+        backend: One of 'memory', 'disk' or 'tiered'
+        path: SQLite file used by the disk and tiered backends
+        max_entries: Size of the in-memory LRU
+        max_bytes: Size of the on-disk store before LRU eviction
+        default_ttl: Seconds to keep entries (None keeps them until evicted)
+
+    Returns:
+        A CacheBackend instance
+    """
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    if backend == 'disk':
+        return SQLiteCache(path, max_bytes=max_bytes, default_ttl=default_ttl)
+    if backend == 'tiered':
+        return TieredCache(
+            memory=MemoryCache(max_entries=max_entries, default_ttl=default_ttl),
+            disk=SQLiteCache(path, max_bytes=max_bytes, default_ttl=default_ttl)
+        )
+    raise ValueError(f"Unsupported cache backend: {backend}. Choose from: memory, disk, tiered")
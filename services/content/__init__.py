@@ -0,0 +1,3 @@
+# This file makes the content directory a Python package
+from .extract import TextExtractor, extract_text
+from .fetcher import ContentFetcher, check_public_url
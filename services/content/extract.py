@@ -0,0 +1,82 @@
+from typing import List, Optional
+from html.parser import HTMLParser
+import re
+
+# Elements whose text is never main content
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'nav', 'header', 'footer', 'aside', 'form', 'iframe'}
+
+# Elements that end a block of text
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'li', 'ul', 'ol', 'br', 'tr', 'table', 'blockquote',
+    'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dd', 'dt', 'figcaption'
+}
+
+# Void elements never get an end tag, so they must not open a skipped region
+VOID_TAGS = {'br', 'img', 'hr', 'input', 'meta', 'link', 'source', 'wbr'}
+
+class TextExtractor(HTMLParser):
+    """Incremental main-text extractor.
+
+    Feed HTML in chunks as it downloads; text outside navigation, scripts and
+    other boilerplate is collected block by block. Blocks shorter than
+    min_block_chars (menus, buttons, bylines) are dropped, and `full` turns
+    True once max_chars of text has been collected so the download can stop.
+    """
+
+    def __init__(self, max_chars: int = 8000, min_block_chars: int = 40):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.min_block_chars = min_block_chars
+        self.title: Optional[str] = None
+        self._blocks: List[str] = []
+        self._chars = 0
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    @property
+    def full(self) -> bool:
+        return self._chars >= self.max_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS and tag not in VOID_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == 'title':
+            self._in_title = False
+        if tag in BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title = (self.title or '') + data.strip()
+        elif not self._skip_depth and not self.full:
+            self._current.append(data)
+
+    def _end_block(self) -> None:
+        if not self._current:
+            return
+        block = re.sub(r'\s+', ' ', ''.join(self._current)).strip()
+        self._current = []
+        if len(block) >= self.min_block_chars and not self.full:
+            self._blocks.append(block)
+            self._chars += len(block)
+
+    def text(self) -> str:
+        """Extracted text so far, one block per paragraph, capped at max_chars."""
+        self._end_block()
+        return '\n\n'.join(self._blocks)[:self.max_chars]
+
+def extract_text(html: str, max_chars: int = 8000) -> str:
+    """Extract main text from a complete HTML document."""
+    extractor = TextExtractor(max_chars=max_chars)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
@@ -0,0 +1,272 @@
+from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+from urllib.parse import urljoin, urlsplit
+import codecs
+import ipaddress
+import logging
+import re
+import socket
+import threading
+import time
+import requests
+from requests.compat import chardet
+from services.cache import CacheBackend
+from services.search import SearchResult
+from services.throttling import SingleFlight
+from .extract import TextExtractor
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+USER_AGENT = "Mozilla/5.0 (compatible; ResearchAgent/1.0)"
+
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+def check_public_url(url: str) -> None:
+    """
+    Raise ValueError unless url is http(s) and its host resolves only to
+    public addresses, so search results and redirects cannot reach loopback,
+    link-local (cloud metadata), private or reserved networks.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"Refusing to fetch non-HTTP URL: {url}")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or 80, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise ValueError(f"Cannot resolve {parts.hostname}: {str(e)}") from None
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split('%')[0])
+        if getattr(address, 'ipv4_mapped', None):
+            address = address.ipv4_mapped
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f"Refusing to fetch {parts.hostname}: it resolves to non-public address {address}")
+
+def sniff_encoding(head: bytes) -> str:
+    """
+    Guess the encoding of a page whose Content-Type names no charset, from
+    its first bytes: a <meta charset> declaration, then valid UTF-8, then
+    statistical detection, falling back to UTF-8.
+    """
+    match = META_CHARSET.search(head[:4096])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    try:
+        # Not final, so a multi-byte character split at the end of head is fine
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    return chardet.detect(head).get('encoding') or 'utf-8'
+
+class ContentFetcher:
+    """Downloads source pages concurrently and extracts their main text.
+
+    Pages are streamed and parsed as they arrive, so a download stops as soon
+    as enough text has been extracted or max_bytes have been read. Extracted
+    text is cached by URL together with the page's ETag and Last-Modified;
+    once an entry is older than revalidate_after it is refreshed with a
+    conditional request, and a 304 reuses the cached text.
+
+    Redirects are followed by hand so every hop is checked against
+    check_public_url() unless allow_private is set.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, cache: Optional[CacheBackend] = None,
+                 max_workers: int = 8, per_host: int = 2, timeout: float = 10.0, deadline: float = 15.0,
+                 max_bytes: int = 2 * 1024 * 1024, max_chars: int = 8000,
+                 revalidate_after: float = 3600.0, cache_ttl: float = 7 * 86400.0,
+                 max_redirects: int = 5, allow_private: bool = False):
+        """
+        Args:
+            session: Shared HTTP session (and connection pool) to fetch with
+            cache: Optional cache for extracted text and validators
+            max_workers: Pages downloaded at once
+            per_host: Pages downloaded at once from the same host
+            timeout: Seconds one page may take in total, across redirects,
+                connecting and reading the body
+            deadline: Seconds fetch_all() waits before giving up on slow pages
+            max_bytes: Bytes read per page before the download is cut off
+            max_chars: Characters of text kept per page
+            revalidate_after: Seconds a cached page is used without revalidation
+            cache_ttl: Seconds a cached page is kept for revalidation
+            max_redirects: Redirect hops followed per page
+            allow_private: Fetch hosts on loopback and private networks
+                (for tests and intranet deployments)
+        """
+        self.session = session or requests.Session()
+        self.cache = cache
+        self.per_host = per_host
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.revalidate_after = revalidate_after
+        self.cache_ttl = cache_ttl
+        self.max_redirects = max_redirects
+        self.allow_private = allow_private
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="content-fetch")
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # Requests that surface a page already being downloaded wait for that download
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._counters = {'fetched': 0, 'cache_hits': 0, 'revalidated': 0, 'failed': 0, 'truncated': 0, 'bytes': 0}
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _cache_key(self, url: str) -> str:
+        return f"content:{url}"
+
+    def _remaining(self, url: str, stop_at: float) -> float:
+        remaining = stop_at - time.monotonic()
+        if remaining <= 0:
+            raise requests.Timeout(f"Fetching {url} took longer than {self.timeout}s")
+        return remaining
+
+    def _open(self, url: str, headers: Dict[str, str], stop_at: float) -> requests.Response:
+        """GET a page, following redirects only to hosts that pass check_public_url()."""
+        for _ in range(self.max_redirects + 1):
+            if not self.allow_private:
+                check_public_url(url)
+            response = self.session.get(url, headers=headers, stream=True, allow_redirects=False,
+                                        timeout=self._remaining(url, stop_at))
+            if not response.is_redirect:
+                return response
+            response.close()
+            url = urljoin(url, response.headers['Location'])
+        raise requests.TooManyRedirects(f"More than {self.max_redirects} redirects")
+
+    def _iter_body(self, response: requests.Response, url: str, stop_at: float):
+        """
+        Yield the body as it arrives, raising requests.Timeout once the page's
+        time budget is spent. Unlike iter_content(), which waits for a full
+        chunk, read1() returns whatever is available, so a server that
+        trickles bytes cannot keep the download open past the budget.
+        """
+        while True:
+            self._remaining(url, stop_at)
+            chunk = response.raw.read1(16384, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    def _download(self, url: str, cached: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Fetch and extract one page, revalidating a cached entry. Returns the entry to cache."""
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'text/html,text/plain;q=0.9'}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        with self._host_slot(url):
+            stop_at = time.monotonic() + self.timeout
+            with self._open(url, headers, stop_at) as response:
+                if response.status_code == 304 and cached is not None:
+                    self._count('revalidated')
+                    return {**cached, 'checked_at': time.time()}
+                response.raise_for_status()
+
+                content_type = response.headers.get('Content-Type', '').lower()
+                if 'html' not in content_type and 'text/plain' not in content_type:
+                    raise ValueError(f"Unsupported content type: {content_type or 'unknown'}")
+
+                decoder = None
+                extractor = TextExtractor(max_chars=self.max_chars)
+                plain_text = []
+                read = 0
+                for chunk in self._iter_body(response, url, stop_at):
+                    read += len(chunk)
+                    if decoder is None:
+                        # Without a charset, requests assumes ISO-8859-1 for text/*, which garbles UTF-8 pages
+                        encoding = response.encoding if 'charset=' in content_type else sniff_encoding(chunk)
+                        decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+                    text = decoder.decode(chunk)
+                    if 'html' in content_type:
+                        extractor.feed(text)
+                        if extractor.full:
+                            break
+                    else:
+                        plain_text.append(text)
+                        if sum(len(part) for part in plain_text) >= self.max_chars:
+                            break
+                    if read >= self.max_bytes:
+                        self._count('truncated')
+                        break
+                self._count('bytes', read)
+
+                return {
+                    'text': extractor.text() if 'html' in content_type else ''.join(plain_text)[:self.max_chars],
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'checked_at': time.time()
+                }
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Return the main text of a page, from cache when fresh, or None if it cannot be fetched."""
+        key = self._cache_key(url)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None and time.time() - cached['checked_at'] < self.revalidate_after:
+            self._count('cache_hits')
+            return cached['text']
+
+        try:
+            entry, _ = self._flight.do(url, lambda: self._download(url, cached))
+        except Exception as e:
+            self._count('failed')
+            logger.warning(f"Content fetch failed for {url}: {str(e)}")
+            # A stale copy beats no content when the page is temporarily unreachable
+            return cached['text'] if cached is not None else None
+
+        self._count('fetched')
+        if self.cache is not None:
+            self.cache.set(key, entry, ttl=self.cache_ttl)
+        return entry['text']
+
+    def fetch_result(self, result: SearchResult) -> SearchResult:
+        """Fetch one result's page and return a copy with the extracted text attached."""
+        content = self.fetch(result.url) if result.url else None
+        return replace(result, content=content or None)
+
+    def fetch_all(self, results: List[SearchResult]) -> List[SearchResult]:
+        """
+        Fetch every result's page concurrently and attach the extracted text.
+
+        Pages that fail, or are still downloading at the deadline, keep
+        content=None so their snippet is used instead.
+
+        Returns:
+            New SearchResult objects in the same order
+        """
+        futures = [self._executor.submit(self.fetch, result.url) for result in results if result.url]
+        wait(futures, timeout=self.deadline)
+        contents = iter(futures)
+        enriched = []
+        for result in results:
+            content = None
+            if result.url:
+                future = next(contents)
+                if future.done() and future.exception() is None:
+                    content = future.result()
+            enriched.append(replace(result, content=content or None))
+        return enriched
+
+    def stats(self) -> Dict[str, int]:
+        """Fetch, cache and revalidation counters."""
+        with self._lock:
+            return dict(self._counters)
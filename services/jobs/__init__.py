@@ -0,0 +1,9 @@
+# This file makes the jobs directory a Python package
+from .job_manager import AsyncJobManager, Job, JobManager
+from .scheduler import (
+    DeadlineExceededError,
+    PriorityScheduler,
+    QueueFullError,
+    SchedulingClass,
+    parse_class_options
+)
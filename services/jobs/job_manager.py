@@ -0,0 +1,281 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import logging
+import threading
+import time
+from .scheduler import DeadlineExceededError, PriorityScheduler, QueueFullError, Ticket
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+@dataclass
+class Job:
+    """State and timing of a background research job."""
+    job_id: str
+    submitted_at: float
+    status: str = 'queued'
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """Seconds spent waiting for a worker."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def run_time(self) -> Optional[float]:
+        """Seconds spent running on a worker."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queue_wait': self.queue_wait,
+            'run_time': self.run_time,
+            'result': self.result,
+            'error': self.error
+        }
+
+class _JobTracker:
+    """Job bookkeeping shared by the thread-pool and event-loop job managers."""
+
+    def __init__(self, max_workers: int, max_queue: int, max_retained: int,
+                 scheduler: Optional[PriorityScheduler] = None):
+        """
+        Initialize the job tracker.
+
+        Args:
+            max_workers: Jobs allowed to run concurrently
+            max_queue: Jobs allowed to wait for a worker before submissions are rejected
+            max_retained: Finished jobs kept for status lookups (oldest dropped first)
+            scheduler: Optional scheduler that decides which queued job starts next for
+                jobs submitted with a job_class; its slots then limit how many run
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_retained = max_retained
+        self.scheduler = scheduler
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._shed = 0
+
+    def _enqueue(self, job_id: str) -> Job:
+        """Register a queued job, or raise QueueFullError if the queue is full."""
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(f"Job queue is full ({self.max_queue} waiting)")
+            job = Job(job_id=job_id, submitted_at=time.time())
+            self._jobs[job_id] = job
+            self._queued += 1
+            self._trim()
+            return job
+
+    def _start(self, job: Job) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.started_at = time.time()
+        job.status = 'running'
+
+    def _finish(self, job: Job, result: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None) -> None:
+        if error is None:
+            job.result = result
+            job.status = 'completed'
+        else:
+            logger.error(f"Job {job.job_id} failed: {str(error)}")
+            job.error = str(error)
+            job.status = 'failed'
+        job.finished_at = time.time()
+        with self._lock:
+            self._running -= 1
+            if job.status == 'completed':
+                self._completed += 1
+            else:
+                self._failed += 1
+        logger.info(
+            f"Job {job.job_id} {job.status}: queue_wait={job.queue_wait:.2f}s run_time={job.run_time:.2f}s"
+        )
+
+    def _unqueue(self, job: Job) -> None:
+        """Forget a job whose submission was rejected after it was registered."""
+        with self._lock:
+            self._jobs.pop(job.job_id, None)
+            self._queued -= 1
+            self._rejected += 1
+
+    def _shed_job(self, job: Job, on_shed: Optional[Callable[[Job], None]]) -> None:
+        """Finish a job the scheduler dropped because its deadline passed while it was queued."""
+        job.error = "Deadline exceeded before the job could start"
+        job.status = 'shed'
+        job.finished_at = time.time()
+        with self._lock:
+            self._queued -= 1
+            self._shed += 1
+        logger.warning(f"Job {job.job_id} shed after {job.finished_at - job.submitted_at:.2f}s in queue")
+        if on_shed is not None:
+            on_shed(job)
+
+    def _trim(self) -> None:
+        """Drop the oldest finished jobs beyond max_retained. Caller holds the lock."""
+        excess = len(self._jobs) - self.max_retained
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status in ('completed', 'failed', 'shed'):
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and outcome counters."""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queued': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'shed': self._shed
+            }
+
+class JobManager(_JobTracker):
+    """Runs research jobs on a bounded worker pool with a bounded queue."""
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, max_retained: int = 1000,
+                 scheduler: Optional[PriorityScheduler] = None):
+        if scheduler is not None:
+            # Admitted jobs must never wait for a thread behind jobs the scheduler ranked lower
+            max_workers = max(max_workers, scheduler.max_concurrency)
+        super().__init__(max_workers=max_workers, max_queue=max_queue, max_retained=max_retained,
+                         scheduler=scheduler)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research-job")
+
+    def submit(self, job_id: str, fn: Callable[..., Dict[str, Any]], *args, job_class: Optional[str] = None,
+               on_shed: Optional[Callable[[Job], None]] = None, **kwargs) -> Job:
+        """
+        Queue fn(*args, **kwargs) to run as a job.
+
+        With a scheduler and a job_class the job waits in that class's queue;
+        if its deadline passes first it is shed and on_shed(job) is called
+        instead of fn.
+
+        Raises:
+            QueueFullError: If max_queue jobs (or the class's limit) are already waiting
+        """
+        job = self._enqueue(job_id)
+        if self.scheduler is None or job_class is None:
+            self._executor.submit(self._run, job, fn, args, kwargs)
+            return job
+        try:
+            self.scheduler.submit(
+                job_class,
+                on_start=lambda ticket: self._executor.submit(self._run, job, fn, args, kwargs, ticket),
+                on_shed=lambda ticket: self._shed_job(job, on_shed)
+            )
+        except QueueFullError:
+            self._unqueue(job)
+            raise
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Dict[str, Any]], args: tuple, kwargs: dict,
+             ticket: Optional[Ticket] = None) -> None:
+        self._start(job)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
+        finally:
+            if ticket is not None:
+                self.scheduler.release(ticket)
+
+class AsyncJobManager(_JobTracker):
+    """Runs research jobs as tasks on the running event loop with the same
+    concurrency and queue limits as JobManager."""
+
+    def __init__(self, max_workers: int = 64, max_queue: int = 256, max_retained: int = 1000,
+                 scheduler: Optional[PriorityScheduler] = None):
+        super().__init__(max_workers=max_workers, max_queue=max_queue, max_retained=max_retained,
+                         scheduler=scheduler)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+
+    def submit(self, job_id: str, fn: Callable[..., Awaitable[Dict[str, Any]]], *args,
+               job_class: Optional[str] = None, on_shed: Optional[Callable[[Job], None]] = None, **kwargs) -> Job:
+        """
+        Schedule the coroutine fn(*args, **kwargs) as a job. Must be called on the event loop.
+
+        job_class and on_shed are as for JobManager.submit().
+
+        Raises:
+            QueueFullError: If max_queue jobs (or the class's limit) are already waiting
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        job = self._enqueue(job_id)
+        ticket = None
+        if self.scheduler is not None and job_class is not None:
+            try:
+                ticket = self.scheduler.submit(job_class)
+            except QueueFullError:
+                self._unqueue(job)
+                raise
+        task = asyncio.create_task(self._run(job, fn, args, kwargs, ticket, on_shed))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: Job, fn: Callable[..., Awaitable[Dict[str, Any]]], args: tuple, kwargs: dict,
+                   ticket: Optional[Ticket] = None, on_shed: Optional[Callable[[Job], None]] = None) -> None:
+        if ticket is None:
+            async with self._semaphore:
+                await self._execute(job, fn, args, kwargs)
+            return
+        try:
+            await self.scheduler.await_ticket(ticket)
+        except DeadlineExceededError:
+            self._shed_job(job, on_shed)
+            return
+        try:
+            await self._execute(job, fn, args, kwargs)
+        finally:
+            self.scheduler.release(ticket)
+
+    async def _execute(self, job: Job, fn: Callable[..., Awaitable[Dict[str, Any]]], args: tuple, kwargs: dict) -> None:
+        self._start(job)
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
@@ -0,0 +1,328 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+import asyncio
+import logging
+import threading
+import time
+from services.metrics import metrics
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    'research_queue_wait_seconds',
+    'Time research requests wait for a scheduler slot',
+    labels=('job_class',)
+)
+SHED_TOTAL = metrics.counter(
+    'research_shed_total',
+    'Research requests shed because their deadline passed before they could start',
+    labels=('job_class',)
+)
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another submission."""
+    pass
+
+class DeadlineExceededError(Exception):
+    """Raised when work is shed because its deadline passed before a slot was free."""
+    pass
+
+@dataclass
+class SchedulingClass:
+    """Scheduling policy for one class of work, e.g. a research depth."""
+    # Share of slots relative to the other classes when all of them have work waiting
+    weight: float = 1.0
+    # Slots this class may hold at once (None: only the scheduler-wide limit applies)
+    max_concurrency: Optional[int] = None
+    # Seconds work may wait for a slot before it is shed (None: wait indefinitely)
+    deadline: Optional[float] = None
+    # Work allowed to wait in this class before submissions are rejected (None: unbounded)
+    max_queue: Optional[int] = None
+
+def parse_class_options(spec: str) -> Dict[str, float]:
+    """Parse "brief=4,detailed=2" into per-class values."""
+    options = {}
+    for part in spec.split(','):
+        name, _, value = part.partition('=')
+        if name.strip() and value.strip():
+            options[name.strip().lower()] = float(value)
+    return options
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class Ticket:
+    """A unit of work waiting for, or holding, a scheduler slot."""
+
+    def __init__(self, job_class: str, deadline: Optional[float],
+                 on_start: Optional[Callable[['Ticket'], None]], on_shed: Optional[Callable[['Ticket'], None]]):
+        self.job_class = job_class
+        self.enqueued_at = time.monotonic()
+        # Monotonic time after which the ticket is shed instead of started
+        self.deadline = None if deadline is None else self.enqueued_at + deadline
+        self.started_at: Optional[float] = None
+        self.state = 'queued'
+        self.on_start = on_start
+        self.on_shed = on_shed
+        # Set once the ticket is started or shed; async waiters are woken with it
+        self.decided = threading.Event()
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now >= self.deadline
+
+class _ClassState:
+    """Queue, counters and recent timings of one scheduling class."""
+
+    def __init__(self, name: str, policy: SchedulingClass, window: int):
+        self.name = name
+        self.policy = policy
+        self.queue: deque = deque()
+        self.running = 0
+        # Stride-scheduling pass: advanced by 1/weight each time the class is given a slot
+        self.pass_value = 0.0
+        self.admitted = 0
+        self.completed = 0
+        self.shed = 0
+        self.rejected = 0
+        self.queue_waits: deque = deque(maxlen=window)
+        self.run_times: deque = deque(maxlen=window)
+
+    def can_start(self) -> bool:
+        cap = self.policy.max_concurrency
+        return bool(self.queue) and (cap is None or self.running < cap)
+
+def _percentile(values: deque, q: float) -> Optional[float]:
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+class PriorityScheduler:
+    """Admits work to a fixed number of slots with a separate queue per class.
+
+    Waiting classes share free slots in proportion to their weights (stride
+    scheduling), subject to each class's concurrency cap, so a burst in one
+    class cannot starve the others. Work still queued when its class deadline
+    passes is shed rather than started late. Callers either block for a slot
+    (slot(), aslot()) or pass callbacks to submit() and release the ticket
+    when their work is done.
+    """
+
+    def __init__(self, classes: Dict[str, SchedulingClass], max_concurrency: int = 8, window: int = 200):
+        """
+        Initialize the scheduler.
+
+        Args:
+            classes: Scheduling policy per class name
+            max_concurrency: Slots shared by all classes
+            window: Recent admissions used for the queue wait and run time percentiles
+        """
+        for name, policy in classes.items():
+            if policy.weight <= 0:
+                raise ValueError(f"Invalid weight for scheduling class {name}: {policy.weight}. Must be positive")
+        self.max_concurrency = max_concurrency
+        self._classes = {name: _ClassState(name, policy, window) for name, policy in classes.items()}
+        self._lock = threading.Lock()
+        self._running = 0
+        # Pass of the most recently admitted class; idle classes rejoin here, not with banked credit
+        self._virtual_time = 0.0
+
+    def _state(self, job_class: str) -> _ClassState:
+        state = self._classes.get(job_class)
+        if state is None:
+            raise ValueError(f"Invalid scheduling class: {job_class}. Choose from: {', '.join(self._classes)}")
+        return state
+
+    def submit(self, job_class: str, on_start: Optional[Callable[[Ticket], None]] = None,
+               on_shed: Optional[Callable[[Ticket], None]] = None) -> Ticket:
+        """
+        Queue work in a class. on_start is called (possibly right away, on this
+        thread) once the work holds a slot; on_shed if its deadline passes first.
+        A started ticket must be passed to release() when the work finishes.
+
+        Raises:
+            QueueFullError: If the class already has max_queue tickets waiting
+        """
+        state = self._state(job_class)
+        with self._lock:
+            if state.policy.max_queue is not None and len(state.queue) >= state.policy.max_queue:
+                state.rejected += 1
+                raise QueueFullError(f"Scheduler queue for {job_class} is full ({state.policy.max_queue} waiting)")
+            ticket = Ticket(job_class, state.policy.deadline, on_start, on_shed)
+            if not state.queue and not state.running:
+                state.pass_value = max(state.pass_value, self._virtual_time)
+            state.queue.append(ticket)
+            started, shed = self._dispatch()
+        self._notify(started, shed)
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Free a started ticket's slot and start the next waiting work."""
+        state = self._state(ticket.job_class)
+        with self._lock:
+            if ticket.state != 'running':
+                return
+            ticket.state = 'finished'
+            state.running -= 1
+            state.completed += 1
+            state.run_times.append(time.monotonic() - ticket.started_at)
+            self._running -= 1
+            started, shed = self._dispatch()
+        self._notify(started, shed)
+
+    def withdraw(self, ticket: Ticket) -> bool:
+        """Shed a ticket that is still queued. Returns False if it already started or was shed."""
+        state = self._state(ticket.job_class)
+        with self._lock:
+            if ticket.state != 'queued':
+                return False
+            state.queue.remove(ticket)
+            self._mark_shed(state, ticket)
+        self._notify([], [ticket])
+        return True
+
+    def _mark_shed(self, state: _ClassState, ticket: Ticket) -> None:
+        """Caller holds the lock."""
+        ticket.state = 'shed'
+        state.shed += 1
+        SHED_TOTAL.inc(job_class=state.name)
+
+    def _dispatch(self) -> Tuple[List[Ticket], List[Ticket]]:
+        """Shed expired tickets and fill free slots. Caller holds the lock; returns (started, shed)."""
+        now = time.monotonic()
+        shed = []
+        for state in self._classes.values():
+            while state.queue and state.queue[0].expired(now):
+                ticket = state.queue.popleft()
+                self._mark_shed(state, ticket)
+                shed.append(ticket)
+
+        started = []
+        while self._running < self.max_concurrency:
+            candidates = [state for state in self._classes.values() if state.can_start()]
+            if not candidates:
+                break
+            state = min(candidates, key=lambda candidate: candidate.pass_value)
+            ticket = state.queue.popleft()
+            self._virtual_time = state.pass_value
+            state.pass_value += 1.0 / state.policy.weight
+            state.running += 1
+            state.admitted += 1
+            self._running += 1
+            ticket.state = 'running'
+            ticket.started_at = now
+            wait = now - ticket.enqueued_at
+            state.queue_waits.append(wait)
+            QUEUE_WAIT_SECONDS.observe(wait, job_class=state.name)
+            started.append(ticket)
+        return started, shed
+
+    def _notify(self, started: List[Ticket], shed: List[Ticket]) -> None:
+        """Run callbacks and wake waiters outside the lock."""
+        for ticket in shed:
+            logger.warning(f"Shed {ticket.job_class} work after {time.monotonic() - ticket.enqueued_at:.1f}s in queue")
+        for ticket, callback in [(ticket, ticket.on_shed) for ticket in shed] + \
+                                [(ticket, ticket.on_start) for ticket in started]:
+            with self._lock:
+                ticket.decided.set()
+                waiters, ticket.async_waiters = ticket.async_waiters, []
+            for loop, future in waiters:
+                loop.call_soon_threadsafe(_resolve, future)
+            if callback is not None:
+                try:
+                    callback(ticket)
+                except Exception as e:
+                    logger.error(f"Scheduler callback failed: {str(e)}")
+                    if ticket.state == 'running':
+                        self.release(ticket)
+
+    def wait(self, ticket: Ticket) -> None:
+        """
+        Block until a submitted ticket starts.
+
+        Raises:
+            DeadlineExceededError: If the ticket was shed instead
+        """
+        timeout = None if ticket.deadline is None else max(ticket.deadline - time.monotonic(), 0)
+        if not ticket.decided.wait(timeout) and not self.withdraw(ticket):
+            # Started or shed by another thread just as the deadline passed
+            ticket.decided.wait()
+        if ticket.state == 'shed':
+            raise DeadlineExceededError(f"{ticket.job_class} request waited too long for a free slot")
+
+    async def await_ticket(self, ticket: Ticket) -> None:
+        """Async variant of wait()."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not ticket.decided.is_set():
+                future = loop.create_future()
+                ticket.async_waiters.append((loop, future))
+            else:
+                future = None
+        if future is not None:
+            timeout = None if ticket.deadline is None else max(ticket.deadline - time.monotonic(), 0)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                if not self.withdraw(ticket):
+                    await future
+            except asyncio.CancelledError:
+                if not self.withdraw(ticket):
+                    self.release(ticket)
+                raise
+        if ticket.state == 'shed':
+            raise DeadlineExceededError(f"{ticket.job_class} request waited too long for a free slot")
+
+    @contextmanager
+    def slot(self, job_class: str) -> Iterator[Ticket]:
+        """Hold a slot in a class for the enclosed block, waiting for one first."""
+        ticket = self.submit(job_class)
+        self.wait(ticket)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, job_class: str) -> AsyncIterator[Ticket]:
+        """Async variant of slot()."""
+        ticket = self.submit(job_class)
+        await self.await_ticket(ticket)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Slot usage plus queue depth, counters and recent queue wait/run time percentiles per class."""
+        with self._lock:
+            classes = {
+                name: {
+                    'weight': state.policy.weight,
+                    'max_concurrency': state.policy.max_concurrency,
+                    'deadline': state.policy.deadline,
+                    'queued': len(state.queue),
+                    'running': state.running,
+                    'admitted': state.admitted,
+                    'completed': state.completed,
+                    'shed': state.shed,
+                    'rejected': state.rejected,
+                    'queue_wait_p50': _percentile(state.queue_waits, 50),
+                    'queue_wait_p95': _percentile(state.queue_waits, 95),
+                    'run_time_p50': _percentile(state.run_times, 50),
+                    'run_time_p95': _percentile(state.run_times, 95)
+                }
+                for name, state in self._classes.items()
+            }
+            return {
+                'max_concurrency': self.max_concurrency,
+                'running': self._running,
+                'queued': sum(len(state.queue) for state in self._classes.values()),
+                'classes': classes
+            }
@@ -1 +1,4 @@
-from .research_logger import research_logger
+from .research_logger import ResearchLogger, research_logger
+from .session_store import MemorySessionStore, SessionStore
+from .sqlite_store import SQLiteSessionStore
+from .token_buffer import TokenEventBuffer
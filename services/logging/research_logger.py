@@ -1,42 +1,189 @@
-from typing import Dict, Any, List
-from queue import Queue
-import json
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import logging
+import threading
 import time
+from .session_store import MemorySessionStore, SessionStore
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 class ResearchLogger:
-    def __init__(self):
-        self._logs: Dict[str, Queue] = {}
-        
+    """Per-session research progress events, read by /stream subscribers.
+
+    Sessions are kept by a SessionStore: in this process by default, or in a
+    store shared between worker processes (see use_store()).
+
+    The a*() and *_nowait() variants are for code on an event loop. With a
+    blocking store they run the store call on a single writer thread, so
+    events logged through them keep their order; with the in-memory store
+    they run inline.
+    """
+
+    def __init__(self, completed_ttl: float = 300, idle_timeout: float = 1800,
+                 max_events_per_session: int = 500, max_sessions: int = 10000,
+                 reaper_interval: float = 30, store: Optional[SessionStore] = None):
+        """
+        Initialize the logger.
+
+        Args:
+            completed_ttl: Seconds a session is kept after it is closed
+            idle_timeout: Seconds without new events before an open session expires
+            max_events_per_session: Events retained per session (oldest dropped first)
+            max_sessions: Sessions retained before the least recently active is evicted
+            reaper_interval: Seconds between background expiry sweeps (0 disables the reaper)
+            store: Where sessions are kept (default: in this process)
+        """
+        self.store = store or MemorySessionStore()
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self.configure(
+            completed_ttl=completed_ttl,
+            idle_timeout=idle_timeout,
+            max_events_per_session=max_events_per_session,
+            max_sessions=max_sessions,
+            reaper_interval=reaper_interval
+        )
+
+    def configure(self, completed_ttl: float, idle_timeout: float, max_events_per_session: int,
+                  max_sessions: int, reaper_interval: float) -> None:
+        """Update the retention limits. See __init__ for the meaning of each limit."""
+        with self._lock:
+            self.completed_ttl = completed_ttl
+            self.idle_timeout = idle_timeout
+            self.max_events_per_session = max_events_per_session
+            self.max_sessions = max_sessions
+            self.reaper_interval = reaper_interval
+            self.store.configure(completed_ttl, idle_timeout, max_events_per_session, max_sessions)
+
+    def use_store(self, store: SessionStore) -> None:
+        """Keep sessions in another store from now on. Call at startup, before any session exists."""
+        with self._lock:
+            store.configure(self.completed_ttl, self.idle_timeout, self.max_events_per_session, self.max_sessions)
+            self.store = store
+
     def create_session(self, session_id: str) -> None:
         """Create a new logging session."""
-        self._logs[session_id] = Queue()
-        
+        self.store.create_session(session_id)
+        with self._lock:
+            self._ensure_reaper()
+
     def log_step(self, session_id: str, step: str, details: Any = None) -> None:
-        """Log a research step with optional details."""
-        if session_id not in self._logs:
+        """Log a research step with optional details and wake any subscribers."""
+        self.store.log_step(session_id, step, details)
+
+    def close_session(self, session_id: str) -> None:
+        """Mark a session as finished so streams end once they have caught up."""
+        self.store.close_session(session_id)
+
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        """Queue a store call on the writer thread."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="research-logger-writer")
+        return self._writer.submit(fn, *args)
+
+    async def _arun(self, fn: Callable, *args: Any) -> Any:
+        if not self.store.blocking:
+            return fn(*args)
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _run_nowait(self, fn: Callable, *args: Any) -> None:
+        if not self.store.blocking:
+            fn(*args)
             return
-            
-        log_entry = {
-            'timestamp': time.time(),
-            'step': step,
-            'details': details
-        }
-        self._logs[session_id].put(log_entry)
-        
+
+        def report(future: Future) -> None:
+            if future.exception() is not None:
+                logger.error(f"Research logger write failed: {str(future.exception())}")
+
+        self._submit(fn, *args).add_done_callback(report)
+
+    async def acreate_session(self, session_id: str) -> None:
+        """Async variant of create_session()."""
+        await self._arun(self.create_session, session_id)
+
+    async def alog_step(self, session_id: str, step: str, details: Any = None) -> None:
+        """Async variant of log_step()."""
+        await self._arun(self.store.log_step, session_id, step, details)
+
+    async def aclose_session(self, session_id: str) -> None:
+        """Async variant of close_session()."""
+        await self._arun(self.store.close_session, session_id)
+
+    async def aclear_session(self, session_id: str) -> None:
+        """Async variant of clear_session()."""
+        await self._arun(self.store.clear_session, session_id)
+
+    async def astats(self) -> Dict[str, Any]:
+        """Async variant of stats()."""
+        return await self._arun(self.store.stats)
+
+    def log_step_nowait(self, session_id: str, step: str, details: Any = None) -> None:
+        """log_step() without waiting for the store, for synchronous callbacks on an event loop."""
+        self._run_nowait(self.store.log_step, session_id, step, details)
+
+    def close_session_nowait(self, session_id: str) -> None:
+        """close_session() without waiting for the store, for synchronous callbacks on an event loop."""
+        self._run_nowait(self.store.close_session, session_id)
+
     def get_logs(self, session_id: str) -> List[Dict]:
-        """Get all logs for a session and clear the queue."""
-        if session_id not in self._logs:
-            return []
-            
-        logs = []
-        while not self._logs[session_id].empty():
-            logs.append(self._logs[session_id].get())
-        return logs
-        
+        """Get the logs recorded since the previous call for this session."""
+        return self.store.get_logs(session_id)
+
+    def wait_for_logs(self, session_id: str, after_id: int = 0,
+                      timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """
+        Block until the session has events newer than after_id.
+
+        Args:
+            session_id: Session to follow
+            after_id: Id of the last event the caller has already seen
+            timeout: Seconds to wait before returning an empty list
+
+        Returns:
+            (events, finished) where finished is True once the session is closed,
+            expired or unknown and the returned events are the last ones
+        """
+        return self.store.wait_for_logs(session_id, after_id, timeout)
+
+    async def await_logs(self, session_id: str, after_id: int = 0,
+                         timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """Async variant of wait_for_logs() that waits on the event loop instead of a thread."""
+        return await self.store.await_logs(session_id, after_id, timeout)
+
     def clear_session(self, session_id: str) -> None:
         """Clear a logging session."""
-        if session_id in self._logs:
-            del self._logs[session_id]
+        self.store.clear_session(session_id)
+
+    def reap(self) -> int:
+        """Remove sessions past their completion TTL or idle timeout. Returns the number removed."""
+        expired = self.store.reap()
+        if expired:
+            logger.info(f"Expired {expired} research logging sessions")
+        return expired
+
+    def _ensure_reaper(self) -> None:
+        """Start the background reaper on first use. Caller holds the lock."""
+        if self._reaper is not None or self.reaper_interval <= 0:
+            return
+        self._reaper = threading.Thread(target=self._reap_forever, name="research-logger-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_forever(self) -> None:
+        while True:
+            time.sleep(self.reaper_interval)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Session reaper failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Gauges for live sessions and retained memory, plus expiry counters."""
+        return self.store.stats()
 
 # Global logger instance
 research_logger = ResearchLogger()
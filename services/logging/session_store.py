@@ -0,0 +1,246 @@
+from typing import Dict, Any, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+import asyncio
+import json
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class SessionStore(ABC):
+    """Storage for research session events, behind ResearchLogger.
+
+    A store keeps an ordered event list per session with increasing ids, and
+    lets readers block until events newer than an id arrive. Implementations
+    decide where sessions live: MemorySessionStore keeps them in this
+    process, SQLiteSessionStore shares them between processes on one host. A
+    networked store only has to implement these methods.
+    """
+
+    # True when calls may wait on disk or on other processes; ResearchLogger
+    # then keeps them off the event loop in its async variants
+    blocking = False
+
+    def __init__(self):
+        self.completed_ttl = 300.0
+        self.idle_timeout = 1800.0
+        self.max_events_per_session = 500
+        self.max_sessions = 10000
+
+    def configure(self, completed_ttl: float, idle_timeout: float, max_events_per_session: int,
+                  max_sessions: int) -> None:
+        """Update the retention limits. See ResearchLogger for the meaning of each limit."""
+        self.completed_ttl = completed_ttl
+        self.idle_timeout = idle_timeout
+        self.max_events_per_session = max_events_per_session
+        self.max_sessions = max_sessions
+
+    @abstractmethod
+    def create_session(self, session_id: str) -> None:
+        """Create a new session, evicting the least recently active one beyond max_sessions."""
+
+    @abstractmethod
+    def log_step(self, session_id: str, step: str, details: Any = None) -> None:
+        """Append an event to a session and wake its readers. Unknown sessions are ignored."""
+
+    @abstractmethod
+    def close_session(self, session_id: str) -> None:
+        """Mark a session as finished."""
+
+    @abstractmethod
+    def clear_session(self, session_id: str) -> None:
+        """Delete a session and its events."""
+
+    @abstractmethod
+    def get_logs(self, session_id: str) -> List[Dict]:
+        """Events recorded since the previous call for this session."""
+
+    @abstractmethod
+    def wait_for_logs(self, session_id: str, after_id: int = 0,
+                      timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """Block until events newer than after_id exist. See ResearchLogger.wait_for_logs()."""
+
+    @abstractmethod
+    async def await_logs(self, session_id: str, after_id: int = 0,
+                         timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """Async variant of wait_for_logs()."""
+
+    @abstractmethod
+    def reap(self) -> int:
+        """Remove sessions past their completion TTL or idle timeout. Returns the number removed."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Gauges for live sessions and retained events, plus expiry counters."""
+
+class _Session:
+    """Events recorded for one research session."""
+
+    def __init__(self, lock: threading.Lock):
+        self.events: deque = deque()
+        self.sizes: deque = deque()
+        self.bytes = 0
+        self.next_id = 1
+        self.read_cursor = 0
+        self.closed = False
+        self.closed_at: Optional[float] = None
+        self.last_activity = time.time()
+        # Shares the store lock so waiters of other sessions are not woken
+        self.condition = threading.Condition(lock)
+        # Futures of async subscribers, paired with the loop that owns them
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def notify(self) -> None:
+        """Wake thread and async subscribers. Caller holds the store lock."""
+        self.condition.notify_all()
+        for loop, future in self.async_waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self.async_waiters.clear()
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class MemorySessionStore(SessionStore):
+    """Sessions held in this process; readers are woken as soon as an event is logged."""
+
+    def __init__(self):
+        super().__init__()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._expired = 0
+        self._evicted = 0
+        self._dropped_events = 0
+
+    def configure(self, completed_ttl: float, idle_timeout: float, max_events_per_session: int,
+                  max_sessions: int) -> None:
+        with self._lock:
+            super().configure(completed_ttl, idle_timeout, max_events_per_session, max_sessions)
+
+    def create_session(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions[session_id] = _Session(self._lock)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                evicted.notify()
+                self._evicted += 1
+
+    def log_step(self, session_id: str, step: str, details: Any = None) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+
+            log_entry = {
+                'id': session.next_id,
+                'timestamp': time.time(),
+                'step': step,
+                'details': details
+            }
+            size = len(json.dumps(log_entry, default=str))
+            session.next_id += 1
+            session.events.append(log_entry)
+            session.sizes.append(size)
+            session.bytes += size
+            while len(session.events) > self.max_events_per_session:
+                session.events.popleft()
+                session.bytes -= session.sizes.popleft()
+                self._dropped_events += 1
+
+            session.last_activity = log_entry['timestamp']
+            self._sessions.move_to_end(session_id)
+            session.notify()
+
+    def close_session(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.closed = True
+                session.closed_at = time.time()
+                session.notify()
+
+    def get_logs(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            logs = [log for log in session.events if log['id'] > session.read_cursor]
+            if logs:
+                session.read_cursor = logs[-1]['id']
+            return logs
+
+    def wait_for_logs(self, session_id: str, after_id: int = 0,
+                      timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    return [], True
+                logs = [log for log in session.events if log['id'] > after_id]
+                if logs or session.closed:
+                    return logs, session.closed
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return [], False
+                session.condition.wait(remaining)
+
+    async def await_logs(self, session_id: str, after_id: int = 0,
+                         timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is None:
+                    return [], True
+                logs = [log for log in session.events if log['id'] > after_id]
+                if logs or session.closed:
+                    return logs, session.closed
+                waiter = (loop, loop.create_future())
+                session.async_waiters.append(waiter)
+
+            remaining = None if deadline is None else deadline - loop.time()
+            try:
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if waiter in session.async_waiters:
+                        session.async_waiters.remove(waiter)
+                return [], False
+
+    def clear_session(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                session.notify()
+
+    def reap(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [
+                session_id for session_id, session in self._sessions.items()
+                if (session.closed and now - session.closed_at > self.completed_ttl)
+                or (not session.closed and now - session.last_activity > self.idle_timeout)
+            ]
+            for session_id in expired:
+                self._sessions.pop(session_id).notify()
+            self._expired += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'live_sessions': len(self._sessions),
+                'open_sessions': sum(1 for session in self._sessions.values() if not session.closed),
+                'retained_events': sum(len(session.events) for session in self._sessions.values()),
+                'retained_bytes': sum(session.bytes for session in self._sessions.values()),
+                'expired_sessions': self._expired,
+                'evicted_sessions': self._evicted,
+                'dropped_events': self._dropped_events
+            }
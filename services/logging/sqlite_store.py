@@ -0,0 +1,232 @@
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from .session_store import SessionStore
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a SQLite database in WAL mode, shared by every process that opens it.
+
+    A /stream request can therefore be served by a different worker process
+    than the one running the research. Readers in the process that logged an
+    event are woken immediately; readers in other processes see it on their
+    next poll, within poll_interval seconds.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, poll_interval: float = 0.05):
+        """
+        Args:
+            path: SQLite database file; every worker must use the same path
+            poll_interval: Seconds between checks for events logged by other processes
+        """
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        # Wakes readers in this process when an event is logged here
+        self._changed = threading.Condition(threading.Lock())
+        self._read_cursors: Dict[str, int] = {}
+        self._expired = 0
+        self._evicted = 0
+        self._dropped_events = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode; writes take explicit BEGIN IMMEDIATE transactions
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, next_id INTEGER NOT NULL, last_activity REAL NOT NULL, "
+            "closed_at REAL, events INTEGER NOT NULL DEFAULT 0, bytes INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "session_id TEXT NOT NULL, id INTEGER NOT NULL, timestamp REAL NOT NULL, step TEXT NOT NULL, "
+            "details TEXT, size INTEGER NOT NULL, PRIMARY KEY (session_id, id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_activity ON sessions (last_activity)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Serialize writers across threads and processes."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _notify(self) -> None:
+        with self._changed:
+            self._changed.notify_all()
+
+    def _delete(self, conn: sqlite3.Connection, session_ids: List[str]) -> None:
+        for session_id in session_ids:
+            conn.execute("DELETE FROM events WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._read_cursors.pop(session_id, None)
+
+    def create_session(self, session_id: str) -> None:
+        with self._transaction() as conn:
+            self._delete(conn, [session_id])
+            conn.execute(
+                "INSERT INTO sessions (session_id, next_id, last_activity) VALUES (?, 1, ?)",
+                (session_id, time.time())
+            )
+            surplus = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_sessions
+            if surplus > 0:
+                evicted = [row[0] for row in conn.execute(
+                    "SELECT session_id FROM sessions ORDER BY last_activity LIMIT ?", (surplus,)
+                )]
+                self._delete(conn, evicted)
+                self._evicted += len(evicted)
+        self._notify()
+
+    def log_step(self, session_id: str, step: str, details: Any = None) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT next_id FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return
+            event_id = row[0]
+            payload = json.dumps(details, default=str)
+            size = len(json.dumps({'id': event_id, 'timestamp': now, 'step': step, 'details': details}, default=str))
+            conn.execute(
+                "INSERT INTO events (session_id, id, timestamp, step, details, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, event_id, now, step, payload, size)
+            )
+            # Drop the oldest events beyond the per-session cap
+            cutoff = event_id - self.max_events_per_session
+            dropped_events, dropped_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM events WHERE session_id = ? AND id <= ?",
+                (session_id, cutoff)
+            ).fetchone()
+            if dropped_events:
+                conn.execute("DELETE FROM events WHERE session_id = ? AND id <= ?", (session_id, cutoff))
+                self._dropped_events += dropped_events
+            conn.execute(
+                "UPDATE sessions SET next_id = ?, last_activity = ?, events = events + ?, bytes = bytes + ? "
+                "WHERE session_id = ?",
+                (event_id + 1, now, 1 - dropped_events, size - dropped_bytes, session_id)
+            )
+        self._notify()
+
+    def close_session(self, session_id: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE sessions SET closed_at = ? WHERE session_id = ? AND closed_at IS NULL",
+                (time.time(), session_id)
+            )
+        self._notify()
+
+    def clear_session(self, session_id: str) -> None:
+        with self._transaction() as conn:
+            self._delete(conn, [session_id])
+        self._notify()
+
+    def _read(self, session_id: str, after_id: int) -> Optional[Tuple[List[Dict], bool]]:
+        """(events after after_id, closed), or None when the session does not exist."""
+        with self._lock:
+            session = self._conn.execute(
+                "SELECT closed_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if session is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT id, timestamp, step, details FROM events WHERE session_id = ? AND id > ? ORDER BY id",
+                (session_id, after_id)
+            ).fetchall()
+        logs = [
+            {'id': event_id, 'timestamp': timestamp, 'step': step, 'details': json.loads(details)}
+            for event_id, timestamp, step, details in rows
+        ]
+        return logs, session[0] is not None
+
+    def get_logs(self, session_id: str) -> List[Dict]:
+        result = self._read(session_id, self._read_cursors.get(session_id, 0))
+        if result is None:
+            return []
+        logs = result[0]
+        if logs:
+            self._read_cursors[session_id] = logs[-1]['id']
+        return logs
+
+    def wait_for_logs(self, session_id: str, after_id: int = 0,
+                      timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            result = self._read(session_id, after_id)
+            if result is None:
+                return [], True
+            logs, closed = result
+            if logs or closed:
+                return logs, closed
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return [], False
+            with self._changed:
+                self._changed.wait(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+    async def await_logs(self, session_id: str, after_id: int = 0,
+                         timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            # _read() waits for the store lock, which writers hold through BEGIN IMMEDIATE
+            result = await asyncio.to_thread(self._read, session_id, after_id)
+            if result is None:
+                return [], True
+            logs, closed = result
+            if logs or closed:
+                return logs, closed
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return [], False
+            await asyncio.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+    def reap(self) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions WHERE (closed_at IS NOT NULL AND closed_at < ?) "
+                "OR (closed_at IS NULL AND last_activity < ?)",
+                (now - self.completed_ttl, now - self.idle_timeout)
+            )]
+            self._delete(conn, expired)
+            self._expired += len(expired)
+        if expired:
+            self._notify()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            live, open_sessions, events, retained_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(closed_at IS NULL), 0), COALESCE(SUM(events), 0), "
+                "COALESCE(SUM(bytes), 0) FROM sessions"
+            ).fetchone()
+        return {
+            'live_sessions': live,
+            'open_sessions': open_sessions,
+            'retained_events': events,
+            'retained_bytes': retained_bytes,
+            # Counters are for this process; the gauges above cover every process
+            'expired_sessions': self._expired,
+            'evicted_sessions': self._evicted,
+            'dropped_events': self._dropped_events
+        }
@@ -0,0 +1,54 @@
+from typing import Optional
+import time
+from .research_logger import ResearchLogger
+
+class TokenEventBuffer:
+    """Coalesces streamed LLM chunks into research logger events.
+
+    Providers emit very small chunks; batching them by time and size keeps the
+    SSE channel responsive without filling the session's event budget.
+    """
+
+    def __init__(self, research_logger: ResearchLogger, session_id: str, step: str = "synthesis_token",
+                 flush_interval: float = 0.1, max_chars: int = 200, nowait: bool = False):
+        """
+        Args:
+            research_logger: Logger the coalesced text is published to
+            session_id: Session the events belong to
+            step: Event name
+            flush_interval: Seconds after which buffered text is published
+            max_chars: Buffered characters after which text is published
+            nowait: Publish with log_step_nowait(), for buffers fed on an event loop
+        """
+        self.research_logger = research_logger
+        self.session_id = session_id
+        self.step = step
+        self.flush_interval = flush_interval
+        self.max_chars = max_chars
+        self._publish = research_logger.log_step_nowait if nowait else research_logger.log_step
+        self.first_token_at: Optional[float] = None
+        self._chunks = []
+        self._size = 0
+        self._last_flush = time.time()
+
+    def __call__(self, chunk: str) -> None:
+        """Add a chunk, flushing when enough text or time has accumulated."""
+        now = time.time()
+        if self.first_token_at is None:
+            self.first_token_at = now
+            # Send the first chunk straight away; it is what users perceive as latency
+            self._chunks.append(chunk)
+            self.flush()
+            return
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        if self._size >= self.max_chars or now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Publish any buffered text as one event."""
+        if self._chunks:
+            self._publish(self.session_id, self.step, {"text": "".join(self._chunks)})
+        self._chunks = []
+        self._size = 0
+        self._last_flush = time.time()
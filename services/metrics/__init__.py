@@ -0,0 +1,3 @@
+# This file makes the metrics directory a Python package
+from .registry import Counter, Histogram, MetricsRegistry, metrics
+from .tracing import RequestTrace, Span, TokenUsageHandler
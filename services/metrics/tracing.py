@@ -0,0 +1,122 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+import threading
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from .registry import metrics
+
+STAGE_SECONDS = metrics.histogram(
+    'research_stage_duration_seconds',
+    'Duration of each research pipeline stage',
+    labels=('stage', 'provider', 'depth')
+)
+STAGE_TOKENS = metrics.counter(
+    'research_stage_tokens_total',
+    'Tokens reported by the provider for each research pipeline stage',
+    labels=('stage', 'provider', 'depth', 'kind')
+)
+REQUEST_SECONDS = metrics.histogram(
+    'research_request_duration_seconds',
+    'End-to-end duration of research requests',
+    labels=('provider', 'depth', 'status')
+)
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Sums the token usage providers report in their LLM results.
+
+    OpenAI reports `token_usage`; providers that report nothing (or streamed
+    calls) leave the counts at zero.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get('token_usage') or (response.llm_output or {}).get('usage') or {}
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += usage.get('prompt_tokens') or usage.get('input_tokens') or 0
+            self.completion_tokens += usage.get('completion_tokens') or usage.get('output_tokens') or 0
+
+    def usage(self) -> Optional[Dict[str, int]]:
+        """Token counts, or None if the provider reported none."""
+        with self._lock:
+            if not (self.prompt_tokens or self.completion_tokens):
+                return None
+            return {'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens}
+
+class Span:
+    """Timing of one pipeline stage."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.status = 'ok'
+        self.attributes: Dict[str, Any] = {}
+        self.token_usage = TokenUsageHandler()
+
+    @property
+    def callbacks(self) -> List[BaseCallbackHandler]:
+        """LangChain callbacks that attribute LLM token usage to this span."""
+        return [self.token_usage]
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {'stage': self.stage, 'duration': self.duration, 'status': self.status, **self.attributes}
+        tokens = self.token_usage.usage()
+        if tokens is not None:
+            span['tokens'] = tokens
+        return span
+
+class RequestTrace:
+    """Stage spans for one research request.
+
+    Each finished span is recorded in the per-provider/depth histograms and
+    passed to on_span, which the app uses to publish it to the session stream.
+    """
+
+    def __init__(self, provider: str, depth: str, on_span: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.provider = provider
+        self.depth = depth
+        self.on_span = on_span
+        self.spans: List[Span] = []
+        self._started = time.monotonic()
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a pipeline stage."""
+        span = Span(stage)
+        span.attributes.update(attributes)
+        start = time.monotonic()
+        try:
+            yield span
+        except BaseException:
+            span.status = 'error'
+            raise
+        finally:
+            span.duration = time.monotonic() - start
+            self.spans.append(span)
+            labels = {'stage': stage, 'provider': self.provider, 'depth': self.depth}
+            STAGE_SECONDS.observe(span.duration, **labels)
+            tokens = span.token_usage.usage()
+            if tokens is not None:
+                STAGE_TOKENS.inc(tokens['prompt_tokens'], kind='prompt', **labels)
+                STAGE_TOKENS.inc(tokens['completion_tokens'], kind='completion', **labels)
+            if self.on_span is not None:
+                self.on_span(span.to_dict())
+
+    def finish(self, status: str = 'ok') -> None:
+        """Record the end-to-end request duration."""
+        REQUEST_SECONDS.observe(
+            time.monotonic() - self._started, provider=self.provider, depth=self.depth, status=status
+        )
+
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent per stage, summed over repeated stages."""
+        timings: Dict[str, float] = {}
+        for span in self.spans:
+            timings[span.stage] = timings.get(span.stage, 0.0) + (span.duration or 0.0)
+        return timings
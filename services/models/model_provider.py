@@ -1,21 +1,35 @@
-from typing import Optional, Dict, Any
-from langchain_community.llms import OpenAI
-from langchain_google_genai import GoogleGenerativeAI
-from langchain_anthropic import Anthropic
+from typing import Optional, Dict, Any, Iterable, Type, Union
 from abc import ABC, abstractmethod
+import importlib
+
+def load_object(spec: str) -> Any:
+    """Import "package.module:attribute" and return the attribute."""
+    module_name, _, attribute = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attribute)
 
 class BaseModelProvider(ABC):
+    # "module:Class" of the LangChain LLM, imported on first use so only the
+    # SDKs of providers that are actually used get loaded
+    llm_class: str = ''
+
     @abstractmethod
     def get_model(self) -> Any:
         pass
 
+    @classmethod
+    def load_llm_class(cls) -> Any:
+        return load_object(cls.llm_class) if cls.llm_class else None
+
 class OpenAIProvider(BaseModelProvider):
+    llm_class = 'langchain_community.llms:OpenAI'
+
     def __init__(self, api_key: str, temperature: float = 0.7, max_tokens: int = 1500):
         self.api_key = api_key
         self.temperature = temperature
         self.max_tokens = max_tokens
 
     def get_model(self):
+        OpenAI = self.load_llm_class()
         return OpenAI(
             api_key=self.api_key,
             temperature=self.temperature,
@@ -23,12 +37,15 @@ class OpenAIProvider(BaseModelProvider):
         )
 
 class GeminiProvider(BaseModelProvider):
+    llm_class = 'langchain_google_genai:GoogleGenerativeAI'
+
     def __init__(self, api_key: str, temperature: float = 0.7, max_tokens: int = 1500):
         self.api_key = api_key
         self.temperature = temperature
         self.max_tokens = max_tokens
 
     def get_model(self):
+        GoogleGenerativeAI = self.load_llm_class()
         return GoogleGenerativeAI(
             model="gemini-pro",
             google_api_key=self.api_key,
@@ -37,12 +54,15 @@ class GeminiProvider(BaseModelProvider):
         )
 
 class AnthropicProvider(BaseModelProvider):
+    llm_class = 'langchain_anthropic:Anthropic'
+
     def __init__(self, api_key: str, temperature: float = 0.7, max_tokens: int = 1500):
         self.api_key = api_key
         self.temperature = temperature
         self.max_tokens = max_tokens
 
     def get_model(self):
+        Anthropic = self.load_llm_class()
         return Anthropic(
             anthropic_api_key=self.api_key,
             temperature=self.temperature,
@@ -51,17 +71,30 @@ class AnthropicProvider(BaseModelProvider):
         )
 
 class ModelFactory:
-    PROVIDERS = {
+    # Provider classes, or "module:Class" strings imported on first use
+    PROVIDERS: Dict[str, Union[Type[BaseModelProvider], str]] = {
         'openai': OpenAIProvider,
         'gemini': GeminiProvider,
         'anthropic': AnthropicProvider
     }
 
     @classmethod
-    def create_model(cls, provider: str, api_key: str, temperature: float = 0.7, max_tokens: int = 1500) -> Any:
+    def provider_class(cls, provider: str) -> Type[BaseModelProvider]:
         if provider not in cls.PROVIDERS:
             raise ValueError(f"Unsupported model provider: {provider}. Choose from: {', '.join(cls.PROVIDERS.keys())}")
-        
         provider_class = cls.PROVIDERS[provider]
+        if isinstance(provider_class, str):
+            provider_class = cls.PROVIDERS[provider] = load_object(provider_class)
+        return provider_class
+
+    @classmethod
+    def preload(cls, providers: Iterable[str]) -> None:
+        """Import the SDKs of the given providers ahead of their first request."""
+        for provider in providers:
+            cls.provider_class(provider).load_llm_class()
+
+    @classmethod
+    def create_model(cls, provider: str, api_key: str, temperature: float = 0.7, max_tokens: int = 1500) -> Any:
+        provider_class = cls.provider_class(provider)
         model_provider = provider_class(api_key, temperature, max_tokens)
         return model_provider.get_model()
@@ -0,0 +1,82 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List, Mapping, Optional
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from services.research.response_cache import llm_fingerprint
+from services.throttling import acall_with_backoff, call_with_backoff, retry_after_seconds
+
+class RateLimitedLLM(LLM):
+    """LLM wrapper that sends every call to one provider through its rate limiter.
+
+    Calls wait for a token from the provider's bucket, and rate-limit errors
+    (HTTP 429/503) are retried after the provider's Retry-After. Streams are
+    only retried if the provider fails before the first chunk.
+    """
+
+    llm: Any
+    limiter: Any
+    retries: int = 3
+    base_delay: float = 1.0
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def _llm_type(self) -> str:
+        return self.llm._llm_type
+
+    @property
+    def _identifying_params(self) -> Mapping[str, Any]:
+        return self.llm._identifying_params
+
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """Rate limiting does not change outputs, so share the wrapped model's cache keys."""
+        return llm_fingerprint(self.llm)
+
+    def _config(self, run_manager: Any) -> Dict[str, Any]:
+        """Pass the caller's callbacks (e.g. token usage tracking) on to the wrapped model."""
+        return {'callbacks': run_manager.inheritable_handlers if run_manager else None}
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        return call_with_backoff(
+            self.limiter, lambda: self.llm.invoke(prompt, stop=stop, config=self._config(run_manager)),
+            retries=self.retries, base_delay=self.base_delay
+        )
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        return await acall_with_backoff(
+            self.limiter, lambda: self.llm.ainvoke(prompt, stop=stop, config=self._config(run_manager)),
+            retries=self.retries, base_delay=self.base_delay
+        )
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            started = False
+            try:
+                for chunk in self.llm.stream(prompt, stop=stop, config=self._config(run_manager)):
+                    started = True
+                    yield GenerationChunk(text=chunk)
+                return
+            except Exception as e:
+                retry_after = retry_after_seconds(e)
+                if started or retry_after is None or attempt == self.retries:
+                    raise
+                self.limiter.pause(retry_after or self.base_delay * (2 ** attempt))
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        for attempt in range(self.retries + 1):
+            await self.limiter.aacquire()
+            started = False
+            try:
+                async for chunk in self.llm.astream(prompt, stop=stop, config=self._config(run_manager)):
+                    started = True
+                    yield GenerationChunk(text=chunk)
+                return
+            except Exception as e:
+                retry_after = retry_after_seconds(e)
+                if started or retry_after is None or attempt == self.retries:
+                    raise
+                self.limiter.pause(retry_after or self.base_delay * (2 ** attempt))
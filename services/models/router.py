@@ -0,0 +1,553 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import asyncio
+import bisect
+import logging
+import queue
+import threading
+import time
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+from langchain_core.pydantic_v1 import PrivateAttr
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, float('inf')]
+
+class ProviderStats:
+    """Rolling latency and error tracking for one model provider."""
+
+    def __init__(self, window: int = 100):
+        """
+        Args:
+            window: Recent calls used for the error rate and latency percentiles
+        """
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=window)
+        self._bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self._latency_sum = 0.0
+        self._calls = 0
+        self._errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record a finished call."""
+        with self._lock:
+            self._recent.append((latency, ok))
+            self._calls += 1
+            if ok:
+                self._bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+                self._latency_sum += latency
+            else:
+                self._errors += 1
+
+    def error_rate(self) -> float:
+        """Share of recent calls that failed."""
+        with self._lock:
+            if not self._recent:
+                return 0.0
+            return sum(1 for _, ok in self._recent if not ok) / len(self._recent)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-100) of recent successful calls, or None without data."""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self._recent if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))]
+
+    def samples(self) -> int:
+        with self._lock:
+            return len(self._recent)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters, recent percentiles and the cumulative latency histogram."""
+        with self._lock:
+            cumulative = 0
+            histogram = {}
+            for bound, count in zip(LATENCY_BUCKETS, self._bucket_counts):
+                cumulative += count
+                histogram['+Inf' if bound == float('inf') else str(bound)] = cumulative
+            calls, errors, latency_sum = self._calls, self._errors, self._latency_sum
+        return {
+            'calls': calls,
+            'errors': errors,
+            'error_rate': self.error_rate(),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'latency_sum': latency_sum,
+            'latency_histogram': histogram
+        }
+
+class _Attempt:
+    """One call to a provider, recorded in its stats exactly once.
+
+    A call abandoned at the deadline is recorded as a failure right away;
+    when it finishes later its outcome is ignored.
+    """
+
+    def __init__(self, stats: ProviderStats):
+        self.stats = stats
+        self.start = time.monotonic()
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            self._recorded = True
+        self.stats.record(time.monotonic() - self.start if latency is None else latency, ok=ok)
+
+class RoutingLLM(LLM):
+    """LLM that routes each call across several providers.
+
+    Providers are tried in order, skipping ones whose recent error rate is too
+    high. Errors and timeouts fail over to the next provider. With hedging on,
+    a duplicate request goes to the next provider once the first has run past
+    its own p95 latency, and whichever answers first wins; the loser is
+    abandoned and its result discarded. ainvoke() and astream() route the
+    same way on the event loop, where losing and timed-out calls are
+    cancelled instead.
+
+    Streams are routed until their first chunk: timeout bounds the wait for
+    it, and failover and hedging apply until it arrives. After that the
+    stream is committed to its provider, and a gap of more than timeout
+    between chunks fails the stream.
+    """
+
+    providers: Dict[str, Any]
+    order: List[str]
+    provider_stats: Dict[str, Any]
+    timeout: float = 60.0
+    hedge: bool = False
+    hedge_min_samples: int = 20
+    max_error_rate: float = 0.5
+    # Pool the provider calls run on; pass one shared pool so routers do not each hold threads
+    executor: Optional[ThreadPoolExecutor] = None
+
+    _executor: ThreadPoolExecutor = PrivateAttr(default=None)
+    _counters: Dict[str, int] = PrivateAttr(default=None)
+    _counter_lock: Any = PrivateAttr(default=None)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        for name in self.order:
+            self.provider_stats.setdefault(name, ProviderStats())
+        self._executor = self.executor or ThreadPoolExecutor(
+            max_workers=8 * len(self.order), thread_name_prefix="llm-router"
+        )
+        self._counters = {'failovers': 0, 'hedges': 0, 'hedge_wins': 0}
+        self._counter_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    def cache_fingerprint(self) -> Dict[str, Any]:
+        """Identify the routed providers for response cache keys."""
+        return {
+            'provider': 'router',
+            'providers': [[name, self.providers[name]._identifying_params] for name in self.order]
+        }
+
+    def _count(self, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def _ordered(self) -> List[str]:
+        """Providers in configured order, with unhealthy ones moved to the end."""
+        healthy, unhealthy = [], []
+        for name in self.order:
+            stats = self.provider_stats[name]
+            if stats.samples() >= 5 and stats.error_rate() > self.max_error_rate:
+                unhealthy.append(name)
+            else:
+                healthy.append(name)
+        return healthy + unhealthy
+
+    def _hedge_delay(self, primary: str, backup: Optional[str]) -> Optional[float]:
+        """Seconds after which to hedge primary with backup, or None to not hedge."""
+        stats = self.provider_stats[primary]
+        if not self.hedge or backup is None or stats.samples() < self.hedge_min_samples:
+            return None
+        hedge_after = stats.percentile(95)
+        return None if hedge_after is None else min(hedge_after, self.timeout)
+
+    def _timed_call(self, attempt: _Attempt, name: str, prompt: str, stop: Optional[List[str]],
+                    callbacks: Any = None) -> str:
+        try:
+            output = self.providers[name].invoke(prompt, stop=stop, config={'callbacks': callbacks})
+        except Exception:
+            attempt.record(ok=False)
+            raise
+        attempt.record(ok=True)
+        return output
+
+    def _submit(self, name: str, prompt: str, stop: Optional[List[str]], callbacks: Any) -> Tuple[Future, _Attempt]:
+        attempt = _Attempt(self.provider_stats[name])
+        return self._executor.submit(self._timed_call, attempt, name, prompt, stop, callbacks), attempt
+
+    def _call_with_hedge(self, primary: str, backup: Optional[str], prompt: str, stop: Optional[List[str]],
+                         callbacks: Any, tried: Set[str]) -> str:
+        """Call primary, hedging with backup if enabled. Every provider called is added to tried."""
+        deadline = time.monotonic() + self.timeout
+        tried.add(primary)
+        futures: Dict[Future, Tuple[str, _Attempt]] = {}
+        future, attempt = self._submit(primary, prompt, stop, callbacks)
+        futures[future] = (primary, attempt)
+
+        hedge_after = self._hedge_delay(primary, backup)
+        if hedge_after is not None:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                logger.info(f"Hedging {primary} with {backup} after {hedge_after:.2f}s")
+                self._count('hedges')
+                tried.add(backup)
+                future, attempt = self._submit(backup, prompt, stop, callbacks)
+                futures[future] = (backup, attempt)
+
+        error: Optional[BaseException] = None
+        while futures:
+            done, _ = wait(futures, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                # Running calls cannot be interrupted; they finish in the background unrecorded
+                for future, (_, attempt) in futures.items():
+                    future.cancel()
+                    attempt.record(ok=False, latency=self.timeout)
+                names = ', '.join(name for name, _ in futures.values())
+                raise TimeoutError(f"{names} did not answer within {self.timeout}s")
+            for future in done:
+                name, _ = futures.pop(future)
+                if future.exception() is None:
+                    for other in futures:
+                        other.cancel()
+                    if name != primary:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _next_untried(self, order: List[str], tried: Set[str], after: Optional[str] = None) -> Optional[str]:
+        return next((name for name in order if name not in tried and name != after), None)
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        order = self._ordered()
+        # Hand the caller's callbacks (e.g. token usage tracking) to the provider calls
+        callbacks = run_manager.inheritable_handlers if run_manager else None
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            name = self._next_untried(order, tried)
+            if name is None:
+                raise last_error
+            try:
+                return self._call_with_hedge(name, self._next_untried(order, tried, after=name),
+                                             prompt, stop, callbacks, tried)
+            except Exception as e:
+                last_error = e
+                next_name = self._next_untried(order, tried)
+                if next_name is not None:
+                    logger.warning(f"Provider {name} failed ({str(e)}); failing over to {next_name}")
+                    self._count('failovers')
+
+    def _pump(self, name: str, prompt: str, stop: Optional[List[str]], callbacks: Any,
+              items: queue.Queue, cancelled: threading.Event) -> None:
+        """Copy one provider's stream into items as (name, kind, payload) until done or cancelled."""
+        stream = self.providers[name].stream(prompt, stop=stop, config={'callbacks': callbacks})
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    return
+                items.put((name, 'chunk', chunk))
+        except Exception as e:
+            items.put((name, 'error', e))
+            return
+        finally:
+            stream.close()
+        items.put((name, 'done', None))
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        """Stream from the first provider to send a chunk, failing over and hedging until then."""
+        order = self._ordered()
+        callbacks = run_manager.inheritable_handlers if run_manager else None
+        items: queue.Queue = queue.Queue()
+        running: Dict[str, Tuple[_Attempt, threading.Event]] = {}
+        tried: Set[str] = set()
+
+        def launch(name: str) -> None:
+            tried.add(name)
+            cancelled = threading.Event()
+            running[name] = (_Attempt(self.provider_stats[name]), cancelled)
+            self._executor.submit(self._pump, name, prompt, stop, callbacks, items, cancelled)
+
+        try:
+            winner: Optional[str] = None
+            error: Optional[BaseException] = None
+            while winner is None:
+                if not running:
+                    primary = self._next_untried(order, tried)
+                    if primary is None:
+                        raise error
+                    if error is not None:
+                        logger.warning(f"Provider stream failed ({str(error)}); failing over to {primary}")
+                        self._count('failovers')
+                    launch(primary)
+                    deadline = time.monotonic() + self.timeout
+                    backup = self._next_untried(order, tried)
+                    hedge_after = self._hedge_delay(primary, backup)
+                    hedge_at = None if hedge_after is None else time.monotonic() + hedge_after
+                try:
+                    name, kind, payload = items.get(timeout=max((hedge_at or deadline) - time.monotonic(), 0))
+                except queue.Empty:
+                    if hedge_at is not None:
+                        logger.info(f"Hedging {primary} stream with {backup} after {hedge_after:.2f}s")
+                        self._count('hedges')
+                        launch(backup)
+                        hedge_at = None
+                        continue
+                    for attempt, cancelled in running.values():
+                        attempt.record(ok=False, latency=self.timeout)
+                        cancelled.set()
+                    error = TimeoutError(f"{', '.join(running)} sent nothing within {self.timeout}s")
+                    running.clear()
+                    continue
+                if name not in running:
+                    # Left over from an abandoned stream
+                    continue
+                attempt, _ = running[name]
+                if kind == 'error':
+                    attempt.record(ok=False)
+                    del running[name]
+                    error = payload
+                    continue
+                winner = name
+                if name != primary:
+                    self._count('hedge_wins')
+                for other, (_, cancelled) in running.items():
+                    if other != name:
+                        cancelled.set()
+                if kind == 'done':
+                    attempt.record(ok=True)
+                    return
+                yield GenerationChunk(text=payload)
+
+            attempt, _ = running[winner]
+            while True:
+                try:
+                    name, kind, payload = items.get(timeout=self.timeout)
+                except queue.Empty:
+                    attempt.record(ok=False)
+                    raise TimeoutError(f"{winner} stream stalled for more than {self.timeout}s")
+                if name != winner:
+                    continue
+                if kind == 'error':
+                    attempt.record(ok=False)
+                    raise payload
+                if kind == 'done':
+                    attempt.record(ok=True)
+                    return
+                yield GenerationChunk(text=payload)
+        finally:
+            # Stops losers, and the winner too if the caller stops reading
+            for _, cancelled in running.values():
+                cancelled.set()
+
+    async def _atimed_call(self, attempt: _Attempt, name: str, prompt: str, stop: Optional[List[str]],
+                           callbacks: Any = None) -> str:
+        try:
+            # agenerate() rejects an empty callback list, which is what a caller without handlers passes
+            output = await self.providers[name].ainvoke(prompt, stop=stop, config={'callbacks': callbacks or None})
+        except Exception:
+            attempt.record(ok=False)
+            raise
+        attempt.record(ok=True)
+        return output
+
+    def _create_task(self, name: str, prompt: str, stop: Optional[List[str]],
+                     callbacks: Any) -> Tuple[asyncio.Task, _Attempt]:
+        attempt = _Attempt(self.provider_stats[name])
+        return asyncio.create_task(self._atimed_call(attempt, name, prompt, stop, callbacks)), attempt
+
+    async def _acall_with_hedge(self, primary: str, backup: Optional[str], prompt: str, stop: Optional[List[str]],
+                                callbacks: Any, tried: Set[str]) -> str:
+        """Async variant of _call_with_hedge(). Calls that lose or time out are cancelled, not left running."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        tried.add(primary)
+        tasks: Dict[asyncio.Task, Tuple[str, _Attempt]] = {}
+        task, attempt = self._create_task(primary, prompt, stop, callbacks)
+        tasks[task] = (primary, attempt)
+        try:
+            hedge_after = self._hedge_delay(primary, backup)
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    logger.info(f"Hedging {primary} with {backup} after {hedge_after:.2f}s")
+                    self._count('hedges')
+                    tried.add(backup)
+                    task, attempt = self._create_task(backup, prompt, stop, callbacks)
+                    tasks[task] = (backup, attempt)
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    for _, attempt in tasks.values():
+                        attempt.record(ok=False, latency=self.timeout)
+                    names = ', '.join(name for name, _ in tasks.values())
+                    raise TimeoutError(f"{names} did not answer within {self.timeout}s")
+                for task in done:
+                    name, _ = tasks.pop(task)
+                    if task.exception() is None:
+                        if name != primary:
+                            self._count('hedge_wins')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Losers, timed-out calls and calls orphaned by the caller's cancellation
+            for task in tasks:
+                task.cancel()
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        """Async variant of _call(), so the event loop never waits on a thread per call."""
+        order = self._ordered()
+        callbacks = run_manager.inheritable_handlers if run_manager else None
+        tried: Set[str] = set()
+        last_error: Optional[BaseException] = None
+        while True:
+            name = self._next_untried(order, tried)
+            if name is None:
+                raise last_error
+            try:
+                return await self._acall_with_hedge(name, self._next_untried(order, tried, after=name),
+                                                    prompt, stop, callbacks, tried)
+            except Exception as e:
+                last_error = e
+                next_name = self._next_untried(order, tried)
+                if next_name is not None:
+                    logger.warning(f"Provider {name} failed ({str(e)}); failing over to {next_name}")
+                    self._count('failovers')
+
+    async def _apump(self, name: str, prompt: str, stop: Optional[List[str]], callbacks: Any,
+                     items: asyncio.Queue) -> None:
+        """Async variant of _pump(); stopped by cancelling its task."""
+        try:
+            async for chunk in self.providers[name].astream(prompt, stop=stop,
+                                                            config={'callbacks': callbacks or None}):
+                items.put_nowait((name, 'chunk', chunk))
+        except Exception as e:
+            items.put_nowait((name, 'error', e))
+            return
+        items.put_nowait((name, 'done', None))
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        """Async variant of _stream(); abandoned streams are cancelled."""
+        loop = asyncio.get_running_loop()
+        order = self._ordered()
+        callbacks = run_manager.inheritable_handlers if run_manager else None
+        items: asyncio.Queue = asyncio.Queue()
+        running: Dict[str, Tuple[_Attempt, asyncio.Task]] = {}
+        tried: Set[str] = set()
+
+        def launch(name: str) -> None:
+            tried.add(name)
+            running[name] = (
+                _Attempt(self.provider_stats[name]),
+                asyncio.create_task(self._apump(name, prompt, stop, callbacks, items))
+            )
+
+        try:
+            winner: Optional[str] = None
+            error: Optional[BaseException] = None
+            while winner is None:
+                if not running:
+                    primary = self._next_untried(order, tried)
+                    if primary is None:
+                        raise error
+                    if error is not None:
+                        logger.warning(f"Provider stream failed ({str(error)}); failing over to {primary}")
+                        self._count('failovers')
+                    launch(primary)
+                    deadline = loop.time() + self.timeout
+                    backup = self._next_untried(order, tried)
+                    hedge_after = self._hedge_delay(primary, backup)
+                    hedge_at = None if hedge_after is None else loop.time() + hedge_after
+                try:
+                    name, kind, payload = await asyncio.wait_for(
+                        items.get(), timeout=max((hedge_at or deadline) - loop.time(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    if hedge_at is not None:
+                        logger.info(f"Hedging {primary} stream with {backup} after {hedge_after:.2f}s")
+                        self._count('hedges')
+                        launch(backup)
+                        hedge_at = None
+                        continue
+                    for attempt, task in running.values():
+                        attempt.record(ok=False, latency=self.timeout)
+                        task.cancel()
+                    error = TimeoutError(f"{', '.join(running)} sent nothing within {self.timeout}s")
+                    running.clear()
+                    continue
+                if name not in running:
+                    continue
+                attempt, _ = running[name]
+                if kind == 'error':
+                    attempt.record(ok=False)
+                    del running[name]
+                    error = payload
+                    continue
+                winner = name
+                if name != primary:
+                    self._count('hedge_wins')
+                for other, (_, task) in running.items():
+                    if other != name:
+                        task.cancel()
+                if kind == 'done':
+                    attempt.record(ok=True)
+                    return
+                yield GenerationChunk(text=payload)
+
+            attempt, _ = running[winner]
+            while True:
+                try:
+                    name, kind, payload = await asyncio.wait_for(items.get(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    attempt.record(ok=False)
+                    raise TimeoutError(f"{winner} stream stalled for more than {self.timeout}s")
+                if name != winner:
+                    continue
+                if kind == 'error':
+                    attempt.record(ok=False)
+                    raise payload
+                if kind == 'done':
+                    attempt.record(ok=True)
+                    return
+                yield GenerationChunk(text=payload)
+        finally:
+            for _, task in running.values():
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters and per-provider latency histograms."""
+        with self._counter_lock:
+            counters = dict(self._counters)
+        return {
+            'order': self.order,
+            'hedge': self.hedge,
+            **counters,
+            'providers': {name: self.provider_stats[name].snapshot() for name in self.order}
+        }
@@ -0,0 +1,339 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import logging
+import threading
+import time
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from services.cache import CacheBackend
+from services.content import ContentFetcher
+from services.models import ModelFactory
+from services.models.rate_limited import RateLimitedLLM
+from services.models.router import ProviderStats, RoutingLLM
+from services.research.chains import ResearchChainManager
+from services.search.search_manager import SearchManager
+from services.search import SearchProvider, create_provider
+from services.search.cached_provider import CachedSearchProvider
+from services.throttling import TokenBucket
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class ServiceRegistry:
+    """Process-wide registry of model clients, chain managers and search managers.
+
+    Each (provider, temperature, max_tokens) configuration is built once and
+    shared by every request, so the underlying SDK clients and their
+    connection pools stay alive between requests. The chain managers of one
+    provider also share a per-source analysis pool, so the analysis
+    concurrency limit applies per provider rather than per output budget.
+    Clients are built outside the registry lock, so a slow SDK import or
+    client construction only holds up requests for that configuration.
+    """
+
+    def __init__(self, api_keys: Dict[str, str], serpapi_key: str,
+                 search_cache: Optional[CacheBackend] = None,
+                 llm_cache: Optional[CacheBackend] = None,
+                 pool_size: int = 20,
+                 analysis_options: Optional[Dict[str, Any]] = None,
+                 routing: str = 'off',
+                 routing_timeout: float = 60.0,
+                 routing_workers: int = 32,
+                 rate_limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 content_cache: Optional[CacheBackend] = None,
+                 content_options: Optional[Dict[str, Any]] = None,
+                 analysis_max_tokens: Optional[int] = None,
+                 search_provider: str = 'serpapi'):
+        """
+        Initialize the registry.
+
+        Args:
+            api_keys: API key per model provider
+            serpapi_key: SerpAPI key
+            search_cache: Optional cache for search results
+            llm_cache: Optional cache for LLM responses
+            pool_size: Keep-alive connections per host for the search session
+            analysis_options: Keyword arguments for ResearchChainManager
+                (analysis_mode, map_concurrency, map_timeout, quorum, straggler_timeout)
+            routing: 'off' pins each request to its provider; 'failover' falls back
+                to the other configured providers on errors and timeouts; 'hedge'
+                also races a duplicate request once the first is slower than its p95
+            routing_timeout: Seconds before a routed provider call is abandoned
+            routing_workers: Threads shared by every router for provider calls and streams
+            rate_limits: (requests per second, burst) per upstream, keyed by
+                'serpapi' or a model provider name; unlisted upstreams are not limited
+            content_cache: Optional cache for extracted page text
+            content_options: Keyword arguments for ContentFetcher (max_workers,
+                per_host, timeout, deadline, max_bytes, max_chars, revalidate_after)
+            analysis_max_tokens: Output budget for the source analysis stages. When
+                set, analyses use their own model client so the per-source analysis
+                cache is shared by research managers with different output budgets
+            search_provider: Name of the registered search backend (see
+                services.search.register_provider); it is given serpapi_key as
+                api_key, the shared HTTP clients and its rate limiter
+        """
+        if routing not in ('off', 'failover', 'hedge'):
+            raise ValueError(f"Invalid routing mode: {routing}. Choose from: off, failover, hedge")
+        self.api_keys = api_keys
+        self.serpapi_key = serpapi_key
+        self.search_provider = search_provider
+        self.search_cache = search_cache
+        self.llm_cache = llm_cache
+        self.pool_size = pool_size
+        self.analysis_options = analysis_options or {}
+        self.analysis_max_tokens = analysis_max_tokens
+        self.routing = routing
+        self.routing_timeout = routing_timeout
+        self.routing_workers = routing_workers
+        self._routing_executor: Optional[ThreadPoolExecutor] = None
+        # Provider health is shared by every router so all configurations learn from each call
+        self.provider_stats: Dict[str, ProviderStats] = {}
+        self._routers: Dict[Tuple[str, float, int], RoutingLLM] = {}
+        # One bucket per upstream, shared by every model configuration that calls it
+        self.rate_limiters: Dict[str, TokenBucket] = {
+            name: TokenBucket(name, rate, burst) for name, (rate, burst) in (rate_limits or {}).items()
+        }
+
+        self._lock = threading.Lock()
+        # One lock per (kind, key) being built, so each configuration is built once
+        self._building: Dict[Tuple[str, Hashable], threading.Lock] = {}
+        self._research_managers: Dict[Tuple[str, float, int], ResearchChainManager] = {}
+        self._analysis_executors: Dict[str, ThreadPoolExecutor] = {}
+        self._llms: Dict[Tuple[str, float, int], Any] = {}
+        self._search_manager: Optional[SearchManager] = None
+        self.content_cache = content_cache
+        self.content_options = content_options or {}
+        self._content_fetcher: Optional[ContentFetcher] = None
+        self._hits = 0
+        self._misses = 0
+
+        # requests.Session keeps connections alive; the adapter bounds the pool per host
+        self._adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_size)
+        self.http_session = requests.Session()
+        self.http_session.mount("https://", self._adapter)
+        self.http_session.mount("http://", self._adapter)
+
+        # Async counterpart for the ASGI entry point, with the same per-host bound
+        self.async_http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    def _build_once(self, kind: str, built: Dict, key: Hashable, build: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return built[key], calling build() outside _lock the first time.
+
+        Concurrent callers for the same key wait for that one build; callers
+        for other keys are not held up by it.
+
+        Returns:
+            (value, True if this call built it)
+        """
+        with self._lock:
+            if key in built:
+                return built[key], False
+            guard = self._building.setdefault((kind, key), threading.Lock())
+        with guard:
+            with self._lock:
+                if key in built:
+                    return built[key], False
+            try:
+                value = build()
+                with self._lock:
+                    built[key] = value
+                return value, True
+            finally:
+                with self._lock:
+                    self._building.pop((kind, key), None)
+
+    def get_research_manager(self, provider: str, temperature: float = 0.7, max_tokens: int = 1500) -> ResearchChainManager:
+        """Return the shared chain manager for a model configuration, building it on first use."""
+        manager, built = self._build_once(
+            'manager', self._research_managers, (provider, temperature, max_tokens),
+            lambda: self._build_research_manager(provider, temperature, max_tokens)
+        )
+        with self._lock:
+            if built:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return manager
+
+    def _build_research_manager(self, provider: str, temperature: float, max_tokens: int) -> ResearchChainManager:
+        llm = self._get_llm(provider, temperature, max_tokens)
+        analysis_llm = None
+        if self.analysis_max_tokens is not None:
+            analysis_llm = self._get_llm(provider, temperature, self.analysis_max_tokens)
+        with self._lock:
+            executor = self._analysis_executors.get(provider)
+            if executor is None:
+                executor = self._analysis_executors[provider] = ThreadPoolExecutor(
+                    max_workers=self.analysis_options.get('map_concurrency', 4),
+                    thread_name_prefix=f"source-analysis-{provider}"
+                )
+        return ResearchChainManager(llm, cache=self.llm_cache, analysis_llm=analysis_llm,
+                                    analysis_executor=executor, **self.analysis_options)
+
+    def warm_up(self, configs: Iterable[Tuple[str, float, int]]) -> threading.Thread:
+        """
+        Build model clients and chain managers in a background thread.
+
+        Imports the SDKs of the configured providers and LangChain's chain
+        stack ahead of the first request, so that request does not pay for them.
+        Requests that arrive mid warm-up wait for the configuration they need.
+
+        Args:
+            configs: (provider, temperature, max_tokens) configurations to build
+
+        Returns:
+            The started daemon thread
+        """
+        configs = list(configs)
+
+        def run():
+            start = time.perf_counter()
+            try:
+                ModelFactory.preload({provider for provider, _, _ in configs})
+                for provider, temperature, max_tokens in configs:
+                    self.get_research_manager(provider, temperature=temperature, max_tokens=max_tokens)
+                self.get_search_manager()
+            except Exception as e:
+                logger.warning(f"Warm-up failed: {str(e)}")
+                return
+            logger.info(f"Warmed up {len(configs)} model configurations in {time.perf_counter() - start:.2f}s")
+
+        thread = threading.Thread(target=run, name="registry-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def _get_llm(self, provider: str, temperature: float, max_tokens: int) -> Any:
+        """Return the model client for a configuration, building it on first use."""
+        return self._build_once(
+            'llm', self._llms, (provider, temperature, max_tokens),
+            lambda: self._build_llm(provider, temperature, max_tokens)
+        )[0]
+
+    def _build_llm(self, provider: str, temperature: float, max_tokens: int) -> Any:
+        logger.info(f"Building model client for provider={provider}, temperature={temperature}, max_tokens={max_tokens}")
+        if self.routing == 'off' or len(self.api_keys) < 2:
+            return self._create_model(provider, temperature, max_tokens)
+
+        order = [provider] + [name for name in self.api_keys if name != provider]
+        with self._lock:
+            if self._routing_executor is None:
+                self._routing_executor = ThreadPoolExecutor(
+                    max_workers=self.routing_workers, thread_name_prefix="llm-router"
+                )
+        llm = RoutingLLM(
+            providers={name: self._create_model(name, temperature, max_tokens) for name in order},
+            order=order,
+            provider_stats=self.provider_stats,
+            timeout=self.routing_timeout,
+            hedge=self.routing == 'hedge',
+            executor=self._routing_executor
+        )
+        with self._lock:
+            self._routers[(provider, temperature, max_tokens)] = llm
+        return llm
+
+    def _create_model(self, provider: str, temperature: float, max_tokens: int) -> Any:
+        llm = ModelFactory.create_model(
+            provider=provider,
+            api_key=self.api_keys[provider],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        limiter = self.rate_limiters.get(provider)
+        if limiter is not None:
+            llm = RateLimitedLLM(llm=llm, limiter=limiter)
+        return llm
+
+    def routing_stats(self) -> Dict[str, Any]:
+        """Failover/hedge counters across routers and per-provider latency histograms."""
+        with self._lock:
+            routers = list(self._routers.values())
+        totals = {'failovers': 0, 'hedges': 0, 'hedge_wins': 0}
+        for router in routers:
+            router_stats = router.stats()
+            for counter in totals:
+                totals[counter] += router_stats[counter]
+        return {
+            'mode': self.routing,
+            **totals,
+            'providers': {name: stats.snapshot() for name, stats in list(self.provider_stats.items())}
+        }
+
+    def _build_search_manager(self, provider: SearchProvider) -> SearchManager:
+        if self.search_cache is not None:
+            provider = CachedSearchProvider(provider, cache=self.search_cache)
+        return SearchManager(search_provider=provider)
+
+    def get_search_manager(self) -> SearchManager:
+        """Return the shared search manager, building it on first use."""
+        with self._lock:
+            if self._search_manager is None:
+                self._search_manager = self._build_search_manager(create_provider(
+                    self.search_provider,
+                    api_key=self.serpapi_key,
+                    session=self.http_session,
+                    async_client=self.async_http_client,
+                    rate_limiter=self.rate_limiters.get(self.search_provider)
+                ))
+            return self._search_manager
+
+    def set_search_provider(self, provider: SearchProvider) -> None:
+        """Serve searches from another provider (e.g. an offline stub), behind the same cache."""
+        with self._lock:
+            self._search_manager = self._build_search_manager(provider)
+
+    def get_content_fetcher(self) -> ContentFetcher:
+        """Return the shared page fetcher, which downloads over the pooled HTTP session."""
+        with self._lock:
+            if self._content_fetcher is None:
+                self._content_fetcher = ContentFetcher(
+                    session=self.http_session, cache=self.content_cache, **self.content_options
+                )
+            return self._content_fetcher
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool usage of the shared HTTP session, per host."""
+        hosts = []
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts.append({
+                'host': pool.host,
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                # The pool queue is pre-filled with None placeholders; count real sockets only
+                'idle_connections': sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                if pool.pool is not None else 0
+            })
+        return {'max_connections_per_host': self.pool_size, 'hosts': hosts}
+
+    def stats(self) -> Dict[str, Any]:
+        """Registry, connection pool and cache statistics."""
+        with self._lock:
+            stats = {
+                'model_clients': [
+                    {'provider': p, 'temperature': t, 'max_tokens': m}
+                    for p, t, m in self._llms
+                ],
+                'registry_hits': self._hits,
+                'registry_misses': self._misses
+            }
+        stats['http_pool'] = self.pool_stats()
+        stats['routing'] = self.routing_stats()
+        stats['rate_limits'] = {name: limiter.stats() for name, limiter in self.rate_limiters.items()}
+        if self._content_fetcher is not None:
+            stats['content_fetch'] = self._content_fetcher.stats()
+        if self.search_cache is not None:
+            stats['search_cache'] = self.search_cache.stats()
+        if self.content_cache is not None:
+            stats['content_cache'] = self.content_cache.stats()
+        if self.llm_cache is not None:
+            stats['llm_cache'] = self.llm_cache.stats()
+        return stats
@@ -1,19 +1,86 @@
-from langchain_community.llms import OpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from typing import List, Dict, Any
+from langchain_core.prompts import PromptTemplate
+from typing import TYPE_CHECKING, AsyncIterable, Iterable, List, Dict, Any, Optional, Callable, Set, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import asyncio
 import logging
+import math
 from time import time
+from ..cache import CacheBackend
+from ..metrics import RequestTrace
 from ..search import SearchResult
+from .packing import SourcePacker, chars_per_token
+from .response_cache import llm_fingerprint, response_cache_key, source_analysis_cache_key
+
+if TYPE_CHECKING:
+    # langchain.chains imports most of langchain; it is loaded when the first manager is built
+    from langchain.chains import LLMChain
+    from langchain_community.llms import OpenAI
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+def _resolve(outcome: Future, source: SearchResult, analysis: Future) -> None:
+    """Complete a pipelined source's future from its analysis future."""
+    if analysis.exception() is not None:
+        outcome.set_exception(analysis.exception())
+    else:
+        outcome.set_result((source, analysis.result()))
+
 class ResearchChainManager:
-    def __init__(self, llm: OpenAI):
-        """Initialize the research chain manager with an OpenAI LLM."""
+    def __init__(self, llm: 'OpenAI', cache: Optional[CacheBackend] = None, analysis_mode: str = "stuff",
+                 map_concurrency: int = 4, map_timeout: float = 30.0, source_content_chars: int = 2000,
+                 analysis_llm: Optional['OpenAI'] = None, input_budgets: Optional[Dict[str, int]] = None,
+                 quorum: float = 0.75, straggler_timeout: float = 3.0,
+                 analysis_executor: Optional[ThreadPoolExecutor] = None):
+        """
+        Initialize the research chain manager.
+
+        Args:
+            llm: The LLM used for synthesis (and analysis unless analysis_llm is given)
+            cache: Optional cache for LLM responses and per-source analyses
+            analysis_mode: "stuff" analyzes all sources in one prompt; "map_reduce"
+                analyzes each source in parallel and combines the results
+            map_concurrency: Per-source analyses in flight at once (map_reduce mode)
+            map_timeout: Seconds a per-source analysis may take, counted from the start
+                of its LLM call (not its wait for a free slot), before the raw snippet
+                is used instead. A timed-out call keeps running, and holds its slot,
+                so its analysis still lands in the cache for the next request. For
+                pipelined analysis it also bounds the wait for the quorum.
+            source_content_chars: Characters of fetched page text included per source
+                when no input budgets are set
+            analysis_llm: Optional LLM for the source analysis stages, e.g. one with a
+                fixed output budget so analyses are shared by every depth
+            input_budgets: Optional token budget per depth for the formatted sources;
+                sources are then ranked, compressed and trimmed to fit (see SourcePacker)
+            quorum: Fraction of sources that must be analyzed before pipelined
+                synthesis starts (see process_research_stream)
+            straggler_timeout: Seconds pipelined synthesis waits for the remaining
+                sources once the quorum is reached
+            analysis_executor: Optional pool for per-source analyses shared with other
+                managers, so map_concurrency caps them all together; by default the
+                manager builds its own pool of map_concurrency threads
+        """
+        if analysis_mode not in ("stuff", "map_reduce"):
+            raise ValueError(f"Invalid analysis mode: {analysis_mode}")
+        if not 0 < quorum <= 1:
+            raise ValueError(f"Invalid quorum: {quorum}. Choose a fraction in (0, 1]")
+        from langchain.chains import LLMChain
+
         self.llm = llm
+        self.analysis_llm = analysis_llm or llm
+        self.packer = SourcePacker(input_budgets, chars_per_token(llm._llm_type)) if input_budgets else None
+        self.cache = cache
+        self.analysis_mode = analysis_mode
+        self.map_concurrency = map_concurrency
+        self.map_timeout = map_timeout
+        self.source_content_chars = source_content_chars
+        self.quorum = quorum
+        self.straggler_timeout = straggler_timeout
+        self._map_executor = analysis_executor
+        self._prepare_executor: Optional[ThreadPoolExecutor] = None
+        # Async analyses no request is waiting for any more, referenced until they finish
+        self._background_tasks: Set[asyncio.Task] = set()
         
         # Common source analysis prompt (used for all depths)
         self.source_analysis_prompt = PromptTemplate(
@@ -24,7 +91,19 @@ class ResearchChainManager:
                 "Sources:\n{sources}"
             )
         )
-        self.source_analysis_chain = LLMChain(llm=llm, prompt=self.source_analysis_prompt)
+        self.source_analysis_chain = LLMChain(llm=self.analysis_llm, prompt=self.source_analysis_prompt)
+        
+        # Single-source analysis prompt (map step of map_reduce mode). It mentions
+        # neither the topic nor the source's position so results are reusable.
+        self.single_source_analysis_prompt = PromptTemplate(
+            input_variables=["source"],
+            template=(
+                "Analyze the following search result and evaluate its credibility, key findings, "
+                "and relevance. Format your analysis as a short structured list.\n\n"
+                "Source:\n{source}"
+            )
+        )
+        self.single_source_analysis_chain = LLMChain(llm=self.analysis_llm, prompt=self.single_source_analysis_prompt)
         
         # Brief synthesis prompt
         self.brief_synthesis_prompt = PromptTemplate(
@@ -85,12 +164,7 @@ class ResearchChainManager:
         try:
             formatted = []
             for i, source in enumerate(sources, 1):
-                formatted.append(
-                    f"[Source {i}]\n"
-                    f"Title: {source.title}\n"
-                    f"URL: {source.url}\n"
-                    f"Snippet: {source.snippet}\n"
-                )
+                formatted.append(f"[Source {i}]\n" + self._format_source(source))
             
             formatted_text = "\n".join(formatted)
             format_duration = time() - format_start
@@ -102,34 +176,427 @@ class ResearchChainManager:
             logger.error(f"Source formatting error: {str(e)}")
             raise
     
-    def process_research(self, query: str, prompt: str, sources: List[SearchResult], depth: str = "detailed") -> Dict[str, Any]:
-        """Process a research query using the appropriate chain for the specified depth."""
+    def _format_source(self, source: SearchResult) -> str:
+        """Format one search result for the single-source analysis prompt."""
+        formatted = (
+            f"Title: {source.title}\n"
+            f"URL: {source.url}\n"
+            f"Snippet: {source.snippet}\n"
+        )
+        if source.content:
+            # Packed sources are already trimmed to the depth's budget
+            content = source.content if self.packer is not None else source.content[:self.source_content_chars]
+            formatted += f"Content: {content}\n"
+        return formatted
+
+    def _reduce_analyses(self, sources: List[SearchResult], analyses: Dict[int, str]) -> str:
+        """Combine per-source analyses into the synthesis input, keeping [Source N] numbering.
+
+        Sources whose analysis failed or timed out fall back to their raw snippet.
+        """
+        sections = []
+        for i, source in enumerate(sources, 1):
+            analysis = analyses.get(i)
+            if analysis is None:
+                analysis = f"(Not analyzed) {source.snippet}"
+            sections.append(f"[Source {i}] {source.title}\nURL: {source.url}\n{analysis.strip()}\n")
+        return "\n".join(sections)
+
+    def _analyze_source(self, source: SearchResult, callbacks: Optional[list] = None) -> str:
+        """Analyze one source, reusing a cached analysis of the same URL."""
+        key = source_analysis_cache_key(self.analysis_llm, source.url, source.content) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        output = self.single_source_analysis_chain.run({"source": self._format_source(source)}, callbacks=callbacks)
+        if key is not None:
+            self.cache.set(key, output)
+        return output
+
+    async def _aanalyze_source(self, source: SearchResult, callbacks: Optional[list] = None) -> str:
+        """Async variant of _analyze_source(); the cache is read and written off the event loop."""
+        key = source_analysis_cache_key(self.analysis_llm, source.url, source.content) if self.cache is not None else None
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+        output = await self.single_source_analysis_chain.arun(
+            {"source": self._format_source(source)}, callbacks=callbacks
+        )
+        if key is not None:
+            await self.cache.aset(key, output)
+        return output
+
+    def _analysis_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for per-source analyses, shared by every request on this manager."""
+        if self._map_executor is None:
+            self._map_executor = ThreadPoolExecutor(
+                max_workers=self.map_concurrency, thread_name_prefix="source-analysis"
+            )
+        return self._map_executor
+
+    def _background_task(self, coro, on_done: Optional[Callable[[], None]] = None) -> asyncio.Task:
+        """Start an analysis task that finishes even if the request stops waiting for it."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+
+        def finished(task: asyncio.Task) -> None:
+            self._background_tasks.discard(task)
+            if on_done is not None:
+                on_done()
+            if not task.cancelled():
+                # Retrieved so the failure of an abandoned analysis is not reported as unhandled
+                task.exception()
+
+        task.add_done_callback(finished)
+        return task
+
+    def _map_reduce_analysis(self, sources: List[SearchResult], callbacks: Optional[list] = None) -> str:
+        """Analyze sources in parallel on a bounded pool and combine the results.
+
+        Each analysis gets map_timeout seconds from the start of its call; see __init__.
+        """
+        map_start = time()
+        started: Dict[int, float] = {}
+
+        def analyze(i: int, source: SearchResult) -> str:
+            started[i] = time()
+            return self._analyze_source(source, callbacks)
+
+        futures = {
+            self._analysis_executor().submit(analyze, i, source): i
+            for i, source in enumerate(sources, 1)
+        }
+        pending = set(futures)
+        timed_out = set()
+        while pending:
+            now = time()
+            expired = {future for future in pending if now - started.get(futures[future], now) >= self.map_timeout}
+            for future in expired:
+                # Left running so its analysis still lands in the cache for next time
+                logger.warning(f"Analysis of source {futures[future]} exceeded {self.map_timeout}s")
+            timed_out |= expired
+            pending -= expired
+            if not pending:
+                break
+            # Wake at the first deadline; if none has started yet, check again once the
+            # ones that start meanwhile could have expired
+            deadlines = [started[futures[future]] + self.map_timeout for future in pending if futures[future] in started]
+            _, pending = wait(pending, timeout=(min(deadlines) if deadlines else now + self.map_timeout) - now,
+                              return_when=FIRST_COMPLETED)
+
+        analyses = {}
+        for future, i in futures.items():
+            if future in timed_out:
+                continue
+            try:
+                analyses[i] = future.result()
+            except Exception as e:
+                logger.warning(f"Analysis of source {i} failed: {str(e)}")
+
+        logger.info(f"Analyzed {len(analyses)}/{len(sources)} sources in {time() - map_start:.2f}s")
+        return self._reduce_analyses(sources, analyses)
+
+    async def _amap_reduce_analysis(self, sources: List[SearchResult], callbacks: Optional[list] = None) -> str:
+        """Async variant of _map_reduce_analysis()."""
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+        map_start = time()
+
+        async def analyze(source: SearchResult) -> str:
+            await semaphore.acquire()
+            # The slot is released when the call ends, not when the wait for it times out
+            task = self._background_task(self._aanalyze_source(source, callbacks), on_done=semaphore.release)
+            return await asyncio.wait_for(asyncio.shield(task), self.map_timeout)
+
+        results = await asyncio.gather(*(analyze(source) for source in sources), return_exceptions=True)
+        analyses = {}
+        for i, result in enumerate(results, 1):
+            if isinstance(result, asyncio.TimeoutError):
+                # Left running so its analysis still lands in the cache for next time
+                logger.warning(f"Analysis of source {i} exceeded {self.map_timeout}s")
+            elif isinstance(result, BaseException):
+                logger.warning(f"Analysis of source {i} failed: {str(result) or type(result).__name__}")
+            else:
+                analyses[i] = result
+
+        logger.info(f"Analyzed {len(analyses)}/{len(sources)} sources in {time() - map_start:.2f}s")
+        return self._reduce_analyses(sources, analyses)
+
+    def _prepare_source(self, source: SearchResult, depth: str, expected_sources: int,
+                        prepare: Optional[Callable[[SearchResult], SearchResult]]) -> SearchResult:
+        """Run the caller's per-source step (e.g. a page fetch), then trim to the depth's budget."""
+        if prepare is not None:
+            source = prepare(source)
+        if self.packer is not None:
+            source = self.packer.pack_source(source, depth, expected_sources)
+        return source
+
+    def _submit_pipelined(self, source: SearchResult, depth: str, expected_sources: int,
+                          prepare: Optional[Callable[[SearchResult], SearchResult]],
+                          callbacks: Optional[list] = None) -> Future:
+        """Prepare a source, then analyze it. Resolves to (prepared source, analysis).
+
+        Preparation (typically a page download) runs on its own pool so slow
+        pages do not hold the analysis pool's slots.
+        """
+        outcome: Future = Future()
+
+        def analyze(prepared: Future) -> None:
+            try:
+                source = prepared.result()
+                analysis = self._analysis_executor().submit(self._analyze_source, source, callbacks)
+            except Exception as e:
+                outcome.set_exception(e)
+                return
+            analysis.add_done_callback(lambda done: _resolve(outcome, source, done))
+
+        if self._prepare_executor is None:
+            # Page downloads are I/O bound and limited per host by the fetcher
+            self._prepare_executor = ThreadPoolExecutor(
+                max_workers=2 * self.map_concurrency, thread_name_prefix="source-prepare"
+            )
+        self._prepare_executor.submit(
+            self._prepare_source, source, depth, expected_sources, prepare
+        ).add_done_callback(analyze)
+        return outcome
+
+    def _collect_pipelined(self, received: List[SearchResult], results: Dict[int, Tuple[SearchResult, str]],
+                           dropped: int, failed: int, span) -> Tuple[List[SearchResult], str]:
+        """Keep the analyzed sources in arrival order and combine their analyses."""
+        span.attributes.update({'sources': len(received), 'analyzed': len(results), 'dropped': dropped, 'failed': failed})
+        logger.info(f"Analyzed {len(results)}/{len(received)} streamed sources ({dropped} dropped, {failed} failed)")
+        if not results:
+            # Nothing finished in time; synthesize from the raw snippets rather than nothing
+            return received, self._reduce_analyses(received, {})
+        kept = [results[i] for i in sorted(results)]
+        sources = [source for source, _ in kept]
+        return sources, self._reduce_analyses(sources, {i: analysis for i, (_, analysis) in enumerate(kept, 1)})
+
+    def _pipelined_analysis(self, sources: Iterable[SearchResult], depth: str, expected_sources: int,
+                            prepare: Optional[Callable[[SearchResult], SearchResult]],
+                            span) -> Tuple[List[SearchResult], str]:
+        """Analyze sources while they are still arriving; see process_research_stream()."""
+        futures = {}
+        received: List[SearchResult] = []
+        for source in sources:
+            futures[self._submit_pipelined(source, depth, expected_sources, prepare, span.callbacks)] = len(received)
+            received.append(source)
+
+        # Sources stopped arriving: wait for the quorum, then give stragglers a grace period
+        deadline = time() + self.map_timeout
+        quorum = math.ceil(self.quorum * len(received))
+        pending = set(futures)
+        while pending and len(futures) - len(pending) < quorum:
+            done, pending = wait(pending, timeout=max(deadline - time(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+        if pending:
+            _, pending = wait(pending, timeout=max(min(self.straggler_timeout, deadline - time()), 0))
+
+        results = {}
+        failed = 0
+        for future, i in futures.items():
+            if future in pending:
+                # Left running so its analysis still lands in the cache for next time
+                logger.warning(f"Dropped straggling analysis of {received[i].url}")
+                continue
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Analysis of {received[i].url} failed: {str(e)}")
+        return self._collect_pipelined(received, results, len(pending), failed, span)
+
+    async def _apipelined_analysis(self, sources: Union[Iterable[SearchResult], AsyncIterable[SearchResult]],
+                                   depth: str, expected_sources: int,
+                                   prepare: Optional[Callable[[SearchResult], SearchResult]],
+                                   span) -> Tuple[List[SearchResult], str]:
+        """Async variant of _pipelined_analysis(). prepare runs on a worker thread."""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+
+        async def analyze(source: SearchResult) -> Tuple[SearchResult, str]:
+            # Prepared outside the semaphore so slow pages do not hold analysis slots
+            source = await asyncio.to_thread(self._prepare_source, source, depth, expected_sources, prepare)
+            async with semaphore:
+                return source, await self._aanalyze_source(source, span.callbacks)
+
+        tasks = {}
+        received: List[SearchResult] = []
+        def submit(source: SearchResult) -> None:
+            tasks[self._background_task(analyze(source))] = len(received)
+            received.append(source)
+        if hasattr(sources, '__aiter__'):
+            async for source in sources:
+                submit(source)
+        else:
+            for source in sources:
+                submit(source)
+
+        deadline = loop.time() + self.map_timeout
+        quorum = math.ceil(self.quorum * len(received))
+        pending = set(tasks)
+        while pending and len(tasks) - len(pending) < quorum:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+        if pending:
+            _, pending = await asyncio.wait(pending, timeout=max(min(self.straggler_timeout, deadline - loop.time()), 0))
+
+        results = {}
+        failed = 0
+        for task, i in tasks.items():
+            if task in pending:
+                # Left running so its analysis still lands in the cache for next time
+                logger.warning(f"Dropped straggling analysis of {received[i].url}")
+            elif task.exception() is not None:
+                failed += 1
+                logger.warning(f"Analysis of {received[i].url} failed: {str(task.exception())}")
+            else:
+                results[i] = task.result()
+        return self._collect_pipelined(received, results, len(pending), failed, span)
+
+    def _cache_lookup(self, chain: 'LLMChain', inputs: Dict[str, Any], stage: str) -> tuple:
+        """Render the prompt and check the response cache. Returns (rendered, key, cached)."""
+        rendered = chain.prompt.format(**inputs)
+        if self.cache is None:
+            return rendered, None, None
+        key = response_cache_key(chain.llm, rendered)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for {stage} stage")
+        return rendered, key, cached
+
+    async def _acache_lookup(self, chain: 'LLMChain', inputs: Dict[str, Any], stage: str) -> tuple:
+        """Async variant of _cache_lookup() that reads the cache off the event loop."""
+        rendered = chain.prompt.format(**inputs)
+        if self.cache is None:
+            return rendered, None, None
+        key = response_cache_key(chain.llm, rendered)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for {stage} stage")
+        return rendered, key, cached
+
+    def _run_chain(self, chain: 'LLMChain', inputs: Dict[str, Any], stage: str,
+                   on_token: Optional[Callable[[str], None]] = None, callbacks: Optional[list] = None) -> str:
+        """Run a chain, serving identical rendered prompts from the response cache.
+
+        When on_token is given the LLM output is streamed and each chunk is
+        passed to it as it arrives; a cache hit is delivered as a single chunk.
+        Callbacks (e.g. a span's token usage handler) are passed to the LLM call.
+        """
+        if self.cache is None and on_token is None:
+            return chain.run(inputs, callbacks=callbacks)
+
+        rendered, key, cached = self._cache_lookup(chain, inputs, stage)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        if on_token is None:
+            output = chain.run(inputs, callbacks=callbacks)
+        else:
+            chunks = []
+            for chunk in chain.llm.stream(rendered, config={"callbacks": callbacks}):
+                chunks.append(chunk)
+                on_token(chunk)
+            output = "".join(chunks)
+
+        if key is not None:
+            self.cache.set(key, output)
+        return output
+
+    async def _arun_chain(self, chain: 'LLMChain', inputs: Dict[str, Any], stage: str,
+                          on_token: Optional[Callable[[str], None]] = None, callbacks: Optional[list] = None) -> str:
+        """Async variant of _run_chain() using the providers' async LLM APIs."""
+        if self.cache is None and on_token is None:
+            return await chain.arun(inputs, callbacks=callbacks)
+
+        rendered, key, cached = await self._acache_lookup(chain, inputs, stage)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        if on_token is None:
+            output = await chain.arun(inputs, callbacks=callbacks)
+        else:
+            chunks = []
+            async for chunk in chain.llm.astream(rendered, config={"callbacks": callbacks}):
+                chunks.append(chunk)
+                on_token(chunk)
+            output = "".join(chunks)
+
+        if key is not None:
+            await self.cache.aset(key, output)
+        return output
+
+    def _synthesis_chain(self, depth: str) -> 'LLMChain':
+        """Choose the synthesis chain for a research depth."""
+        if depth.lower() == "brief":
+            return self.brief_chain
+        elif depth.lower() == "detailed":
+            return self.detailed_chain
+        elif depth.lower() == "comprehensive":
+            return self.comprehensive_chain
+        raise ValueError(f"Invalid research depth: {depth}")
+
+    def _trace(self, trace: Optional[RequestTrace], depth: str) -> RequestTrace:
+        """Use the caller's trace, or start one labelled with this manager's provider."""
+        return trace or RequestTrace(provider=llm_fingerprint(self.llm)['provider'], depth=depth)
+
+    def _pack(self, sources: List[SearchResult], query: str, depth: str, trace: RequestTrace) -> List[SearchResult]:
+        """Fit sources to the depth's input budget when budgets are configured."""
+        if self.packer is None:
+            return sources
+        with trace.span("pack") as span:
+            packed, stats = self.packer.pack(sources, query, depth)
+            span.attributes.update(stats)
+        return packed
+
+    def process_research(self, query: str, prompt: str, sources: List[SearchResult], depth: str = "detailed",
+                         on_token: Optional[Callable[[str], None]] = None,
+                         trace: Optional[RequestTrace] = None) -> Dict[str, Any]:
+        """Process a research query using the appropriate chain for the specified depth.
+
+        If on_token is given, synthesis output is streamed to it chunk by chunk.
+        The format, analysis and synthesis stages are timed as spans on trace
+        and returned under "timings".
+        """
         start_time = time()
+        trace = self._trace(trace, depth)
+        sources = self._pack(sources, query, depth, trace)
         logger.info(f"\n{'='*80}\nStarting Research Query: {query}\nDepth: {depth}\n{'='*80}")
         
         try:
-            # Format sources for analysis
-            formatted_sources = self._format_sources(sources)
-            
             # Run source analysis
-            source_analysis = self.source_analysis_chain.run({"sources": formatted_sources})
+            if self.analysis_mode == "map_reduce":
+                with trace.span("analysis", sources=len(sources)) as span:
+                    source_analysis = self._map_reduce_analysis(sources, callbacks=span.callbacks)
+            else:
+                with trace.span("format", sources=len(sources)):
+                    formatted_sources = self._format_sources(sources)
+                with trace.span("analysis", sources=len(sources)) as span:
+                    source_analysis = self._run_chain(
+                        self.source_analysis_chain, {"sources": formatted_sources}, "source_analysis",
+                        callbacks=span.callbacks
+                    )
             
             # Choose synthesis chain based on depth
-            if depth.lower() == "brief":
-                synthesis_chain = self.brief_chain
-            elif depth.lower() == "detailed":
-                synthesis_chain = self.detailed_chain
-            elif depth.lower() == "comprehensive":
-                synthesis_chain = self.comprehensive_chain
-            else:
-                raise ValueError(f"Invalid research depth: {depth}")
+            synthesis_chain = self._synthesis_chain(depth)
             
             # Run synthesis
-            synthesis = synthesis_chain.run({
-                "source_analysis": source_analysis,
-                "query": query,
-                "prompt": prompt
-            })
+            with trace.span("synthesis") as span:
+                synthesis = self._run_chain(synthesis_chain, {
+                    "source_analysis": source_analysis,
+                    "query": query,
+                    "prompt": prompt
+                }, "synthesis", on_token=on_token, callbacks=span.callbacks)
             
             duration = time() - start_time
             
@@ -137,7 +604,9 @@ class ResearchChainManager:
             response = {
                 "result": synthesis,
                 "duration": duration,
-                "depth": depth
+                "depth": depth,
+                "sources": sources,
+                "timings": trace.timings()
             }
             
             logger.info(f"\n{'='*80}\nResearch Complete\n{'='*80}")
@@ -146,3 +615,137 @@ class ResearchChainManager:
         except Exception as e:
             logger.error(f"Research processing failed: {str(e)}")
             raise
+
+    async def aprocess_research(self, query: str, prompt: str, sources: List[SearchResult], depth: str = "detailed",
+                                on_token: Optional[Callable[[str], None]] = None,
+                                trace: Optional[RequestTrace] = None) -> Dict[str, Any]:
+        """Async variant of process_research() that awaits the LLM calls instead of blocking."""
+        start_time = time()
+        trace = self._trace(trace, depth)
+        sources = self._pack(sources, query, depth, trace)
+        logger.info(f"\n{'='*80}\nStarting Async Research Query: {query}\nDepth: {depth}\n{'='*80}")
+        
+        try:
+            if self.analysis_mode == "map_reduce":
+                with trace.span("analysis", sources=len(sources)) as span:
+                    source_analysis = await self._amap_reduce_analysis(sources, callbacks=span.callbacks)
+            else:
+                with trace.span("format", sources=len(sources)):
+                    formatted_sources = self._format_sources(sources)
+                with trace.span("analysis", sources=len(sources)) as span:
+                    source_analysis = await self._arun_chain(
+                        self.source_analysis_chain, {"sources": formatted_sources}, "source_analysis",
+                        callbacks=span.callbacks
+                    )
+            with trace.span("synthesis") as span:
+                synthesis = await self._arun_chain(self._synthesis_chain(depth), {
+                    "source_analysis": source_analysis,
+                    "query": query,
+                    "prompt": prompt
+                }, "synthesis", on_token=on_token, callbacks=span.callbacks)
+            
+            response = {
+                "result": synthesis,
+                "duration": time() - start_time,
+                "depth": depth,
+                "sources": sources,
+                "timings": trace.timings()
+            }
+            
+            logger.info(f"\n{'='*80}\nResearch Complete\n{'='*80}")
+            return response
+            
+        except Exception as e:
+            logger.error(f"Research processing failed: {str(e)}")
+            raise
+
+    def process_research_stream(self, query: str, prompt: str, sources: Iterable[SearchResult],
+                                depth: str = "detailed", on_token: Optional[Callable[[str], None]] = None,
+                                trace: Optional[RequestTrace] = None,
+                                prepare: Optional[Callable[[SearchResult], SearchResult]] = None,
+                                expected_sources: int = 5) -> Dict[str, Any]:
+        """Pipelined variant of process_research() for sources that arrive over time.
+
+        Each source is prepared (e.g. its page fetched), trimmed to an even
+        share of the depth's input budget and analyzed on its own as soon as
+        sources yields it, so analysis overlaps a search that is still running.
+        Once sources is exhausted, synthesis waits until the quorum fraction of
+        analyses has finished, then at most straggler_timeout seconds for the
+        rest. Sources whose analysis failed or was dropped are left out of the
+        synthesis and of the "sources" in the response.
+
+        Args:
+            sources: Search results, typically a generator fed by the search
+            prepare: Optional per-source step (e.g. a page fetch), run on a separate
+                source-prepare pool so slow pages do not hold analysis slots
+            expected_sources: Number of sources the input budget is shared between
+        """
+        start_time = time()
+        trace = self._trace(trace, depth)
+        logger.info(f"\n{'='*80}\nStarting Pipelined Research Query: {query}\nDepth: {depth}\n{'='*80}")
+
+        try:
+            with trace.span("analysis", pipelined=True) as span:
+                sources, source_analysis = self._pipelined_analysis(sources, depth, expected_sources, prepare, span)
+            with trace.span("synthesis") as span:
+                synthesis = self._run_chain(self._synthesis_chain(depth), {
+                    "source_analysis": source_analysis,
+                    "query": query,
+                    "prompt": prompt
+                }, "synthesis", on_token=on_token, callbacks=span.callbacks)
+
+            response = {
+                "result": synthesis,
+                "duration": time() - start_time,
+                "depth": depth,
+                "sources": sources,
+                "timings": trace.timings()
+            }
+
+            logger.info(f"\n{'='*80}\nResearch Complete\n{'='*80}")
+            return response
+
+        except Exception as e:
+            logger.error(f"Research processing failed: {str(e)}")
+            raise
+
+    async def aprocess_research_stream(self, query: str, prompt: str,
+                                       sources: Union[Iterable[SearchResult], AsyncIterable[SearchResult]],
+                                       depth: str = "detailed", on_token: Optional[Callable[[str], None]] = None,
+                                       trace: Optional[RequestTrace] = None,
+                                       prepare: Optional[Callable[[SearchResult], SearchResult]] = None,
+                                       expected_sources: int = 5) -> Dict[str, Any]:
+        """Async variant of process_research_stream(); sources may also be an async iterable.
+
+        prepare runs in a worker thread rather than on the source-prepare pool.
+        """
+        start_time = time()
+        trace = self._trace(trace, depth)
+        logger.info(f"\n{'='*80}\nStarting Async Pipelined Research Query: {query}\nDepth: {depth}\n{'='*80}")
+
+        try:
+            with trace.span("analysis", pipelined=True) as span:
+                sources, source_analysis = await self._apipelined_analysis(
+                    sources, depth, expected_sources, prepare, span
+                )
+            with trace.span("synthesis") as span:
+                synthesis = await self._arun_chain(self._synthesis_chain(depth), {
+                    "source_analysis": source_analysis,
+                    "query": query,
+                    "prompt": prompt
+                }, "synthesis", on_token=on_token, callbacks=span.callbacks)
+
+            response = {
+                "result": synthesis,
+                "duration": time() - start_time,
+                "depth": depth,
+                "sources": sources,
+                "timings": trace.timings()
+            }
+
+            logger.info(f"\n{'='*80}\nResearch Complete\n{'='*80}")
+            return response
+
+        except Exception as e:
+            logger.error(f"Research processing failed: {str(e)}")
+            raise
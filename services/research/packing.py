@@ -0,0 +1,200 @@
+from typing import Dict, List, Set, Tuple
+from dataclasses import replace
+import hashlib
+import logging
+import re
+from ..search import SearchResult
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Approximate characters per token for English prose, by provider tokenizer
+CHARS_PER_TOKEN = {
+    'openai': 4.0,
+    'anthropic': 3.5,
+    'gemini': 4.0,
+    'google': 4.0
+}
+DEFAULT_CHARS_PER_TOKEN = 3.5
+
+# Tokens for the "[Source N]" label, field names and separators around each source
+SOURCE_OVERHEAD_TOKENS = 12
+
+# Sentences that are page chrome rather than content
+BOILERPLATE_PATTERNS = re.compile(
+    r"cookie|privacy policy|terms of (use|service)|all rights reserved|subscribe|sign up|sign in|log in|"
+    r"newsletter|advertisement|enable javascript|click here|share this|follow us|read more|"
+    r"skip to (main )?content|accept all",
+    re.IGNORECASE
+)
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'is', 'are', 'what', 'how',
+    'why', 'about', 'from', 'by', 'at', 'as', 'be', 'this', 'that', 'it', 'its', 'vs', 'versus'
+}
+
+def chars_per_token(llm_type: str) -> float:
+    """Characters per token for a provider, matched on its LangChain LLM type."""
+    llm_type = (llm_type or '').lower()
+    for provider, ratio in CHARS_PER_TOKEN.items():
+        if provider in llm_type:
+            return ratio
+    return DEFAULT_CHARS_PER_TOKEN
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "brief=1500,detailed=3000" into per-depth token budgets."""
+    budgets = {}
+    for part in spec.split(','):
+        depth, _, tokens = part.partition('=')
+        if depth.strip() and tokens.strip():
+            budgets[depth.strip().lower()] = int(tokens)
+    return budgets
+
+def _terms(text: str) -> Set[str]:
+    return {word for word in WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 1}
+
+def compress_text(text: str, seen: Set[str]) -> str:
+    """
+    Drop boilerplate sentences and sentences already used by another source.
+
+    Args:
+        text: Page text or snippet
+        seen: Fingerprints of sentences kept so far; updated in place
+    """
+    kept = []
+    for sentence in SENTENCE_SPLIT.split(text):
+        sentence = ' '.join(sentence.split())
+        if len(sentence) < 20 or BOILERPLATE_PATTERNS.search(sentence):
+            continue
+        fingerprint = hashlib.sha1(' '.join(WORD.findall(sentence.lower())).encode('utf-8')).hexdigest()
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        kept.append(sentence)
+    return ' '.join(kept)
+
+def truncate_to_sentence(text: str, max_chars: int) -> str:
+    """Cut text to max_chars, backing off to the last sentence end when there is one."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    end = max(cut.rfind('. '), cut.rfind('! '), cut.rfind('? '))
+    return cut[:end + 1] if end > max_chars // 2 else cut.rstrip() + '...'
+
+class SourcePacker:
+    """Fits sources into a per-depth input token budget.
+
+    Sources are ranked by overlap with the query (title matches count double)
+    plus a search-position prior. In rank order, each source keeps its title,
+    URL and snippet while they fit. Fetched page text is compressed and then
+    shares the remaining budget in proportion to relevance; text a source does
+    not need flows on to the next source.
+    """
+
+    def __init__(self, input_budgets: Dict[str, int], chars_per_token: float = DEFAULT_CHARS_PER_TOKEN):
+        """
+        Args:
+            input_budgets: Token budget for the formatted sources, per research depth
+            chars_per_token: Characters per token of the target model
+        """
+        self.input_budgets = input_budgets
+        self.chars_per_token = chars_per_token
+
+    def estimate_tokens(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+
+    def source_tokens(self, source: SearchResult) -> int:
+        """Estimated prompt tokens of a formatted source."""
+        return (
+            SOURCE_OVERHEAD_TOKENS
+            + self.estimate_tokens(f"{source.title} {source.url} {source.snippet}")
+            + (self.estimate_tokens(source.content) if source.content else 0)
+        )
+
+    def relevance(self, source: SearchResult, query_terms: Set[str], position: int) -> float:
+        """Query-term overlap score with a prior favouring higher search positions."""
+        prior = 1.0 / (position + 2)
+        if not query_terms:
+            return prior
+        title = len(query_terms & _terms(source.title)) / len(query_terms)
+        body = len(query_terms & _terms(f"{source.snippet} {source.content or ''}")) / len(query_terms)
+        return 2 * title + body + prior
+
+    def pack(self, sources: List[SearchResult], query: str, depth: str) -> Tuple[List[SearchResult], Dict[str, int]]:
+        """
+        Rank, compress and trim sources to the depth's input budget.
+
+        Returns:
+            (packed sources in rank order, stats with tokens_before, tokens_after and dropped)
+        """
+        tokens_before = sum(self.source_tokens(source) for source in sources)
+        budget = self.input_budgets.get(depth.lower())
+        if budget is None or not sources:
+            return sources, {'tokens_before': tokens_before, 'tokens_after': tokens_before, 'dropped': 0}
+
+        query_terms = _terms(query)
+        ranked = sorted(
+            enumerate(sources),
+            key=lambda item: self.relevance(item[1], query_terms, item[0]),
+            reverse=True
+        )
+
+        # Title, URL and snippet first, in rank order, while they fit
+        kept: List[SearchResult] = []
+        used = 0
+        for _, source in ranked:
+            header = self.source_tokens(replace(source, content=None))
+            if used + header > budget:
+                continue
+            kept.append(source)
+            used += header
+
+        # Then compressed page text, shared by relevance across sources that have it
+        seen: Set[str] = set()
+        compressed: Dict[int, str] = {}
+        for i, source in enumerate(kept):
+            if source.content:
+                text = compress_text(source.content, seen)
+                if text:
+                    compressed[i] = text
+        weights = {i: self.relevance(kept[i], query_terms, i) for i in compressed}
+        pending_weight = sum(weights.values())
+        remaining = budget - used
+        packed = [replace(source, content=None) for source in kept]
+        for i in sorted(compressed, key=lambda index: weights[index], reverse=True):
+            share = remaining * weights[i] / pending_weight if pending_weight else 0
+            pending_weight -= weights[i]
+            text = truncate_to_sentence(compressed[i], int(max(share - 1, 0) * self.chars_per_token))
+            if len(text) < 40:
+                continue
+            packed[i] = replace(kept[i], content=text)
+            remaining -= self.estimate_tokens(text)
+
+        tokens_after = sum(self.source_tokens(source) for source in packed)
+        stats = {'tokens_before': tokens_before, 'tokens_after': tokens_after, 'dropped': len(sources) - len(kept)}
+        logger.info(f"Packed {len(kept)}/{len(sources)} sources into ~{tokens_after} tokens "
+                    f"(budget {budget}, was ~{tokens_before})")
+        return packed, stats
+
+    def pack_source(self, source: SearchResult, depth: str, num_sources: int) -> SearchResult:
+        """
+        Trim one source's page text to an even share of the depth's input budget.
+
+        Used when sources are analyzed as they arrive, before the whole set is
+        known and can be ranked against itself.
+
+        Args:
+            source: The source to trim
+            depth: Research depth whose budget applies
+            num_sources: Number of sources expected to share the budget
+        """
+        budget = self.input_budgets.get(depth.lower())
+        if budget is None or not source.content:
+            return source
+        header = self.source_tokens(replace(source, content=None))
+        share = budget / max(num_sources, 1) - header
+        text = truncate_to_sentence(compress_text(source.content, set()), int(max(share - 1, 0) * self.chars_per_token))
+        return replace(source, content=text if len(text) >= 40 else None)
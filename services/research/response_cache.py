@@ -0,0 +1,37 @@
+from typing import Any, Optional
+import hashlib
+import json
+from ..search.dedup import canonicalize_url
+
+def llm_fingerprint(llm: Any) -> dict:
+    """Describe the provider and generation settings that affect an LLM's output."""
+    if hasattr(llm, 'cache_fingerprint'):
+        return llm.cache_fingerprint()
+    return {
+        'provider': getattr(llm, '_llm_type', type(llm).__name__),
+        'model': getattr(llm, 'model_name', None) or getattr(llm, 'model', None),
+        'temperature': getattr(llm, 'temperature', None),
+        # OpenAI clients call it max_tokens, Gemini max_output_tokens and Anthropic max_tokens_to_sample
+        'max_tokens': (
+            getattr(llm, 'max_tokens', None)
+            or getattr(llm, 'max_output_tokens', None)
+            or getattr(llm, 'max_tokens_to_sample', None)
+        )
+    }
+
+def response_cache_key(llm: Any, prompt: str) -> str:
+    """Content-addressed cache key for a fully rendered prompt sent to an LLM."""
+    material = json.dumps([llm_fingerprint(llm), prompt], sort_keys=True, default=str)
+    return "llm:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def source_analysis_cache_key(llm: Any, url: str, content: Optional[str] = None) -> str:
+    """Cache key for a single source's analysis, shared by every topic that surfaces the URL.
+
+    When the page text was fetched it is part of the key, so a changed page
+    (or a snippet-only analysis) is never served for it.
+    """
+    material = [llm_fingerprint(llm), canonicalize_url(url)]
+    if content:
+        material.append(hashlib.sha256(content.encode("utf-8")).hexdigest())
+    material = json.dumps(material, sort_keys=True, default=str)
+    return "source_analysis:" + hashlib.sha256(material.encode("utf-8")).hexdigest()
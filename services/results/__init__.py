@@ -0,0 +1,3 @@
+# This file makes the results directory a Python package
+from .http import body_response, encode_body, etag_matches, result_response
+from .store import ResultStore, StoredResult
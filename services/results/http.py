@@ -0,0 +1,103 @@
+from typing import Dict, Optional, Tuple
+import gzip
+import hashlib
+from .store import StoredResult, compress, decompress
+
+# Bodies smaller than this are sent uncompressed; the gzip framing would outweigh the savings
+MIN_COMPRESS_BYTES = 1024
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {encoding: q}, leaving out refused (q=0) encodings."""
+    encodings = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            encodings[name] = q
+    return encodings
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the entity tag (weak comparison)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+def encode_body(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """gzip a response body when the client accepts it and it is large enough to gain. Returns (body, encoding)."""
+    if len(body) < MIN_COMPRESS_BYTES or 'gzip' not in accepted_encodings(accept_encoding):
+        return body, None
+    return gzip.compress(body, compresslevel=6, mtime=0), 'gzip'
+
+def encode_stored(stored: StoredResult, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Pick the cheapest body for a stored result. Returns (body, encoding).
+
+    The stored blob is sent as-is when the client accepts the store's codec;
+    otherwise it is decompressed and, for zstd-stored results, recompressed
+    with gzip if the client accepts that.
+    """
+    encodings = accepted_encodings(accept_encoding)
+    if stored.codec in encodings:
+        return stored.data, stored.codec
+    body = decompress(stored.data, stored.codec)
+    if 'gzip' in encodings and len(body) >= MIN_COMPRESS_BYTES:
+        return compress(body, 'gzip'), 'gzip'
+    return body, None
+
+def result_response(stored: StoredResult, accept_encoding: Optional[str],
+                    if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    Status, body and headers for serving a stored result over HTTP.
+
+    Results never change once stored, so a matching If-None-Match is
+    answered with an empty 304.
+    """
+    headers = {
+        'ETag': f'"{stored.etag}"',
+        'Cache-Control': 'private, max-age=86400',
+        'Vary': 'Accept-Encoding'
+    }
+    if etag_matches(if_none_match, stored.etag):
+        return 304, b'', headers
+    body, encoding = encode_stored(stored, accept_encoding)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return 200, body, headers
+
+def body_response(body: bytes, accept_encoding: Optional[str],
+                  if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    Status, body and headers for a response body that can change between
+    requests, such as a page of results. It is tagged with a hash of its
+    content, so clients revalidate every time but skip the download when
+    nothing changed.
+    """
+    headers = {
+        'ETag': f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding'
+    }
+    if etag_matches(if_none_match, headers['ETag'].strip('"')):
+        return 304, b'', headers
+    body, encoding = encode_body(body, accept_encoding)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return 200, body, headers
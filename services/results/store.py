@@ -0,0 +1,318 @@
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:  # Optional; only needed for the zstd codec
+    zstandard = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CODECS = ('gzip', 'zstd')
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+MAX_PAGE_SIZE = 100
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    """Compress data with a store codec. Both produce streams usable as an HTTP Content-Encoding."""
+    level = DEFAULT_LEVELS.get(codec) if level is None else level
+    if codec == 'gzip':
+        # mtime=0 keeps the output, and so the stored blob, deterministic
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("The zstd codec needs the zstandard package: pip install zstandard")
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Invalid result codec: {codec}. Choose from: {', '.join(CODECS)}")
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Inverse of compress()."""
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ImportError("The zstd codec needs the zstandard package: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Invalid result codec: {codec}. Choose from: {', '.join(CODECS)}")
+
+def normalize_topic(topic: str) -> str:
+    return ' '.join(topic.lower().split())
+
+@dataclass
+class StoredResult:
+    """A persisted research result, still compressed as stored."""
+    session_id: str
+    topic: str
+    depth: str
+    provider: str
+    created_at: float
+    codec: str
+    data: bytes
+    # Hash of the uncompressed JSON, usable as an HTTP entity tag
+    etag: str
+    size: int
+
+    def body(self) -> bytes:
+        """The result's JSON document."""
+        return decompress(self.data, self.codec)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return json.loads(self.body())
+
+class ResultStore:
+    """Persistent store of finished research results, compressed in SQLite.
+
+    Each result is stored once, keyed by session id, as a compressed JSON
+    blob next to indexed topic, depth, provider and timestamp columns, so
+    listing and filtering never decompress a body. Fetching a result returns
+    the compressed blob and its entity tag, so an HTTP layer can answer with
+    a 304 or send the blob as-is when the client accepts its encoding.
+
+    Several processes can share one database (WAL mode). Results older than
+    max_age, and the oldest beyond max_entries, are pruned every prune_every
+    writes. Entry and byte totals are kept in a meta table by triggers, so
+    stats() stays cheap enough for every metrics scrape.
+    """
+
+    def __init__(self, path: str, codec: str = 'gzip', level: Optional[int] = None,
+                 max_age: float = 30 * 24 * 3600, max_entries: int = 10000, prune_every: int = 100):
+        """
+        Args:
+            path: SQLite database file
+            codec: 'gzip', or 'zstd' when the zstandard package is installed
+            level: Compression level (default: 6 for gzip, 3 for zstd)
+            max_age: Seconds a result is kept
+            max_entries: Results kept by pruning, newest first
+            prune_every: Writes between pruning passes
+
+        Raises:
+            ValueError: If the codec is unknown
+            ImportError: If the codec's package is not installed
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Invalid result codec: {codec}. Choose from: {', '.join(CODECS)}")
+        if codec == 'zstd' and zstandard is None:
+            raise ImportError("The zstd codec needs the zstandard package: pip install zstandard")
+        self.path = path
+        self.codec = codec
+        self.level = level
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._reads = 0
+        self._misses = 0
+        self._pruned = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "session_id TEXT PRIMARY KEY, topic TEXT NOT NULL, topic_key TEXT NOT NULL, depth TEXT NOT NULL, "
+            "provider TEXT NOT NULL, created_at REAL NOT NULL, duration REAL, num_sources INTEGER NOT NULL, "
+            "codec TEXT NOT NULL, size INTEGER NOT NULL, stored_size INTEGER NOT NULL, etag TEXT NOT NULL, "
+            "data BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at, session_id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_topic ON results (topic_key, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_depth ON results (depth, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_provider ON results (provider, created_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Seeded from the table once, for databases written before the meta table existed
+        self._conn.execute(
+            "INSERT OR IGNORE INTO results_meta (name, value) "
+            "SELECT 'entries', COUNT(*) FROM results UNION ALL "
+            "SELECT 'bytes', COALESCE(SUM(size), 0) FROM results UNION ALL "
+            "SELECT 'stored_bytes', COALESCE(SUM(stored_size), 0) FROM results"
+        )
+        self._conn.executescript("""
+            CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+                UPDATE results_meta SET value = value + 1 WHERE name = 'entries';
+                UPDATE results_meta SET value = value + NEW.size WHERE name = 'bytes';
+                UPDATE results_meta SET value = value + NEW.stored_size WHERE name = 'stored_bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+                UPDATE results_meta SET value = value - 1 WHERE name = 'entries';
+                UPDATE results_meta SET value = value - OLD.size WHERE name = 'bytes';
+                UPDATE results_meta SET value = value - OLD.stored_size WHERE name = 'stored_bytes';
+            END;
+            CREATE TRIGGER IF NOT EXISTS results_resize AFTER UPDATE OF size, stored_size ON results BEGIN
+                UPDATE results_meta SET value = value - OLD.size + NEW.size WHERE name = 'bytes';
+                UPDATE results_meta SET value = value - OLD.stored_size + NEW.stored_size WHERE name = 'stored_bytes';
+            END;
+        """)
+        self._conn.commit()
+
+    def put(self, session_id: str, topic: str, depth: str, provider: str, response: Dict[str, Any]) -> StoredResult:
+        """Store a finished research response, replacing any earlier one for the session."""
+        body = json.dumps(response, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        data = compress(body, self.codec, self.level)
+        stored = StoredResult(
+            session_id=session_id,
+            topic=topic,
+            depth=depth,
+            provider=provider,
+            created_at=time.time(),
+            codec=self.codec,
+            data=data,
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            size=len(body)
+        )
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the triggers
+            self._conn.execute(
+                "INSERT INTO results (session_id, topic, topic_key, depth, provider, created_at, duration, "
+                "num_sources, codec, size, stored_size, etag, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET topic = excluded.topic, topic_key = excluded.topic_key, "
+                "depth = excluded.depth, provider = excluded.provider, created_at = excluded.created_at, "
+                "duration = excluded.duration, num_sources = excluded.num_sources, codec = excluded.codec, "
+                "size = excluded.size, stored_size = excluded.stored_size, etag = excluded.etag, data = excluded.data",
+                (session_id, topic, normalize_topic(topic), depth, provider, stored.created_at,
+                 response.get('duration'), len(response.get('sources') or []), self.codec, len(body), len(data),
+                 stored.etag, data)
+            )
+            self._conn.commit()
+            self._writes += 1
+            if self.prune_every and self._writes % self.prune_every == 0:
+                self._prune()
+        return stored
+
+    def get(self, session_id: str) -> Optional[StoredResult]:
+        """Return the stored result for a session, or None if there is none (or it expired)."""
+        with self._lock:
+            self._reads += 1
+            row = self._conn.execute(
+                "SELECT topic, depth, provider, created_at, codec, data, etag, size FROM results "
+                "WHERE session_id = ? AND created_at >= ?",
+                (session_id, time.time() - self.max_age)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+        topic, depth, provider, created_at, codec, data, etag, size = row
+        return StoredResult(session_id, topic, depth, provider, created_at, codec, data, etag, size)
+
+    def list(self, topic: Optional[str] = None, query: Optional[str] = None, depth: Optional[str] = None,
+             provider: Optional[str] = None, limit: int = 20,
+             cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        List stored results, newest first, without decompressing them.
+
+        Args:
+            topic: Only results for this exact topic (case and spacing ignored)
+            query: Only results whose topic contains this text
+            depth: Only results of this depth
+            provider: Only results from this model provider
+            limit: Results per page (at most MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            (summaries, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            ValueError: If limit or cursor is invalid
+        """
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {MAX_PAGE_SIZE}")
+        clauses = ["created_at >= ?"]
+        params: List[Any] = [time.time() - self.max_age]
+        if topic:
+            clauses.append("topic_key = ?")
+            params.append(normalize_topic(topic))
+        if query:
+            escaped = normalize_topic(query).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("topic_key LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if depth:
+            clauses.append("depth = ?")
+            params.append(depth)
+        if provider:
+            clauses.append("provider = ?")
+            params.append(provider)
+        if cursor:
+            # Keyset pagination: the page starts after the last row of the previous one
+            created_at, session_id = self._parse_cursor(cursor)
+            clauses.append("(created_at, session_id) < (?, ?)")
+            params.extend([created_at, session_id])
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, topic, depth, provider, created_at, duration, num_sources, size, stored_size "
+                f"FROM results WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, session_id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        summaries = [
+            {
+                'session_id': session_id,
+                'topic': topic,
+                'depth': depth,
+                'model': provider,
+                'created_at': created_at,
+                'duration': duration,
+                'num_sources': num_sources,
+                'size': size,
+                'stored_size': stored_size
+            }
+            for session_id, topic, depth, provider, created_at, duration, num_sources, size, stored_size in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = summaries[-1]
+            next_cursor = f"{last['created_at']!r}:{last['session_id']}"
+        return summaries, next_cursor
+
+    def _parse_cursor(self, cursor: str) -> Tuple[float, str]:
+        created_at, _, session_id = cursor.partition(':')
+        try:
+            return float(created_at), session_id
+        except ValueError:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def prune(self) -> int:
+        """Delete expired and surplus results. Returns the number removed."""
+        with self._lock:
+            return self._prune()
+
+    def _prune(self) -> int:
+        """prune() body. Caller holds the lock."""
+        removed = self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,)).rowcount
+        removed += self._conn.execute(
+            "DELETE FROM results WHERE session_id NOT IN "
+            "(SELECT session_id FROM results ORDER BY created_at DESC LIMIT ?)",
+            (self.max_entries,)
+        ).rowcount
+        self._conn.commit()
+        self._pruned += removed
+        if removed:
+            logger.info(f"Pruned {removed} stored research results")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry and byte totals from the meta table, plus this process's counters."""
+        with self._lock:
+            totals = dict(self._conn.execute("SELECT name, value FROM results_meta").fetchall())
+            entries, size, stored_size = totals['entries'], totals['bytes'], totals['stored_bytes']
+            return {
+                'codec': self.codec,
+                'entries': entries,
+                'bytes': size,
+                'stored_bytes': stored_size,
+                'compression_ratio': size / stored_size if stored_size else 0.0,
+                'writes': self._writes,
+                'reads': self._reads,
+                'misses': self._misses,
+                'pruned': self._pruned
+            }
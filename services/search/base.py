@@ -0,0 +1,143 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, fields
+from urllib.parse import urlsplit
+import asyncio
+import json
+
+try:
+    import msgpack
+except ImportError:  # Optional; only needed for the msgpack encoding
+    msgpack = None
+
+# Authority by top-level domain; anything else gets DEFAULT_DOMAIN_AUTHORITY
+TLD_AUTHORITY = {'gov': 0.9, 'edu': 0.9, 'int': 0.85, 'org': 0.75}
+DEFAULT_DOMAIN_AUTHORITY = 0.7
+
+def domain_of(url: str) -> str:
+    """Host of a URL without a leading "www.", e.g. "example.com"."""
+    host = urlsplit(url.strip()).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """A search result in the same shape for every provider.
+
+    Results are immutable so they can be shared between requests and caches;
+    derive a changed copy with dataclasses.replace(). domain is filled from
+    the URL when not given. position is the 1-based rank in the provider's
+    response.
+    """
+    title: str
+    url: str
+    snippet: str
+    domain: str = ""
+    position: Optional[int] = None
+    relevance_score: Optional[float] = None
+    domain_authority: Optional[float] = None
+    published_date: Optional[str] = None
+    content: Optional[str] = None
+
+    def __post_init__(self):
+        if not self.domain and self.url:
+            object.__setattr__(self, 'domain', domain_of(self.url))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields that are set, for JSON or msgpack."""
+        values = {}
+        for name in RESULT_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                values[name] = value
+        return values
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SearchResult':
+        """Rebuild a result from to_dict() output, ignoring fields this version does not know."""
+        return cls(**{name: value for name, value in data.items() if name in RESULT_FIELDS})
+
+RESULT_FIELDS = frozenset(field.name for field in fields(SearchResult))
+
+def encode_results(results: Iterable[SearchResult], format: str = 'json') -> bytes:
+    """
+    Serialize results for storage or transport.
+
+    Args:
+        results: Results to encode
+        format: 'json', or 'msgpack' when the msgpack package is installed
+    """
+    payload = [result.to_dict() for result in results]
+    if format == 'msgpack':
+        if msgpack is None:
+            raise ImportError("The msgpack encoding needs the msgpack package: pip install msgpack")
+        return msgpack.packb(payload)
+    if format == 'json':
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    raise ValueError(f"Invalid result encoding: {format}. Choose from: json, msgpack")
+
+def decode_results(data: bytes, format: str = 'json') -> List[SearchResult]:
+    """Inverse of encode_results()."""
+    if format == 'msgpack':
+        if msgpack is None:
+            raise ImportError("The msgpack encoding needs the msgpack package: pip install msgpack")
+        payload = msgpack.unpackb(data)
+    elif format == 'json':
+        payload = json.loads(data)
+    else:
+        raise ValueError(f"Invalid result encoding: {format}. Choose from: json, msgpack")
+    return [SearchResult.from_dict(item) for item in payload]
+
+class SearchProvider(ABC):
+    """Base class for search providers."""
+
+    @abstractmethod
+    def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Search interface to be implemented by providers."""
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Async search; providers without native async support run search() in a worker thread."""
+        return await asyncio.to_thread(self.search, query, num_results)
+
+    def get_domain_authority(self, domain: str) -> float:
+        """Rough authority score for a domain from its top-level domain."""
+        return TLD_AUTHORITY.get(domain.rsplit('.', 1)[-1], DEFAULT_DOMAIN_AUTHORITY)
+
+    def make_result(self, position: int, title: str, url: str, snippet: str,
+                    published_date: Optional[str] = None) -> SearchResult:
+        """Build a result with domain, authority and a reciprocal-rank relevance score filled in."""
+        domain = domain_of(url)
+        return SearchResult(
+            title=title,
+            url=url,
+            snippet=snippet,
+            domain=domain,
+            position=position,
+            relevance_score=1.0 / position,
+            domain_authority=self.get_domain_authority(domain),
+            published_date=published_date
+        )
+
+# Search backends by name, see register_provider()
+PROVIDERS: Dict[str, Type[SearchProvider]] = {}
+
+def register_provider(name: str) -> Callable[[Type[SearchProvider]], Type[SearchProvider]]:
+    """Class decorator that makes a provider available to create_provider() under name."""
+    def decorator(cls: Type[SearchProvider]) -> Type[SearchProvider]:
+        PROVIDERS[name] = cls
+        return cls
+    return decorator
+
+def create_provider(name: str, **kwargs: Any) -> SearchProvider:
+    """
+    Instantiate a registered search provider.
+
+    Args:
+        name: Name the provider was registered under
+        **kwargs: Passed to the provider's constructor
+
+    Raises:
+        ValueError: If no provider is registered under name
+    """
+    if name not in PROVIDERS:
+        raise ValueError(f"Invalid search provider: {name}. Choose from: {', '.join(sorted(PROVIDERS))}")
+    return PROVIDERS[name](**kwargs)
@@ -0,0 +1,67 @@
+from typing import List, Optional
+import logging
+from services.cache import CacheBackend
+from services.search.base import SearchProvider, SearchResult
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CachedSearchProvider(SearchProvider):
+    """Search provider that serves repeated queries from a cache before
+    delegating to the wrapped provider."""
+
+    def __init__(self, provider: SearchProvider, cache: CacheBackend, ttl: Optional[float] = None):
+        """
+        Initialize with a provider to wrap and a cache backend.
+
+        Args:
+            provider: The search provider that performs network lookups
+            cache: Cache backend storing serialized results
+            ttl: Seconds to keep results (default: the cache's default TTL)
+        """
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+
+    def cache_key(self, query: str, num_results: int) -> str:
+        """Build the cache key from the normalized query and result count."""
+        normalized = " ".join(query.lower().split())
+        return f"search:{type(self.provider).__name__}:{num_results}:{normalized}"
+
+    def _decode(self, cached: Optional[list], query: str) -> Optional[List[SearchResult]]:
+        if cached is None:
+            return None
+        logger.info(f"Search cache hit for query: {query}")
+        return [SearchResult.from_dict(item) for item in cached]
+
+    def _lookup(self, key: str, query: str) -> Optional[List[SearchResult]]:
+        return self._decode(self.cache.get(key), query)
+
+    def _store(self, key: str, results: List[SearchResult]) -> None:
+        # Empty responses are usually transient upstream issues, so don't pin them
+        if results:
+            self.cache.set(key, [result.to_dict() for result in results], ttl=self.ttl)
+
+    def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Return cached results when available, otherwise search and cache."""
+        key = self.cache_key(query, num_results)
+        cached = self._lookup(key, query)
+        if cached is not None:
+            return cached
+
+        results = self.provider.search(query, num_results)
+        self._store(key, results)
+        return results
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Async variant of search(); the disk cache is read and written off the event loop."""
+        key = self.cache_key(query, num_results)
+        cached = self._decode(await self.cache.aget(key), query)
+        if cached is not None:
+            return cached
+
+        results = await self.provider.asearch(query, num_results)
+        if results:
+            await self.cache.aset(key, [result.to_dict() for result in results], ttl=self.ttl)
+        return results
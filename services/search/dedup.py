@@ -0,0 +1,73 @@
+from typing import List, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import re
+from services.search.base import SearchResult
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = {'gclid', 'fbclid', 'msclkid', 'ref', 'ref_src', 'igshid', 'mc_cid', 'mc_eid'}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Reduce a URL to a form that is equal for trivially different links to the same page.
+
+    Drops the scheme, a leading "www.", the fragment, tracking parameters and a
+    trailing slash, and sorts the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    canonical = host + path
+    if query:
+        canonical += "?" + urlencode(query)
+    return canonical
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class ResultDeduper:
+    """Incremental form of dedupe_results() for results that arrive one at a time."""
+
+    def __init__(self, snippet_threshold: float = 0.7):
+        self.snippet_threshold = snippet_threshold
+        self._seen_urls: Set[str] = set()
+        self._kept_shingles: List[Set[str]] = []
+
+    def add(self, result: SearchResult) -> bool:
+        """Record a result; returns False if it duplicates one added earlier."""
+        canonical = canonicalize_url(result.url)
+        if canonical in self._seen_urls:
+            return False
+        shingles = _shingles(result.snippet)
+        if shingles and any(
+            len(shingles & other) / len(shingles | other) >= self.snippet_threshold
+            for other in self._kept_shingles
+        ):
+            return False
+        self._seen_urls.add(canonical)
+        if shingles:
+            self._kept_shingles.append(shingles)
+        return True
+
+def dedupe_results(results: List[SearchResult], snippet_threshold: float = 0.7) -> List[SearchResult]:
+    """
+    Remove results that point at the same page or repeat another result's snippet.
+
+    Args:
+        results: Results in priority order; the first occurrence is kept
+        snippet_threshold: Jaccard similarity of snippet word 3-grams above which
+            two results count as near-duplicates
+
+    Returns:
+        The deduplicated results, in their original order
+    """
+    deduper = ResultDeduper(snippet_threshold)
+    return [result for result in results if deduper.add(result)]
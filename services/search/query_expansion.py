@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+# Sub-query templates per research depth; the raw topic is always searched first
+SUB_QUERY_TEMPLATES: Dict[str, List[str]] = {
+    'brief': [],
+    'detailed': [
+        "history of {topic}",
+        "{topic} recent developments"
+    ],
+    'comprehensive': [
+        "history of {topic}",
+        "{topic} recent developments",
+        "{topic} technical explanation",
+        "{topic} challenges and criticism",
+        "{topic} future outlook"
+    ]
+}
+
+def expand_query(topic: str, depth: str) -> List[str]:
+    """
+    Expand a research topic into the queries to run for a depth.
+
+    Args:
+        topic: The sanitized research topic
+        depth: Research depth (brief, detailed, comprehensive)
+
+    Returns:
+        The topic followed by any depth-specific sub-queries
+    """
+    templates = SUB_QUERY_TEMPLATES.get(depth.lower(), [])
+    return [topic] + [template.format(topic=topic) for template in templates]
@@ -1,17 +1,61 @@
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from collections import deque
+import asyncio
 import logging
-from services.search.serp_provider import SearchProvider, SearchResult
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from services.search.dedup import ResultDeduper, dedupe_results
+from services.search.base import SearchProvider, SearchResult
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+class _BaseFirst:
+    """Orders streamed fan-out results so the base query's come first.
+
+    Sub-query results that arrive before the base query are held back, so the
+    base query's results are always yielded and win over duplicates. A detailed
+    run therefore includes every source a single-query run of the topic finds.
+    """
+
+    def __init__(self, base: Optional[str]):
+        self.base = base
+        self.base_done = False
+        self.succeeded = 0
+        self._held: List[SearchResult] = []
+        self._deduper = ResultDeduper()
+
+    def add(self, query: str, results: Optional[List[SearchResult]]) -> List[SearchResult]:
+        """Record a finished query (results is None if it failed); returns the results now ready."""
+        if results is not None:
+            self.succeeded += 1
+        if query != self.base and not self.base_done:
+            self._held.extend(results or [])
+            return []
+        if query == self.base:
+            self.base_done = True
+            results, self._held = (results or []) + self._held, []
+        return [result for result in results or [] if self._deduper.add(result)]
+
+    def finish(self) -> List[SearchResult]:
+        """Release held results once the base query has failed or missed the deadline."""
+        return [result for result in self._held if self._deduper.add(result)]
+
 class SearchManager:
     """Manages search operations using a configured search provider."""
     
-    def __init__(self, search_provider: SearchProvider):
-        """Initialize with a search provider."""
+    def __init__(self, search_provider: SearchProvider, max_workers: int = 16):
+        """
+        Initialize with a search provider.
+
+        Args:
+            search_provider: Backend that runs each query
+            max_workers: Threads shared by every fan-out on this manager; each
+                call still runs at most its own max_concurrency queries at once
+        """
         self.search_provider = search_provider
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-fanout")
     
     def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
         """
@@ -33,3 +77,221 @@ class SearchManager:
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
             raise
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """
+        Async variant of search() for use on an event loop.
+        
+        Args:
+            query: The search query
+            num_results: Number of results to return (default: 5)
+            
+        Returns:
+            List of SearchResult objects
+        """
+        try:
+            logger.info(f"Performing async search for query: {query}")
+            results = await self.search_provider.asearch(query, num_results)
+            logger.info(f"Found {len(results)} results")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Search failed: {str(e)}")
+            raise
+
+    def _merge(self, queries: List[str], results_by_query: dict, max_results: Optional[int]) -> List[SearchResult]:
+        """Keep the base query's results first, interleave the rest rank by rank, then deduplicate."""
+        if queries and not results_by_query:
+            raise RuntimeError("All fan-out searches failed or missed the deadline")
+        ranked = [results_by_query.get(query, []) for query in queries[1:]]
+        interleaved = results_by_query.get(queries[0], []) if queries else []
+        interleaved = interleaved + [
+            results[rank]
+            for rank in range(max((len(results) for results in ranked), default=0))
+            for results in ranked if rank < len(results)
+        ]
+        merged = dedupe_results(interleaved)
+        return merged[:max_results] if max_results else merged
+
+    def _fan_out(self, queries: List[str], num_results: int, max_concurrency: int,
+                 deadline: float) -> Iterator[Tuple[str, Optional[List[SearchResult]]]]:
+        """
+        Run queries on the shared pool and yield (query, results) as each returns.
+
+        At most max_concurrency queries are in flight; results is None for a
+        failed query. At the deadline, queries not yet started are never sent
+        and running ones finish in the background with their results discarded.
+        """
+        waiting = deque(queries)
+        running = {}
+        stop_at = time.monotonic() + deadline
+
+        def submit() -> None:
+            while waiting and len(running) < max_concurrency:
+                query = waiting.popleft()
+                running[self._executor.submit(self.search_provider.search, query, num_results)] = query
+
+        try:
+            submit()
+            while running:
+                done, _ = wait(running, timeout=max(stop_at - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+                if not done:
+                    for query in list(running.values()) + list(waiting):
+                        logger.warning(f"Fan-out query missed the {deadline}s deadline: {query}")
+                    return
+                finished = [(running.pop(future), future) for future in done]
+                # Refill before handing results to the caller, which may work on them a while
+                submit()
+                for query, future in finished:
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logger.warning(f"Fan-out query failed ({query}): {str(e)}")
+                        results = None
+                    yield query, results
+        finally:
+            for future in running:
+                future.cancel()
+
+    def search_many(self, queries: List[str], num_results: int = 5, max_results: Optional[int] = None,
+                    max_concurrency: int = 4, deadline: float = 10.0) -> List[SearchResult]:
+        """
+        Run several queries concurrently and merge their results.
+        
+        Args:
+            queries: Queries in priority order (the main topic first)
+            num_results: Results requested per query
+            max_results: Cap on merged results (default: no cap)
+            max_concurrency: Queries in flight at once for this call
+            deadline: Seconds to wait overall; slower queries are dropped
+            
+        Returns:
+            The first query's results, then the other queries' results
+            interleaved by rank, deduplicated by canonical URL and
+            near-duplicate snippets
+        """
+        start = time.time()
+        logger.info(f"Fan-out search over {len(queries)} queries")
+        results_by_query = {
+            query: results
+            for query, results in self._fan_out(queries, num_results, max_concurrency, deadline)
+            if results is not None
+        }
+
+        merged = self._merge(queries, results_by_query, max_results)
+        logger.info(f"Fan-out search returned {len(merged)} unique results in {time.time() - start:.2f}s")
+        return merged
+
+    async def asearch_many(self, queries: List[str], num_results: int = 5, max_results: Optional[int] = None,
+                           max_concurrency: int = 4, deadline: float = 10.0) -> List[SearchResult]:
+        """Async variant of search_many()."""
+        start = time.time()
+        logger.info(f"Async fan-out search over {len(queries)} queries")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(query: str) -> List[SearchResult]:
+            async with semaphore:
+                return await self.search_provider.asearch(query, num_results)
+
+        tasks = {asyncio.create_task(run(query)): query for query in queries}
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            logger.warning(f"Fan-out query missed the {deadline}s deadline: {tasks[task]}")
+            task.cancel()
+
+        results_by_query = {}
+        for task in done:
+            query = tasks[task]
+            if task.exception() is not None:
+                logger.warning(f"Fan-out query failed ({query}): {str(task.exception())}")
+            else:
+                results_by_query[query] = task.result()
+
+        merged = self._merge(queries, results_by_query, max_results)
+        logger.info(f"Async fan-out search returned {len(merged)} unique results in {time.time() - start:.2f}s")
+        return merged
+
+    def iter_search(self, queries: List[str], num_results: int = 5, max_results: Optional[int] = None,
+                    max_concurrency: int = 4, deadline: float = 10.0) -> Iterator[SearchResult]:
+        """
+        Run queries concurrently and yield results as each query returns.
+
+        Unlike search_many(), the other queries' results come in completion
+        order rather than interleaved by rank, so callers can start work on the
+        first results while slower queries are still running. The first query's
+        results still come first. Duplicates of results already yielded are
+        skipped. Arguments are as for search_many().
+        """
+        start = time.time()
+        logger.info(f"Streaming search over {len(queries)} queries")
+        order = _BaseFirst(queries[0] if queries else None)
+        yielded = 0
+        fan_out = self._fan_out(queries, num_results, max_concurrency, deadline)
+
+        def ready() -> Iterator[SearchResult]:
+            for query, results in fan_out:
+                yield from order.add(query, results)
+            yield from order.finish()
+
+        try:
+            for result in ready():
+                yielded += 1
+                yield result
+                if max_results and yielded >= max_results:
+                    return
+        finally:
+            fan_out.close()
+            logger.info(f"Streaming search yielded {yielded} unique results in {time.time() - start:.2f}s")
+
+        if queries and not order.succeeded:
+            raise RuntimeError("All streamed searches failed or missed the deadline")
+
+    async def aiter_search(self, queries: List[str], num_results: int = 5, max_results: Optional[int] = None,
+                           max_concurrency: int = 4, deadline: float = 10.0) -> AsyncIterator[SearchResult]:
+        """Async variant of iter_search()."""
+        start = time.time()
+        logger.info(f"Async streaming search over {len(queries)} queries")
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        order = _BaseFirst(queries[0] if queries else None)
+        yielded = 0
+
+        async def run(query: str) -> List[SearchResult]:
+            async with semaphore:
+                return await self.search_provider.asearch(query, num_results)
+
+        tasks = {asyncio.create_task(run(query)): query for query in queries}
+        pending = set(tasks)
+        stop_at = loop.time() + deadline
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(stop_at - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    for task in pending:
+                        logger.warning(f"Fan-out query missed the {deadline}s deadline: {tasks[task]}")
+                    break
+                for task in done:
+                    results = None
+                    if task.exception() is not None:
+                        logger.warning(f"Fan-out query failed ({tasks[task]}): {str(task.exception())}")
+                    else:
+                        results = task.result()
+                    for result in order.add(tasks[task], results):
+                        yielded += 1
+                        yield result
+                        if max_results and yielded >= max_results:
+                            return
+            for result in order.finish():
+                yielded += 1
+                yield result
+                if max_results and yielded >= max_results:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+            logger.info(f"Async streaming search yielded {yielded} unique results in {time.time() - start:.2f}s")
+
+        if queries and not order.succeeded:
+            raise RuntimeError("All streamed searches failed or missed the deadline")
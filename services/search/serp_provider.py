@@ -1,31 +1,128 @@
 from typing import List, Optional
 import logging
-from dataclasses import dataclass
+import httpx
+import requests
 from serpapi import GoogleSearch
+from services.throttling import TokenBucket, acall_with_backoff, call_with_backoff
+from .base import SearchProvider, SearchResult, register_provider
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-@dataclass
-class SearchResult:
-    """Represents a single search result."""
-    title: str
-    url: str
-    snippet: str
-
-class SearchProvider:
-    """Base class for search providers."""
-    def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
-        """Search interface to be implemented by providers."""
-        raise NotImplementedError
+SERPAPI_ENDPOINT = "https://serpapi.com/search"
 
+@register_provider('serpapi')
 class SerpSearchProvider(SearchProvider):
     """Search provider using SerpAPI."""
     
-    def __init__(self, api_key: str):
-        """Initialize with SerpAPI key."""
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None, timeout: float = 30.0,
+                 async_client: Optional[httpx.AsyncClient] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
+        """
+        Initialize with SerpAPI key.
+
+        Args:
+            api_key: SerpAPI key
+            session: Optional shared HTTP session so connections are kept alive between searches
+            timeout: Request timeout in seconds when using a session or async client
+            async_client: Optional shared async HTTP client used by asearch()
+            rate_limiter: Optional token bucket every SerpAPI request waits on;
+                429 responses are retried after their Retry-After
+        """
         self.api_key = api_key
+        self.session = session
+        self.timeout = timeout
+        self.async_client = async_client
+        self.rate_limiter = rate_limiter
+
+    def _build_params(self, query: str, num_results: int) -> dict:
+        """Validate inputs and build the SerpAPI query parameters."""
+        if not query:
+            raise ValueError("Query cannot be empty")
+        if num_results < 1:
+            raise ValueError("num_results must be positive")
+        
+        return {
+            "q": query,
+            "api_key": self.api_key,
+            "engine": "google",
+            "num": num_results,
+            "google_domain": "google.com"
+        }
+
+    def _parse_results(self, results: dict, num_results: int) -> List[SearchResult]:
+        """Convert a SerpAPI response into SearchResult objects."""
+        # Process organic results
+        if "organic_results" not in results:
+            logger.warning("No organic results found")
+            return []
+        
+        # Convert to SearchResult objects
+        search_results = []
+        for rank, result in enumerate(results["organic_results"][:num_results], start=1):
+            search_results.append(
+                self.make_result(
+                    position=result.get("position", rank),
+                    title=result.get("title", ""),
+                    url=result.get("link", ""),
+                    snippet=result.get("snippet", ""),
+                    published_date=result.get("date")
+                )
+            )
+        
+        logger.info(f"Found {len(search_results)} results")
+        return search_results
+
+    def _raise_for_status(self, response) -> None:
+        """
+        Raise for an HTTP error status without the request URL, whose query
+        string carries the API key. The response stays attached so the
+        backoff helpers can still read its status and Retry-After.
+        """
+        status = response.status_code
+        if status < 400:
+            return
+        message = f"SerpAPI request failed with HTTP {status}"
+        if isinstance(response, httpx.Response):
+            raise httpx.HTTPStatusError(message, request=response.request, response=response)
+        raise requests.HTTPError(message, response=response)
+
+    def _redact(self, error: Exception) -> str:
+        """Return an error's message with the API key masked out of any URL in it."""
+        message = str(error)
+        if self.api_key:
+            message = message.replace(self.api_key, "***")
+        return message
+
+    def _fetch(self, params: dict) -> dict:
+        """Run the SerpAPI request, reusing the pooled session when one is configured."""
+        try:
+            if self.session is None:
+                return GoogleSearch(params).get_dict()
+            response = self.session.get(
+                SERPAPI_ENDPOINT,
+                params={**params, "output": "json"},
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            # Connection errors and timeouts quote the full URL, key included
+            raise type(e)(self._redact(e), request=e.request, response=e.response) from None
+        self._raise_for_status(response)
+        return response.json()
+
+    async def _afetch(self, params: dict) -> dict:
+        """Run the SerpAPI request on the shared async client."""
+        try:
+            response = await self.async_client.get(
+                SERPAPI_ENDPOINT,
+                params={**params, "output": "json"},
+                timeout=self.timeout
+            )
+        except httpx.RequestError as e:
+            raise type(e)(self._redact(e), request=e.request) from None
+        self._raise_for_status(response)
+        return response.json()
     
     def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
         """
@@ -39,44 +136,28 @@ class SerpSearchProvider(SearchProvider):
             List of SearchResult objects
         """
         try:
-            # Validate inputs
-            if not query:
-                raise ValueError("Query cannot be empty")
-            if num_results < 1:
-                raise ValueError("num_results must be positive")
-            
-            # Configure search parameters
-            params = {
-                "q": query,
-                "api_key": self.api_key,
-                "engine": "google",
-                "num": num_results,
-                "google_domain": "google.com"
-            }
+            params = self._build_params(query, num_results)
             
             # Perform search
             logger.info(f"Searching SerpAPI for: {query}")
-            search = GoogleSearch(params)
-            results = search.get_dict()
-            
-            # Process organic results
-            if "organic_results" not in results:
-                logger.warning("No organic results found")
-                return []
+            results = call_with_backoff(self.rate_limiter, lambda: self._fetch(params))
+            return self._parse_results(results, num_results)
             
-            # Convert to SearchResult objects
-            search_results = []
-            for result in results["organic_results"][:num_results]:
-                search_results.append(
-                    SearchResult(
-                        title=result.get("title", ""),
-                        url=result.get("link", ""),
-                        snippet=result.get("snippet", "")
-                    )
-                )
+        except Exception as e:
+            logger.error(f"SerpAPI search failed: {str(e)}")
+            raise
+
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Perform a search using SerpAPI without blocking the event loop."""
+        if self.async_client is None:
+            return await super().asearch(query, num_results)
+
+        try:
+            params = self._build_params(query, num_results)
             
-            logger.info(f"Found {len(search_results)} results")
-            return search_results
+            logger.info(f"Searching SerpAPI (async) for: {query}")
+            results = await acall_with_backoff(self.rate_limiter, lambda: self._afetch(params))
+            return self._parse_results(results, num_results)
             
         except Exception as e:
             logger.error(f"SerpAPI search failed: {str(e)}")
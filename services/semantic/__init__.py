@@ -0,0 +1,3 @@
+# This file makes the semantic directory a Python package
+from .embedding import HashedTfidfEmbedder, key_terms
+from .index import SemanticIndex, SemanticMatch
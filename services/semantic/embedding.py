@@ -0,0 +1,92 @@
+from typing import Dict, FrozenSet
+import math
+import re
+import zlib
+import numpy as np
+
+WORD = re.compile(r"[a-z0-9]+")
+
+# Question words and filler that phrase a topic without changing what it is about
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'for', 'with', 'by', 'at', 'as', 'from', 'about',
+    'is', 'are', 'was', 'be', 'do', 'does', 'it', 'its', 'this', 'that', 'what', 'whats', 'how', 'why', 'when',
+    'which', 'who', 'can', 'i', 'me', 'my', 'you', 'your', 'we', 'explain', 'explained', 'explanation',
+    'overview', 'introduction', 'intro', 'guide', 'tell', 'describe', 'meaning', 'definition', 'define', 'work',
+    'works', 'vs', 'versus'
+}
+
+# Words that pick out one of several otherwise identical topics ("world war i" vs "world war ii")
+ORDINALS = {
+    'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine', 'ten', 'eleven', 'twelve',
+    'first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth', 'tenth',
+    'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x', 'xi', 'xii'
+}
+
+# Words after which a lone "i" is the pronoun rather than a numeral ("how should i ...")
+PRONOUN_CONTEXT = STOPWORDS | {'should', 'would', 'could', 'will', 'shall', 'may', 'might', 'must', 'did', 'have', 'am'}
+
+def key_terms(text: str) -> FrozenSet[str]:
+    """
+    Numbers, versions, years and ordinals in a text.
+
+    Topics that differ in these are about different things however similar
+    the rest of their wording is, so they must agree before a stored result
+    is reused.
+    """
+    words = WORD.findall(text.lower())
+    terms = set()
+    for position, word in enumerate(words):
+        if any(ch.isdigit() for ch in word) or word in ORDINALS:
+            terms.add(word)
+        elif word == 'i' and position and words[position - 1] not in PRONOUN_CONTEXT:
+            terms.add(word)
+    return frozenset(terms)
+
+class HashedTfidfEmbedder:
+    """CPU-only text embedding from hashed word and character n-grams.
+
+    Words, word bigrams and character n-grams of each word are hashed into a
+    fixed number of buckets, so no vocabulary has to be stored or trained.
+    tf() returns sublinear term frequencies; the index applies IDF weights
+    from the documents it holds when scoring.
+    """
+
+    def __init__(self, dim: int = 2048, char_ngrams: tuple = (3, 5)):
+        """
+        Args:
+            dim: Number of hash buckets (vector length)
+            char_ngrams: Smallest and largest character n-gram taken from each word
+        """
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _bucket(self, feature: str) -> int:
+        # crc32 rather than hash(), which is salted per process and would break the on-disk index
+        return zlib.crc32(feature.encode('utf-8')) % self.dim
+
+    def features(self, text: str) -> Dict[int, float]:
+        """Hashed feature counts for a text."""
+        words = [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+        counts: Dict[int, float] = {}
+
+        def add(feature: str, weight: float = 1.0) -> None:
+            bucket = self._bucket(feature)
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+
+        for word in words:
+            add('w:' + word, 2.0)
+            padded = f"<{word}>"
+            low, high = self.char_ngrams
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    add('c:' + padded[i:i + n])
+        for first, second in zip(words, words[1:]):
+            add(f"b:{first} {second}")
+        return counts
+
+    def tf(self, text: str) -> np.ndarray:
+        """Sublinear term-frequency vector for a text."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in self.features(text).items():
+            vector[bucket] = 1.0 + math.log(count)
+        return vector
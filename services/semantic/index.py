@@ -0,0 +1,277 @@
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from .embedding import HashedTfidfEmbedder, key_terms
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Seconds before the last synced entry to re-read, for entries committed late by other processes
+SYNC_LOOKBACK = 5.0
+
+@dataclass
+class SemanticMatch:
+    """A stored result whose topic is similar to a lookup."""
+    topic: str
+    similarity: float
+    created_at: float
+    payload: Dict[str, Any]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+def normalize_topic(topic: str) -> str:
+    return ' '.join(topic.lower().split())
+
+class SemanticIndex:
+    """On-disk index of past research results, searchable by topic similarity.
+
+    Entries live in SQLite with sparse term-frequency vectors; the vectors are
+    also held in a dense NumPy matrix so a lookup is one matrix-vector product
+    over every entry. Topics are weighted by IDF over the indexed topics at
+    lookup time, so common words count for less as the index grows.
+
+    Several processes can share one database: before each lookup, entries
+    written by other processes since the last lookup are loaded.
+
+    A match must also have the same numbers, years, versions and ordinals as
+    the lookup (see key_terms()), so "causes of world war ii" never reuses
+    "causes of world war i" however close their vectors are.
+
+    Re-indexing a topic for the same depth and provider replaces its entry.
+    Entries older than max_age are skipped by lookups and deleted by
+    compact(), which also trims the index to max_entries and runs
+    automatically once replaced rows make up compact_ratio of the matrix.
+    """
+
+    def __init__(self, path: str, embedder: Optional[HashedTfidfEmbedder] = None,
+                 max_age: float = 7 * 24 * 3600, max_entries: int = 5000, compact_ratio: float = 0.25):
+        """
+        Args:
+            path: SQLite database file
+            embedder: Topic embedder; must match the one the index was built with
+            max_age: Seconds before an entry is too stale to answer from
+            max_entries: Entries kept by compaction, newest first
+            compact_ratio: Fraction of dead rows in the matrix (or of entries over
+                max_entries) that triggers compaction
+        """
+        self.path = path
+        self.embedder = embedder or HashedTfidfEmbedder()
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._hits = 0
+        self._lookup_seconds = 0.0
+        self._compactions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, topic TEXT NOT NULL, depth TEXT NOT NULL, provider TEXT NOT NULL, "
+            "created_at REAL NOT NULL, buckets BLOB NOT NULL, weights BLOB NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_created ON entries (created_at)")
+        self._conn.commit()
+        with self._lock:
+            self._load()
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load(self) -> None:
+        """Rebuild the in-memory matrix from the database. Caller holds the lock."""
+        rows = self._conn.execute(
+            "SELECT key, depth, provider, created_at, buckets, weights FROM entries ORDER BY created_at"
+        ).fetchall()
+        self._matrix = np.zeros((max(len(rows), 64), self.embedder.dim), dtype=np.float32)
+        self._keys: List[Optional[str]] = []
+        self._depths: List[str] = []
+        self._providers: List[str] = []
+        self._created = np.zeros(len(self._matrix), dtype=np.float64)
+        self._alive = np.zeros(len(self._matrix), dtype=bool)
+        self._rows: Dict[str, int] = {}
+        self._synced_at = 0.0
+        for key, depth, provider, created_at, buckets, weights in rows:
+            vector = np.zeros(self.embedder.dim, dtype=np.float32)
+            vector[np.frombuffer(buckets, dtype=np.uint32)] = np.frombuffer(weights, dtype=np.float32)
+            self._append(key, depth, provider, created_at, vector)
+        self._refresh_weights()
+
+    def _sync(self) -> None:
+        """Load entries other processes added since the last sync. Caller holds the lock."""
+        # data_version only changes when another connection commits
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._data_version = version
+        # Look back a little: another process may commit an entry stamped before our last sync
+        rows = self._conn.execute(
+            "SELECT key, depth, provider, created_at, buckets, weights FROM entries "
+            "WHERE created_at > ? ORDER BY created_at",
+            (self._synced_at - SYNC_LOOKBACK,)
+        ).fetchall()
+        for key, depth, provider, created_at, buckets, weights in rows:
+            row = self._rows.get(key)
+            if row is not None and self._created[row] == created_at:
+                continue
+            vector = np.zeros(self.embedder.dim, dtype=np.float32)
+            vector[np.frombuffer(buckets, dtype=np.uint32)] = np.frombuffer(weights, dtype=np.float32)
+            self._append(key, depth, provider, created_at, vector)
+
+    def _append(self, key: str, depth: str, provider: str, created_at: float, vector: np.ndarray) -> None:
+        """Add a row to the matrix, growing it geometrically. Caller holds the lock."""
+        row = len(self._keys)
+        if row == len(self._matrix):
+            grow = len(self._matrix)
+            self._matrix = np.vstack([self._matrix, np.zeros((grow, self.embedder.dim), dtype=np.float32)])
+            self._created = np.concatenate([self._created, np.zeros(grow)])
+            self._alive = np.concatenate([self._alive, np.zeros(grow, dtype=bool)])
+        previous = self._rows.get(key)
+        if previous is not None:
+            self._alive[previous] = False
+        self._matrix[row] = vector
+        self._created[row] = created_at
+        self._alive[row] = True
+        self._keys.append(key)
+        self._depths.append(depth)
+        self._providers.append(provider)
+        self._rows[key] = row
+        self._synced_at = max(self._synced_at, created_at)
+        self._weights_stale = True
+
+    def _refresh_weights(self) -> None:
+        """Recompute IDF and per-row norms after the live rows changed. Caller holds the lock."""
+        live = self._matrix[:len(self._keys)][self._alive[:len(self._keys)]]
+        document_frequency = np.count_nonzero(live, axis=0)
+        self._idf = (np.log((1 + len(live)) / (1 + document_frequency)) + 1).astype(np.float32)
+        idf_squared = self._idf ** 2
+        # |tf * idf| per row without materializing the weighted matrix
+        self._norms = np.sqrt(np.einsum('ij,ij,j->i', self._matrix, self._matrix, idf_squared))
+        self._weights_stale = False
+
+    def add(self, topic: str, depth: str, provider: str, payload: Dict[str, Any]) -> None:
+        """Index a finished result, replacing any earlier one for the same topic, depth and provider."""
+        key = f"{provider}:{depth}:{normalize_topic(topic)}"
+        vector = self.embedder.tf(topic)
+        buckets = np.flatnonzero(vector).astype(np.uint32)
+        created_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, topic, depth, provider, created_at, buckets, weights, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, topic, depth, provider, created_at, buckets.tobytes(), vector[buckets].tobytes(),
+                 json.dumps(payload))
+            )
+            self._conn.commit()
+            self._append(key, depth, provider, created_at, vector)
+            dead = len(self._keys) - int(self._alive.sum())
+            if (dead > self.compact_ratio * len(self._keys)
+                    or len(self._rows) > self.max_entries * (1 + self.compact_ratio)):
+                self._compact()
+
+    def search(self, topic: str, depth: str, provider: str, threshold: float) -> Optional[SemanticMatch]:
+        """
+        Find the most similar fresh result for the same depth and provider
+        whose topic has the same key terms.
+
+        Args:
+            topic: Research topic to look up
+            depth: Research depth the result must have been produced for
+            provider: Model provider the result must have been produced by
+            threshold: Minimum cosine similarity, from 0 to 1
+
+        Returns:
+            The best match at or above threshold, or None
+        """
+        start = time.perf_counter()
+        query = self.embedder.tf(topic)
+        terms = key_terms(topic)
+        with self._lock:
+            self._lookups += 1
+            try:
+                self._sync()
+                size = len(self._keys)
+                if not size or not query.any():
+                    return None
+                if self._weights_stale:
+                    self._refresh_weights()
+                candidates = (
+                    self._alive[:size]
+                    & (self._created[:size] >= time.time() - self.max_age)
+                    & (np.asarray(self._depths) == depth)
+                    & (np.asarray(self._providers) == provider)
+                )
+                candidates &= self._norms[:size] > 0
+                if not candidates.any():
+                    return None
+                weighted_query = query * self._idf
+                scores = (self._matrix[:size] @ (weighted_query * self._idf)) / (
+                    np.where(candidates, self._norms[:size], 1.0) * np.linalg.norm(weighted_query)
+                )
+                scores[~candidates] = -1.0
+                while True:
+                    best = int(np.argmax(scores))
+                    similarity = float(scores[best])
+                    if similarity < threshold:
+                        return None
+                    row = self._conn.execute(
+                        "SELECT topic, created_at, payload FROM entries WHERE key = ?", (self._keys[best],)
+                    ).fetchone()
+                    if row is None:
+                        # Compacted away by another process
+                        self._alive[best] = False
+                        self._weights_stale = True
+                    elif key_terms(row[0]) == terms:
+                        break
+                    scores[best] = -1.0
+                self._hits += 1
+                return SemanticMatch(topic=row[0], similarity=similarity, created_at=row[1], payload=json.loads(row[2]))
+            finally:
+                self._lookup_seconds += time.perf_counter() - start
+
+    def compact(self) -> int:
+        """Delete stale and surplus entries and rebuild the matrix. Returns the number of entries removed."""
+        with self._lock:
+            return self._compact()
+
+    def _compact(self) -> int:
+        """compact() body. Caller holds the lock."""
+        before = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self._conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age,))
+        self._conn.execute(
+            "DELETE FROM entries WHERE key NOT IN (SELECT key FROM entries ORDER BY created_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
+        self._conn.execute("VACUUM")
+        after = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self._load()
+        self._compactions += 1
+        logger.info(f"Compacted semantic index: {before} -> {after} entries")
+        return before - after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._keys)
+            return {
+                'entries': len(self._rows),
+                'matrix_rows': size,
+                'lookups': self._lookups,
+                'hits': self._hits,
+                'hit_rate': self._hits / self._lookups if self._lookups else 0.0,
+                'avg_lookup_ms': 1000 * self._lookup_seconds / self._lookups if self._lookups else 0.0,
+                'compactions': self._compactions,
+                'matrix_bytes': self._matrix.nbytes
+            }
@@ -0,0 +1,3 @@
+# This file makes the throttling directory a Python package
+from .rate_limit import TokenBucket, acall_with_backoff, call_with_backoff, retry_after_seconds
+from .singleflight import AsyncSingleFlight, SingleFlight
@@ -0,0 +1,164 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+from email.utils import parsedate_to_datetime
+import asyncio
+import logging
+import threading
+import time
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class TokenBucket:
+    """Token-bucket rate limiter for one upstream API.
+
+    Tokens refill at `rate` per second up to `capacity`. A Retry-After from the
+    upstream pauses the bucket for every caller, not just the one that was
+    rejected.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            name: Upstream name used in logs and stats
+            rate: Requests per second
+            capacity: Burst size (default: max(1, rate))
+        """
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._backoffs = 0
+
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._paused_until - now, 0.0)
+            self._acquired += 1
+            if wait > 0:
+                self._throttled += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self) -> float:
+        """Block until a request may be sent. Returns the seconds waited."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Async variant of acquire()."""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold all callers back for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._backoffs += 1
+        logger.warning(f"Rate limited by {self.name}; pausing for {seconds:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Acquisition counts and limiter wait times."""
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'acquired': self._acquired,
+                'throttled': self._throttled,
+                'total_wait_seconds': self._total_wait,
+                'max_wait_seconds': self._max_wait,
+                'avg_wait_seconds': self._total_wait / self._acquired if self._acquired else 0.0,
+                'backoffs': self._backoffs
+            }
+
+def _status_and_headers(error: BaseException) -> tuple:
+    response = getattr(error, 'response', None)
+    status = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    headers = getattr(response, 'headers', None) or {}
+    return status, headers
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """
+    Seconds to wait before retrying a rate-limited call, or None if the error is not a rate limit.
+
+    Understands HTTP 429/503 errors raised by requests, httpx and the provider
+    SDKs, honouring a Retry-After header given in seconds or as an HTTP date.
+    """
+    status, headers = _status_and_headers(error)
+    if status not in (429, 503):
+        return None
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    if value is None:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _backoff_delay(error: BaseException, attempt: int, base_delay: float) -> Optional[float]:
+    retry_after = retry_after_seconds(error)
+    if retry_after is None:
+        return None
+    return retry_after or base_delay * (2 ** attempt)
+
+def call_with_backoff(limiter: Optional[TokenBucket], fn: Callable[[], Any],
+                      retries: int = 3, base_delay: float = 1.0) -> Any:
+    """
+    Call fn under a rate limiter, retrying rate-limit errors.
+
+    Args:
+        limiter: Bucket to acquire before each attempt (None to skip limiting)
+        fn: The upstream call
+        retries: Retries after rate-limit errors; other errors are raised at once
+        base_delay: Backoff when the upstream gives no Retry-After (doubles per attempt)
+    """
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn()
+        except Exception as e:
+            delay = _backoff_delay(e, attempt, base_delay)
+            if delay is None or attempt == retries:
+                raise
+            if limiter is not None:
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+
+async def acall_with_backoff(limiter: Optional[TokenBucket], fn: Callable[[], Awaitable[Any]],
+                             retries: int = 3, base_delay: float = 1.0) -> Any:
+    """Async variant of call_with_backoff()."""
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            await limiter.aacquire()
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _backoff_delay(e, attempt, base_delay)
+            if delay is None or attempt == retries:
+                raise
+            if limiter is not None:
+                limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+
+from services.batch import BatchRunner, completed_record_ids, parse_jsonl, record_id
+
+def runner(run_one=None, **kwargs):
+    return BatchRunner(
+        run_one=run_one or (lambda record: {'result': f"report on {record['topic']}"}),
+        provider_of=lambda record: record.get('model', 'openai'),
+        validate=lambda record: None if record.get('topic') else "Missing topic",
+        **kwargs
+    )
+
+def test_parse_jsonl_flags_malformed_lines():
+    records = list(parse_jsonl(['{"topic": "fusion"}', '', '{"topic": ', '[1, 2]']))
+    assert records[0] == {'topic': 'fusion'}
+    assert [record['id'] for record in records[1:]] == ['line-3', 'line-4']
+    assert all('invalid' in record for record in records[1:])
+
+def test_record_id_ignores_case_and_spacing_of_the_topic():
+    assert record_id({'id': 7, 'topic': 'x'}) == '7'
+    assert record_id({'topic': 'Fusion  Power', 'depth': 'Brief'}) == record_id({'topic': 'fusion power', 'depth': 'brief'})
+    assert record_id({'topic': 'fusion', 'depth': 'brief'}) != record_id({'topic': 'fusion', 'depth': 'detailed'})
+
+def test_run_reports_every_record_once():
+    def run_one(record):
+        if record['topic'] == 'broken':
+            raise RuntimeError("provider down")
+        return {'result': record['topic']}
+
+    records = [{'id': 'a', 'topic': 'fusion'}, {'id': 'b', 'topic': 'broken'}, {'id': 'c'},
+               {'id': 'a', 'topic': 'fusion'}, {'id': 'line-9', 'invalid': "Invalid JSON on line 9"}]
+    outputs = {output['id']: output for output in runner(run_one).run(records)}
+    assert {rid: output['status'] for rid, output in outputs.items()} == {
+        'a': 'completed', 'b': 'failed', 'c': 'invalid', 'line-9': 'invalid'
+    }
+    assert outputs['a']['result'] == {'result': 'fusion'}
+    assert outputs['b']['error'] == "provider down"
+
+def test_rerun_skips_records_completed_in_the_previous_output():
+    first = [json.dumps(output) for output in runner().run([{'id': 'a', 'topic': 'fusion'}])]
+    # A run killed mid-write leaves a truncated last line
+    skip = completed_record_ids(first + ['{"id": "b", "sta'])
+    outputs = list(runner().run([{'id': 'a', 'topic': 'fusion'}, {'id': 'b', 'topic': 'solar'}], skip=skip))
+    assert [output['id'] for output in outputs] == ['b']
+
+def test_concurrency_is_bounded_overall_and_per_provider():
+    lock = threading.Lock()
+    in_flight = {'total': 0}
+    peaks = {}
+
+    def run_one(record):
+        with lock:
+            in_flight['total'] += 1
+            in_flight[record['model']] = in_flight.get(record['model'], 0) + 1
+            for key in ('total', record['model']):
+                peaks[key] = max(peaks.get(key, 0), in_flight[key])
+        time.sleep(0.03)
+        with lock:
+            in_flight['total'] -= 1
+            in_flight[record['model']] -= 1
+        return {}
+
+    records = [{'id': f"{model}{i}", 'topic': 't', 'model': model}
+               for model in ('openai', 'anthropic') for i in range(6)]
+    outputs = list(runner(run_one, max_concurrency=3, per_provider_concurrency=2).run(records))
+    assert len(outputs) == 12
+    assert peaks['total'] == 3
+    assert peaks['openai'] <= 2 and peaks['anthropic'] <= 2
+
+def test_a_provider_backlog_does_not_hold_up_other_providers():
+    started = []
+
+    def run_one(record):
+        started.append(record['model'])
+        time.sleep(0.02)
+        return {}
+
+    # Every openai record is listed before the single gemini one
+    records = [{'id': f"o{i}", 'topic': 't', 'model': 'openai'} for i in range(8)]
+    records.append({'id': 'g', 'topic': 't', 'model': 'gemini'})
+    list(runner(run_one, max_concurrency=2, per_provider_concurrency=2).run(records))
+    assert started.index('gemini') <= 2
@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from services.cache import MemoryCache, SQLiteCache, TieredCache, create_cache
+
+def test_memory_cache_hit_and_miss():
+    cache = MemoryCache()
+    cache.set('a', {'value': 1})
+    assert cache.get('a') == {'value': 1}
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+def test_memory_cache_expires_entries():
+    cache = MemoryCache()
+    cache.set_until('old', 1, time.time() - 1)
+    cache.set('fresh', 2, ttl=60)
+    assert cache.get('old') is None
+    assert cache.get('fresh') == 2
+    assert cache.stats()['expirations'] == 1
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_sqlite_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    SQLiteCache(path).set('key', ['a', 'b'], ttl=60)
+    value, expires_at = SQLiteCache(path).get_with_expiry('key')
+    assert value == ['a', 'b']
+    assert expires_at > time.time()
+
+def test_sqlite_cache_expires_entries(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set('old', 1, ttl=-1)
+    assert cache.get('old') is None
+    assert cache.stats()['entries'] == 0
+
+def test_sqlite_cache_evicts_least_recently_used_past_max_bytes(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=25)
+    cache.set('a', 'x' * 10)
+    time.sleep(0.01)
+    cache.set('b', 'y' * 10)
+    time.sleep(0.01)
+    cache.get('a')
+    cache.set('c', 'z' * 10)
+    assert cache.get('b') is None
+    assert cache.get('a') == 'x' * 10
+    assert cache.stats()['bytes'] <= 25
+
+def test_sqlite_cache_tracks_size_without_scanning(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache.set('a', 'x' * 10)
+    cache.set('a', 'x' * 20)
+    cache.set('b', [1, 2, 3])
+    cache.set('old', 1, ttl=-1)
+    cache.get('old')
+    cache.delete('b')
+
+    def actual():
+        return cache._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes']) == actual() == (1, 22)
+    cache.clear()
+    assert (cache.stats()['entries'], cache.stats()['bytes']) == (0, 0)
+
+def test_sqlite_cache_seeds_counters_for_existing_files(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path)
+    cache.set('a', 'x' * 10)
+    # A file written before the meta table existed
+    cache._conn.executescript(
+        "DROP TRIGGER cache_insert; DROP TRIGGER cache_delete; DROP TRIGGER cache_resize; DROP TABLE cache_meta;"
+    )
+    stats = SQLiteCache(path).stats()
+    assert (stats['entries'], stats['bytes']) == (1, 12)
+
+def test_sqlite_cache_evicts_expired_entries_first_in_batches(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_bytes=100)
+    cache.EVICT_BATCH = 2
+    cache.set('expired', 'e' * 10, ttl=0.01)
+    time.sleep(0.02)
+    for i in range(9):
+        cache.set(f'k{i}', str(i) * 10)
+        time.sleep(0.002)
+    stats = cache.stats()
+    assert stats['bytes'] <= 100
+    assert stats['expirations'] == 1
+    assert stats['evictions'] == 1
+    assert cache.get('k0') is None and cache.get('k8') == '8' * 10
+
+def test_sqlite_cache_eviction_queries_use_indexes(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'))
+    for query in ("SELECT key FROM cache WHERE expires_at <= 1", "SELECT key FROM cache ORDER BY accessed_at LIMIT 2"):
+        plan = " ".join(row[-1] for row in cache._conn.execute(f"EXPLAIN QUERY PLAN {query}"))
+        assert "USING" in plan and "INDEX" in plan
+
+def test_tiered_cache_promotes_disk_hits_with_their_expiry(tmp_path):
+    disk = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache = TieredCache(MemoryCache(), disk)
+    disk.set('key', 'value', ttl=60)
+    assert cache.get('key') == 'value'
+    assert cache.memory.get('key') == 'value'
+    assert cache.memory._entries['key'][1] == disk.get_with_expiry('key')[1]
+
+def test_create_cache_rejects_unknown_backend(tmp_path):
+    with pytest.raises(ValueError):
+        create_cache('redis', str(tmp_path / 'cache.db'))
+
+def test_async_variants_read_and_write_every_tier(tmp_path):
+    disk = SQLiteCache(str(tmp_path / 'cache.db'))
+    cache = TieredCache(MemoryCache(), disk)
+
+    async def main():
+        await cache.aset('key', 'value', ttl=60)
+        assert await cache.aget('key') == 'value'
+        cache.memory.clear()
+        assert await cache.aget('key') == 'value'
+        assert await disk.aget('missing') is None
+
+    asyncio.run(main())
+    assert cache.memory.get('key') == 'value'
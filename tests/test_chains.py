@@ -0,0 +1,57 @@
+import asyncio
+import time
+import pytest
+from benchmarks.fakes import FakeLLM
+from services.cache import MemoryCache
+from services.research.chains import ResearchChainManager
+from services.search import SearchResult
+
+SOURCES = [SearchResult(title=f"Source {i}", url=f"https://example{i}.com/page", snippet=f"Snippet {i}") for i in range(6)]
+
+def manager(**kwargs):
+    # Calls 3 and 6 stall past the timeout; two run at a time
+    llm = FakeLLM(latency=0.05, num_tokens=5, slow_every=3, slow_latency=0.6)
+    options = {'analysis_mode': 'map_reduce', 'map_concurrency': 2, 'map_timeout': 0.3, **kwargs}
+    return llm, ResearchChainManager(llm, cache=MemoryCache(), **options)
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_map_timeout_counts_only_the_call_and_late_calls_fill_the_cache(use_async):
+    llm, chains = manager()
+
+    async def amap():
+        start = time.monotonic()
+        result = await chains._amap_reduce_analysis(SOURCES)
+        elapsed = time.monotonic() - start
+        # Keep the loop alive until the timed-out calls finish
+        while chains._background_tasks:
+            await asyncio.sleep(0.05)
+        return result, elapsed
+
+    if use_async:
+        analysis, elapsed = asyncio.run(amap())
+    else:
+        start = time.monotonic()
+        analysis = chains._map_reduce_analysis(SOURCES)
+        elapsed = time.monotonic() - start
+        time.sleep(0.6)
+
+    assert analysis.count("(Not analyzed)") == 2
+    # The sixth call starts 0.15s in, behind the others, and still gets its full 0.3s
+    assert 0.4 <= elapsed < 0.6
+
+    # The stalled calls kept running and cached their analyses
+    calls = llm.calls
+    analysis = asyncio.run(chains._amap_reduce_analysis(SOURCES)) if use_async else chains._map_reduce_analysis(SOURCES)
+    assert llm.calls == calls == 6
+    assert "(Not analyzed)" not in analysis
+
+def test_shared_analysis_pool_caps_managers_together():
+    _, first = manager()
+    _, second = manager(analysis_executor=first._analysis_executor())
+    assert second._analysis_executor() is first._analysis_executor()
+
+def test_invalid_options_are_rejected():
+    with pytest.raises(ValueError):
+        manager(analysis_mode='parallel')
+    with pytest.raises(ValueError):
+        manager(quorum=0)
@@ -0,0 +1,155 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+from services.cache import MemoryCache
+from services.content import ContentFetcher, check_public_url
+from services.content import fetcher as fetcher_module
+from services.search import SearchResult
+
+ARTICLE = (
+    "<html><head><title>Local article</title><script>var tracking = 1;</script></head><body>"
+    "<nav><a href='/'>Home</a></nav><article><h1>Fusion energy milestones</h1>"
+    + "".join(f"<p>Paragraph {i}: steady progress on plasma confinement and net energy gain.</p>" for i in range(10))
+    + "</article></body></html>"
+)
+ETAG = '"article-v1"'
+
+class Handler(BaseHTTPRequestHandler):
+    seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.seen.append((path, self.headers.get('If-None-Match')))
+        if path == "/article":
+            if self.headers.get('If-None-Match') == ETAG:
+                return self._send(304)
+            return self._send(200, ARTICLE.encode(), headers={'ETag': ETAG})
+        if path == "/redirect":
+            return self._send(302, headers={'Location': "/article"})
+        if path == "/loop":
+            return self._send(302, headers={'Location': "/loop"})
+        if path == "/to-localhost":
+            port = self.server.server_address[1]
+            return self._send(302, headers={'Location': f"http://localhost:{port}/article"})
+        if path == "/trickle":
+            # Each chunk arrives well within the read timeout, but the page never ends in time
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.end_headers()
+            try:
+                for _ in range(50):
+                    self.wfile.write(b"x" * 64)
+                    self.wfile.flush()
+                    time.sleep(0.1)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        if path == "/binary":
+            return self._send(200, b"\x00" * 64, content_type="application/octet-stream")
+        if path == "/huge":
+            return self._send(200, ("<script>" + "x" * 200 + "</script>").encode() * 2000)
+        return self._send(404, b"not found")
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+@pytest.fixture(autouse=True)
+def reset_seen():
+    Handler.seen.clear()
+
+def local_fetcher(**kwargs):
+    return ContentFetcher(cache=MemoryCache(), allow_private=True, **kwargs)
+
+def test_fetch_extracts_main_text_and_revalidates_with_etag(server):
+    fetcher = local_fetcher(revalidate_after=0)
+    text = fetcher.fetch(f"{server}/article")
+    assert "Paragraph 0" in text and "tracking" not in text and "Home" not in text
+    assert fetcher.fetch(f"{server}/article") == text
+    assert Handler.seen == [("/article", None), ("/article", ETAG)]
+    assert fetcher.stats()['revalidated'] == 1
+
+def test_fetch_follows_redirects_to_allowed_hosts(server):
+    fetcher = local_fetcher()
+    assert "Paragraph 0" in fetcher.fetch(f"{server}/redirect")
+    assert [path for path, _ in Handler.seen] == ["/redirect", "/article"]
+
+def test_redirect_loops_are_cut_off(server):
+    fetcher = local_fetcher(max_redirects=3)
+    assert fetcher.fetch(f"{server}/loop") is None
+    assert len(Handler.seen) == 4
+
+def test_private_hosts_are_refused_by_default(server):
+    fetcher = ContentFetcher()
+    assert fetcher.fetch(f"{server}/article") is None
+    assert Handler.seen == []
+    assert fetcher.stats()['failed'] == 1
+
+def test_every_redirect_hop_is_checked(server, monkeypatch):
+    # Let the test server's own address through, so only the redirect target is checked for real
+    real_check = fetcher_module.check_public_url
+    monkeypatch.setattr(
+        fetcher_module, 'check_public_url',
+        lambda url: None if urlsplit(url).hostname == "127.0.0.1" else real_check(url)
+    )
+    fetcher = ContentFetcher()
+    assert fetcher.fetch(f"{server}/to-localhost") is None
+    assert [path for path, _ in Handler.seen] == ["/to-localhost"]
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/",
+    "http://10.1.2.3/",
+    "http://192.168.0.1/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/",
+    "http://[::ffff:127.0.0.1]/",
+    "http://0.0.0.0/",
+    "file:///etc/passwd",
+])
+def test_check_public_url_rejects_non_public_targets(url):
+    with pytest.raises(ValueError):
+        check_public_url(url)
+
+def test_check_public_url_accepts_public_addresses():
+    check_public_url("https://93.184.216.34/page")
+
+def test_timeout_bounds_the_whole_download(server):
+    fetcher = local_fetcher(timeout=0.5)
+    start = time.monotonic()
+    assert fetcher.fetch(f"{server}/trickle") is None
+    assert time.monotonic() - start < 1.5
+    assert fetcher.stats()['failed'] == 1
+
+def test_fetch_all_keeps_order_and_skips_unusable_pages(server):
+    fetcher = local_fetcher(max_bytes=16 * 1024)
+    results = [
+        SearchResult(title=page, url=f"{server}/{page}", snippet=f"{page} snippet")
+        for page in ("article", "binary", "missing", "huge")
+    ]
+    enriched = fetcher.fetch_all(results)
+    assert [result.title for result in enriched] == ["article", "binary", "missing", "huge"]
+    assert "Paragraph 0" in enriched[0].content
+    assert [result.content for result in enriched[1:]] == [None, None, None]
+    assert fetcher.stats()['truncated'] == 1
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.jobs import AsyncJobManager, JobManager, QueueFullError
+
+def wait_for(job, timeout=2.0):
+    stop_at = time.monotonic() + timeout
+    while job.status in ('queued', 'running') and time.monotonic() < stop_at:
+        time.sleep(0.01)
+    return job
+
+def test_job_runs_in_the_background_and_records_timings():
+    jobs = JobManager(max_workers=1)
+    release = threading.Event()
+    job = jobs.submit('j1', lambda topic: (release.wait(), {'topic': topic})[1], 'fusion')
+    # submit() returns before the work is done
+    assert job.status in ('queued', 'running')
+    release.set()
+    wait_for(job)
+    assert job.status == 'completed'
+    assert job.result == {'topic': 'fusion'}
+    assert job.queue_wait >= 0 and job.run_time >= 0
+    assert jobs.get('j1') is job
+    assert job.to_dict()['status'] == 'completed'
+
+def test_failed_job_keeps_its_error():
+    jobs = JobManager(max_workers=1)
+
+    def fail():
+        raise RuntimeError("provider down")
+
+    job = wait_for(jobs.submit('j1', fail))
+    assert (job.status, job.error, job.result) == ('failed', "provider down", None)
+    assert jobs.stats()['failed'] == 1
+
+def test_full_queue_rejects_submissions():
+    jobs = JobManager(max_workers=1, max_queue=2)
+    release = threading.Event()
+    running = jobs.submit('running', release.wait)
+    while running.status != 'running':
+        time.sleep(0.01)
+    queued = [jobs.submit(f"queued{i}", release.wait) for i in range(2)]
+    with pytest.raises(QueueFullError):
+        jobs.submit('overflow', release.wait)
+    release.set()
+    for job in queued:
+        wait_for(job)
+    stats = jobs.stats()
+    assert (stats['completed'], stats['rejected'], stats['queued']) == (3, 1, 0)
+
+def test_workers_bound_concurrency():
+    jobs = JobManager(max_workers=2, max_queue=10)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+        return {}
+
+    submitted = [jobs.submit(f"j{i}", work) for i in range(6)]
+    for job in submitted:
+        wait_for(job)
+    assert max(peak) == 2
+
+def test_only_finished_jobs_are_dropped_past_max_retained():
+    jobs = JobManager(max_workers=1, max_retained=2)
+    release = threading.Event()
+    done = wait_for(jobs.submit('done', lambda: {}))
+    blocked = jobs.submit('blocked', release.wait)
+    jobs.submit('queued', release.wait)
+    assert jobs.get('done') is None
+    assert jobs.get('blocked') is blocked
+    release.set()
+    wait_for(blocked)
+    assert done.status == 'completed'
+
+def test_async_jobs_share_the_queue_limits():
+    async def run():
+        jobs = AsyncJobManager(max_workers=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def work(value):
+            await release.wait()
+            return {'value': value}
+
+        first = jobs.submit('j1', work, 1)
+        await asyncio.sleep(0)
+        second = jobs.submit('j2', work, 2)
+        with pytest.raises(QueueFullError):
+            jobs.submit('j3', work, 3)
+        release.set()
+        while second.status != 'completed':
+            await asyncio.sleep(0.01)
+        return first, second, jobs.stats()
+
+    first, second, stats = asyncio.run(run())
+    assert (first.result, second.result) == ({'value': 1}, {'value': 2})
+    assert (stats['completed'], stats['rejected']) == (2, 1)
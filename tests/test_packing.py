@@ -0,0 +1,68 @@
+from services.research.packing import (
+    SourcePacker,
+    chars_per_token,
+    compress_text,
+    parse_budgets,
+    truncate_to_sentence
+)
+from services.search import SearchResult
+
+PAGE = " ".join(
+    f"Sentence {i} reports measured progress on fusion plasma confinement in tokamak experiments."
+    for i in range(200)
+)
+
+def source(i, title, content=None, snippet="A snippet about the topic."):
+    return SearchResult(title=title, url=f"https://example{i}.com/page", snippet=snippet, content=content)
+
+def test_compress_text_drops_boilerplate_and_repeated_sentences():
+    seen = set()
+    first = compress_text("Accept all cookies to continue browsing. Fusion output doubled this year in trials.", seen)
+    assert first == "Fusion output doubled this year in trials."
+    # The same sentence from another page is not repeated
+    assert compress_text("Fusion output doubled this year in trials!", seen) == ""
+
+def test_truncate_to_sentence_backs_off_to_a_sentence_end():
+    text = "First sentence is here. Second sentence is longer than the first one."
+    assert truncate_to_sentence(text, 200) == text
+    assert truncate_to_sentence(text, 40) == "First sentence is here."
+    assert truncate_to_sentence("no sentence end in this long run of words", 20).endswith('...')
+
+def test_pack_keeps_the_budget():
+    packer = SourcePacker({'brief': 600})
+    sources = [source(i, f"Fusion report {i}", content=PAGE.replace("Sentence", f"Page {i} sentence")) for i in range(5)]
+    packed, stats = packer.pack(sources, "fusion plasma confinement", "brief")
+    assert stats['tokens_before'] > 600
+    assert stats['tokens_after'] <= 600
+    assert sum(packer.source_tokens(result) for result in packed) == stats['tokens_after']
+
+def test_pack_ranks_by_relevance_and_drops_what_does_not_fit():
+    packer = SourcePacker({'brief': 60})
+    sources = [
+        source(0, "Gardening tips for spring"),
+        source(1, "Fusion plasma confinement record"),
+        source(2, "Cooking with seasonal produce")
+    ]
+    packed, stats = packer.pack(sources, "fusion plasma", "brief")
+    assert packed[0].title == "Fusion plasma confinement record"
+    assert stats['dropped'] == len(sources) - len(packed) > 0
+
+def test_pack_without_a_budget_leaves_sources_alone():
+    sources = [source(0, "Fusion", content=PAGE)]
+    packed, stats = SourcePacker({'brief': 600}).pack(sources, "fusion", "comprehensive")
+    assert packed == sources
+    assert stats['dropped'] == 0
+
+def test_pack_source_takes_an_even_share():
+    packer = SourcePacker({'brief': 1000})
+    packed = packer.pack_source(source(0, "Fusion", content=PAGE), "brief", 4)
+    assert packer.source_tokens(packed) <= 250
+    assert packed.content.startswith("Sentence 0")
+    # Too small a share to be worth sending: the snippet stands in for the page
+    assert packer.pack_source(source(0, "Fusion", content=PAGE), "brief", 100).content is None
+
+def test_budget_and_ratio_parsing():
+    assert parse_budgets("brief=1500, Detailed=3000,,") == {'brief': 1500, 'detailed': 3000}
+    assert chars_per_token('openai-chat') == 4.0
+    assert chars_per_token('anthropic') == 3.5
+    assert chars_per_token('unknown') == 3.5
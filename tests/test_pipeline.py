@@ -0,0 +1,92 @@
+import asyncio
+import time
+from dataclasses import replace
+
+import pytest
+
+from benchmarks.fakes import FakeLLM
+from services.research.chains import ResearchChainManager
+from services.search import SearchResult
+
+def sources(count):
+    return [SearchResult(title=f"Source {i}", url=f"https://example{i}.com/page", snippet=f"Snippet {i}")
+            for i in range(count)]
+
+def trickle(results, gap, seen_calls=None, llm=None):
+    """Yield results with a gap, like a search whose queries return one by one."""
+    for result in results:
+        time.sleep(gap)
+        yield result
+    if seen_calls is not None:
+        seen_calls.append(llm.calls)
+
+def manager(llm, **kwargs):
+    options = {'analysis_mode': 'map_reduce', 'map_concurrency': 4, 'map_timeout': 5,
+               'quorum': 0.5, 'straggler_timeout': 0.1, **kwargs}
+    return ResearchChainManager(llm, **options)
+
+def test_analysis_starts_while_sources_are_still_arriving():
+    llm = FakeLLM(latency=0.05, num_tokens=5)
+    chains = manager(llm)
+    calls_when_search_finished = []
+    start = time.monotonic()
+    response = chains.process_research_stream(
+        "fusion", "Summarize", trickle(sources(4), 0.1, calls_when_search_finished, llm), depth="brief"
+    )
+    elapsed = time.monotonic() - start
+    assert calls_when_search_finished[0] >= 3
+    assert [source.title for source in response['sources']] == [f"Source {i}" for i in range(4)]
+    # Sequential stages would take the 0.4s search plus the analyses and synthesis
+    assert elapsed < 0.4 + 4 * 0.05 + 0.05
+
+def test_synthesis_drops_stragglers_once_the_quorum_is_in():
+    # The third call (an analysis) stalls for a second
+    llm = FakeLLM(latency=0.02, num_tokens=5, slow_every=3, slow_latency=1.0)
+    chains = manager(llm)
+    start = time.monotonic()
+    response = chains.process_research_stream("fusion", "Summarize", iter(sources(4)), depth="brief")
+    assert time.monotonic() - start < 0.6
+    assert len(response['sources']) == 3
+    assert response['timings']['analysis'] < 0.5
+
+def test_prepare_runs_per_source_and_failures_are_left_out():
+    llm = FakeLLM(latency=0.01, num_tokens=5)
+    chains = manager(llm)
+
+    def prepare(source):
+        if source.title == "Source 1":
+            raise ValueError("page unavailable")
+        return replace(source, content=f"Page text of {source.title}.")
+
+    response = chains.process_research_stream("fusion", "Summarize", iter(sources(3)), depth="brief",
+                                              prepare=prepare)
+    assert [(source.title, source.content) for source in response['sources']] == [
+        ("Source 0", "Page text of Source 0."),
+        ("Source 2", "Page text of Source 2."),
+    ]
+
+def test_raw_snippets_are_used_when_no_analysis_finishes():
+    # Every call takes 0.3s, well past the 0.1s analysis deadline
+    llm = FakeLLM(latency=0.01, num_tokens=5, slow_every=1, slow_latency=0.3)
+    chains = manager(llm, map_timeout=0.1, straggler_timeout=0.05)
+    response = chains.process_research_stream("fusion", "Summarize", iter(sources(2)), depth="brief")
+    assert [source.title for source in response['sources']] == ["Source 0", "Source 1"]
+    assert response['timings']['analysis'] < 0.25
+
+def test_async_pipeline_accepts_an_async_source_stream():
+    llm = FakeLLM(latency=0.05, num_tokens=5)
+    chains = manager(llm)
+
+    async def arrive():
+        for result in sources(3):
+            await asyncio.sleep(0.05)
+            yield result
+
+    async def main():
+        start = time.monotonic()
+        response = await chains.aprocess_research_stream("fusion", "Summarize", arrive(), depth="brief")
+        return response, time.monotonic() - start
+
+    response, elapsed = asyncio.run(main())
+    assert [source.title for source in response['sources']] == ["Source 0", "Source 1", "Source 2"]
+    assert elapsed < 0.15 + 3 * 0.05 + 0.05
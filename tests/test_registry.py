@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeLLM
+from services.models import ModelFactory
+from services.registry import ServiceRegistry
+
+@pytest.fixture
+def slow_models(monkeypatch):
+    """Model construction that takes 0.3s for 'openai' and is instant otherwise."""
+    built = []
+    lock = threading.Lock()
+
+    def create_model(provider, api_key, temperature, max_tokens):
+        with lock:
+            built.append((provider, temperature, max_tokens))
+        if provider == 'openai':
+            time.sleep(0.3)
+        return FakeLLM(latency=0)
+
+    monkeypatch.setattr(ModelFactory, 'create_model', staticmethod(create_model))
+    return built
+
+def registry():
+    return ServiceRegistry(api_keys={'openai': 'k1', 'anthropic': 'k2'}, serpapi_key='serp')
+
+def test_slow_build_does_not_block_other_configurations(slow_models):
+    services = registry()
+    # Pay for the chain stack's first-use imports up front
+    services.get_research_manager('anthropic', max_tokens=100)
+    slow = threading.Thread(target=services.get_research_manager, args=('openai',))
+    slow.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    services.get_research_manager('anthropic')
+    services.stats()
+    assert time.monotonic() - start < 0.2
+    slow.join()
+
+def test_concurrent_requests_build_each_configuration_once(slow_models):
+    services = registry()
+    managers = []
+    threads = [
+        threading.Thread(target=lambda: managers.append(services.get_research_manager('openai', max_tokens=900)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert slow_models == [('openai', 0.7, 900)]
+    assert len({id(manager) for manager in managers}) == 1
+    stats = services.stats()
+    assert (stats['registry_misses'], stats['registry_hits']) == (1, 7)
+
+def test_failed_build_is_retried(monkeypatch):
+    calls = []
+
+    def create_model(provider, api_key, temperature, max_tokens):
+        calls.append(provider)
+        if len(calls) == 1:
+            raise RuntimeError("SDK import failed")
+        return FakeLLM(latency=0)
+
+    monkeypatch.setattr(ModelFactory, 'create_model', staticmethod(create_model))
+    services = registry()
+    with pytest.raises(RuntimeError):
+        services.get_research_manager('openai')
+    assert services.get_research_manager('openai') is services.get_research_manager('openai')
+    assert calls == ['openai', 'openai']
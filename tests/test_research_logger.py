@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+import pytest
+from services.logging import MemorySessionStore, ResearchLogger, SQLiteSessionStore, TokenEventBuffer
+
+def logger_with(store):
+    return ResearchLogger(reaper_interval=0, store=store)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def research_logger(request, tmp_path):
+    if request.param == 'memory':
+        return logger_with(MemorySessionStore())
+    return logger_with(SQLiteSessionStore(str(tmp_path / 'sessions.db'), poll_interval=0.01))
+
+def steps(logs):
+    return [log['step'] for log in logs]
+
+def test_async_and_nowait_variants_keep_their_order(research_logger):
+    async def main():
+        await research_logger.acreate_session('s1')
+        buffer = TokenEventBuffer(research_logger, 's1', nowait=True)
+        await research_logger.alog_step('s1', 'research_started')
+        for chunk in ('a', 'b', 'c'):
+            buffer(chunk)
+        buffer.flush()
+        research_logger.log_step_nowait('s1', 'stage_completed')
+        await research_logger.alog_step('s1', 'research_completed')
+        await research_logger.aclose_session('s1')
+        return await research_logger.await_logs('s1', timeout=1)
+
+    logs, finished = asyncio.run(main())
+    assert finished
+    assert steps(logs) == ['research_started', 'synthesis_token', 'synthesis_token',
+                           'stage_completed', 'research_completed']
+    assert ''.join(log['details']['text'] for log in logs if log['step'] == 'synthesis_token') == 'abc'
+
+def test_sqlite_reads_do_not_block_the_event_loop(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'), poll_interval=0.01)
+    research_logger = logger_with(store)
+    research_logger.create_session('s1')
+
+    def hold_lock():
+        # As a writer waiting out another process's BEGIN IMMEDIATE would
+        with store._lock:
+            time.sleep(0.3)
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        await asyncio.sleep(0.02)
+        await research_logger.alog_step('s1', 'research_started')
+        logs, _ = await research_logger.await_logs('s1', timeout=1)
+        ticker.cancel()
+        holder.join()
+        return logs, ticks
+
+    logs, ticks = asyncio.run(main())
+    assert steps(logs) == ['research_started']
+    # The loop kept running while the lock was held
+    assert ticks >= 10
+
+def log_later(research_logger, session_id, delay, step='research_started', close=False):
+    def run():
+        time.sleep(delay)
+        research_logger.log_step(session_id, step)
+        if close:
+            research_logger.close_session(session_id)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+def test_waiters_wake_when_an_event_is_logged(research_logger):
+    research_logger.create_session('s1')
+    writer = log_later(research_logger, 's1', 0.1)
+    start = time.monotonic()
+    logs, finished = research_logger.wait_for_logs('s1', timeout=5)
+    writer.join()
+    assert steps(logs) == ['research_started'] and not finished
+    assert time.monotonic() - start < 1
+
+def test_async_waiters_wake_when_an_event_is_logged(research_logger):
+    research_logger.create_session('s1')
+
+    async def main():
+        writer = log_later(research_logger, 's1', 0.1, close=True)
+        start = time.monotonic()
+        result = await research_logger.await_logs('s1', timeout=5)
+        writer.join()
+        return result, time.monotonic() - start
+
+    (logs, _), elapsed = asyncio.run(main())
+    assert steps(logs)[:1] == ['research_started']
+    assert elapsed < 1
+
+def test_idle_wait_times_out_for_a_heartbeat(research_logger):
+    research_logger.create_session('s1')
+    assert research_logger.wait_for_logs('s1', timeout=0.05) == ([], False)
+
+def test_resuming_after_an_event_id_skips_what_was_sent(research_logger):
+    research_logger.create_session('s1')
+    for step in ('research_started', 'search_completed', 'analysis_completed'):
+        research_logger.log_step('s1', step)
+    logs, _ = research_logger.wait_for_logs('s1', timeout=0)
+    assert [log['id'] for log in logs] == [1, 2, 3]
+    # A reconnecting EventSource sends Last-Event-ID: 2
+    logs, finished = research_logger.wait_for_logs('s1', after_id=2, timeout=0)
+    assert steps(logs) == ['analysis_completed'] and not finished
+
+def test_closed_and_unknown_sessions_end_the_stream(research_logger):
+    research_logger.create_session('s1')
+    research_logger.log_step('s1', 'research_completed')
+    research_logger.close_session('s1')
+    logs, finished = research_logger.wait_for_logs('s1', timeout=5)
+    assert steps(logs) == ['research_completed'] and finished
+    assert research_logger.wait_for_logs('s1', after_id=logs[-1]['id'], timeout=5) == ([], True)
+    assert research_logger.wait_for_logs('missing', timeout=5) == ([], True)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def bounded_logger(request, tmp_path):
+    store = MemorySessionStore() if request.param == 'memory' else \
+        SQLiteSessionStore(str(tmp_path / 'sessions.db'), poll_interval=0.01)
+    return ResearchLogger(completed_ttl=0.05, idle_timeout=0.2, max_events_per_session=3,
+                          max_sessions=2, reaper_interval=0, store=store)
+
+def test_oldest_events_are_dropped_past_the_per_session_limit(bounded_logger):
+    bounded_logger.create_session('s1')
+    for i in range(5):
+        bounded_logger.log_step('s1', f"step{i}")
+    logs, _ = bounded_logger.wait_for_logs('s1', timeout=0)
+    assert steps(logs) == ['step2', 'step3', 'step4']
+    stats = bounded_logger.stats()
+    assert (stats['retained_events'], stats['dropped_events']) == (3, 2)
+    assert stats['retained_bytes'] > 0
+
+def test_least_recently_active_session_is_evicted(bounded_logger):
+    for session_id in ('s1', 's2'):
+        bounded_logger.create_session(session_id)
+    bounded_logger.log_step('s1', 'research_started')
+    bounded_logger.create_session('s3')
+    # s2 had no activity since it was created, so it goes first
+    assert bounded_logger.wait_for_logs('s2', timeout=0) == ([], True)
+    assert steps(bounded_logger.wait_for_logs('s1', timeout=0)[0]) == ['research_started']
+    assert bounded_logger.stats()['evicted_sessions'] == 1
+
+def test_reap_expires_closed_and_idle_sessions(bounded_logger):
+    bounded_logger.create_session('closed')
+    bounded_logger.create_session('idle')
+    bounded_logger.close_session('closed')
+    time.sleep(0.1)
+    assert bounded_logger.reap() == 1
+    time.sleep(0.15)
+    assert bounded_logger.reap() == 1
+    stats = bounded_logger.stats()
+    assert (stats['live_sessions'], stats['expired_sessions'], stats['retained_bytes']) == (0, 2, 0)
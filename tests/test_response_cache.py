@@ -0,0 +1,32 @@
+from services.research.response_cache import llm_fingerprint, response_cache_key, source_analysis_cache_key
+
+class FakeClient:
+    _llm_type = 'fake'
+    model_name = 'fake-1'
+    temperature = 0.7
+    max_tokens = 500
+
+class FakeAnthropicClient:
+    _llm_type = 'anthropic'
+    model = 'claude-2'
+    temperature = 0.7
+    max_tokens_to_sample = 500
+
+def test_response_cache_key_depends_on_prompt_and_settings():
+    other = FakeClient()
+    other.temperature = 0.2
+    assert response_cache_key(FakeClient(), 'prompt') == response_cache_key(FakeClient(), 'prompt')
+    assert response_cache_key(FakeClient(), 'prompt') != response_cache_key(FakeClient(), 'other prompt')
+    assert response_cache_key(FakeClient(), 'prompt') != response_cache_key(other, 'prompt')
+
+def test_fingerprint_reads_anthropic_output_budget():
+    larger = FakeAnthropicClient()
+    larger.max_tokens_to_sample = 1500
+    assert llm_fingerprint(FakeAnthropicClient())['max_tokens'] == 500
+    assert response_cache_key(FakeAnthropicClient(), 'prompt') != response_cache_key(larger, 'prompt')
+
+def test_source_analysis_key_ignores_tracking_params_but_not_content():
+    client = FakeClient()
+    plain = source_analysis_cache_key(client, 'https://example.com/page')
+    assert plain == source_analysis_cache_key(client, 'https://example.com/page?utm_source=feed')
+    assert plain != source_analysis_cache_key(client, 'https://example.com/page', content='page text')
@@ -0,0 +1,136 @@
+import gzip
+import json
+import pytest
+from services.results import ResultStore, body_response, etag_matches, result_response
+from services.results import store as store_module
+from services.results.http import accepted_encodings
+
+def response(i, words=400):
+    return {
+        'result': ' '.join(f"finding {i} word {j}" for j in range(words)),
+        'duration': 1.5,
+        'sources': [{'title': f"Source {i}", 'url': f"https://example.com/{i}"}]
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(str(tmp_path / 'results.db'))
+
+def test_put_and_get_round_trip(store):
+    stored = store.put('s1', 'Fusion power', 'brief', 'openai', response(1))
+    fetched = store.get('s1')
+    assert fetched.to_dict() == response(1)
+    assert fetched.etag == stored.etag
+    assert len(fetched.data) < fetched.size
+    assert store.get('missing') is None
+    stats = store.stats()
+    assert (stats['entries'], stats['reads'], stats['misses']) == (1, 2, 1)
+    assert stats['compression_ratio'] > 1
+
+def test_list_pages_through_ties_without_gaps_or_repeats(store, monkeypatch):
+    # Every result gets the same timestamp, so only the session id orders them
+    monkeypatch.setattr(store_module.time, 'time', lambda: 1000.0)
+    store.max_age = float('inf')
+    for i in range(7):
+        store.put(f"s{i}", f"topic {i}", 'brief', 'openai', response(i, words=5))
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = store.list(limit=3, cursor=cursor)
+        seen.extend(summary['session_id'] for summary in page)
+        if cursor is None:
+            break
+    assert seen == [f"s{i}" for i in reversed(range(7))]
+
+def test_list_filters(store):
+    store.put('a', 'Fusion Power', 'brief', 'openai', response(1, words=5))
+    store.put('b', 'fusion  power', 'detailed', 'anthropic', response(2, words=5))
+    store.put('c', 'Solar panels', 'brief', 'openai', response(3, words=5))
+    ids = lambda page: sorted(summary['session_id'] for summary in page[0])
+    assert ids(store.list(topic='FUSION power')) == ['a', 'b']
+    assert ids(store.list(query='solar')) == ['c']
+    assert ids(store.list(depth='brief')) == ['a', 'c']
+    assert ids(store.list(provider='anthropic')) == ['b']
+    # LIKE wildcards in the search text are matched literally
+    assert ids(store.list(query='%')) == []
+
+def test_list_rejects_bad_arguments(store):
+    with pytest.raises(ValueError):
+        store.list(limit=0)
+    with pytest.raises(ValueError):
+        store.list(cursor='not-a-cursor')
+
+def test_prune_keeps_the_newest_entries(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.db'), max_entries=3, prune_every=0)
+    for i in range(5):
+        store.put(f"s{i}", 'topic', 'brief', 'openai', response(i, words=5))
+    assert store.prune() == 2
+    assert store.get('s0') is None
+    assert store.get('s4') is not None
+    assert store.stats()['entries'] == 3
+
+def test_stats_totals_follow_writes_replacements_and_pruning(tmp_path):
+    path = str(tmp_path / 'results.db')
+    store = ResultStore(path, max_entries=2, prune_every=0)
+    store.put('s1', 'topic', 'brief', 'openai', response(1, words=50))
+    store.put('s1', 'topic', 'detailed', 'openai', response(1, words=200))
+    store.put('s2', 'topic', 'brief', 'openai', response(2, words=5))
+    store.put('s3', 'topic', 'brief', 'openai', response(3, words=5))
+    store.prune()
+
+    def actual(db):
+        return db._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM results"
+        ).fetchone()
+
+    stats = store.stats()
+    assert (stats['entries'], stats['bytes'], stats['stored_bytes']) == actual(store)
+    assert stats['entries'] == 2
+    # Another process opening the same database sees the same totals
+    other = ResultStore(path)
+    assert other.stats()['bytes'] == stats['bytes']
+
+def test_stats_seeds_totals_for_existing_databases(tmp_path):
+    path = str(tmp_path / 'results.db')
+    store = ResultStore(path)
+    store.put('s1', 'topic', 'brief', 'openai', response(1))
+    store._conn.executescript(
+        "DROP TRIGGER results_insert; DROP TRIGGER results_delete; DROP TRIGGER results_resize; DROP TABLE results_meta;"
+    )
+    stats = ResultStore(path).stats()
+    assert (stats['entries'], stats['bytes']) == (1, store.get('s1').size)
+
+def test_result_response_passes_gzip_through(store):
+    stored = store.put('s1', 'Fusion power', 'brief', 'openai', response(1))
+    status, body, headers = result_response(stored, 'br, gzip;q=0.8', None)
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert body is stored.data
+    assert json.loads(gzip.decompress(body)) == response(1)
+
+    status, body, headers = result_response(stored, 'gzip;q=0', None)
+    assert 'Content-Encoding' not in headers
+    assert json.loads(body) == response(1)
+
+def test_result_response_answers_a_matching_etag_with_304(store):
+    stored = store.put('s1', 'Fusion power', 'brief', 'openai', response(1))
+    status, body, headers = result_response(stored, 'gzip', f'W/"{stored.etag}"')
+    assert (status, body) == (304, b'')
+    assert headers['ETag'] == f'"{stored.etag}"'
+
+def test_body_response_tags_by_content():
+    body = json.dumps({'results': ['x' * 2000]}).encode()
+    status, encoded, headers = body_response(body, 'gzip', None)
+    assert status == 200 and headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(encoded) == body
+    assert body_response(body, 'gzip', headers['ETag'])[0] == 304
+    assert body_response(b'{"results": []}', 'gzip', headers['ETag'])[0] == 200
+    # Small bodies are not worth compressing
+    assert 'Content-Encoding' not in body_response(b'{}', 'gzip', None)[2]
+
+def test_header_parsing():
+    assert accepted_encodings('gzip;q=0.5, br, identity;q=0') == {'gzip': 0.5, 'br': 1.0}
+    assert etag_matches('"a", "b"', 'b')
+    assert etag_matches('*', 'anything')
+    assert not etag_matches(None, 'a')
@@ -0,0 +1,179 @@
+import asyncio
+import time
+import pytest
+from langchain_core.outputs import GenerationChunk
+from benchmarks.fakes import FakeLLM
+from services.models.router import ProviderStats, RoutingLLM
+
+class StallingLLM(FakeLLM):
+    """Sends one chunk right away, then stalls."""
+
+    def _stream(self, prompt, stop=None, run_manager=None, **kwargs):
+        self._check_failure()
+        yield GenerationChunk(text="first ")
+        time.sleep(0.5)
+        yield GenerationChunk(text="late")
+
+    async def _astream(self, prompt, stop=None, run_manager=None, **kwargs):
+        self._check_failure()
+        yield GenerationChunk(text="first ")
+        await asyncio.sleep(0.5)
+        yield GenerationChunk(text="late")
+
+def router(providers, hedge=False, timeout=5.0, warm=None):
+    """A router over fakes in the given order; warm providers get recent fast calls so hedging kicks in."""
+    routing = RoutingLLM(
+        providers=providers,
+        order=list(providers),
+        provider_stats={},
+        timeout=timeout,
+        hedge=hedge,
+        hedge_min_samples=5
+    )
+    for name in warm or ():
+        for _ in range(5):
+            routing.provider_stats[name].record(0.01, ok=True)
+    return routing
+
+def snapshot(routing, name):
+    return routing.stats()['providers'][name]
+
+def test_failover_to_the_next_provider():
+    primary, backup = FakeLLM(latency=0, fail_every=1), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup})
+    assert routing.invoke("prompt")
+    assert (primary.calls, backup.calls) == (1, 1)
+    assert routing.stats()['failovers'] == 1
+    assert snapshot(routing, 'primary')['errors'] == 1
+    assert snapshot(routing, 'backup')['latency_histogram']['+Inf'] == 1
+
+def test_each_provider_is_tried_once_when_all_fail():
+    fakes = {name: FakeLLM(latency=0, fail_every=1) for name in ('a', 'b', 'c')}
+    routing = router(fakes)
+    with pytest.raises(RuntimeError):
+        routing.invoke("prompt")
+    assert [fake.calls for fake in fakes.values()] == [1, 1, 1]
+    assert routing.stats()['failovers'] == 2
+
+def test_unhealthy_provider_is_tried_last():
+    primary, backup = FakeLLM(latency=0), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup})
+    for _ in range(5):
+        routing.provider_stats['primary'].record(0.01, ok=False)
+    routing.invoke("prompt")
+    assert (primary.calls, backup.calls) == (0, 1)
+
+def test_hedge_wins_when_the_primary_stalls():
+    primary, backup = FakeLLM(latency=0.5), FakeLLM(latency=0.01)
+    routing = router({'primary': primary, 'backup': backup}, hedge=True, warm=['primary'])
+    start = time.monotonic()
+    routing.invoke("prompt")
+    assert time.monotonic() - start < 0.4
+    stats = routing.stats()
+    assert (stats['hedges'], stats['hedge_wins'], stats['failovers']) == (1, 1, 0)
+
+def test_failed_hedge_backup_is_not_retried():
+    primary, backup, spare = FakeLLM(latency=0.2), FakeLLM(latency=0, fail_every=1), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup, 'spare': spare}, hedge=True, warm=['primary'])
+    routing.invoke("prompt")
+    assert (primary.calls, backup.calls, spare.calls) == (1, 1, 0)
+    stats = routing.stats()
+    assert (stats['hedges'], stats['hedge_wins']) == (1, 0)
+
+def test_timeout_is_recorded_once():
+    primary, backup = FakeLLM(latency=0.3), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup}, timeout=0.05)
+    routing.invoke("prompt")
+    # Let the abandoned primary call finish; its late success must not be recorded
+    time.sleep(0.4)
+    primary_stats = snapshot(routing, 'primary')
+    assert (primary_stats['calls'], primary_stats['errors']) == (1, 1)
+    assert routing.stats()['failovers'] == 1
+
+def test_async_failover_and_hedge():
+    primary, backup = FakeLLM(latency=0, fail_every=1), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup})
+    assert asyncio.run(routing.ainvoke("prompt"))
+    assert (primary.calls, backup.calls) == (1, 1)
+    assert routing.stats()['failovers'] == 1
+
+    primary, backup = FakeLLM(latency=0.5), FakeLLM(latency=0.01)
+    routing = router({'primary': primary, 'backup': backup}, hedge=True, warm=['primary'])
+    start = time.monotonic()
+    asyncio.run(routing.ainvoke("prompt"))
+    assert time.monotonic() - start < 0.4
+    assert routing.stats()['hedge_wins'] == 1
+    # The losing call is cancelled before it answers, so only the warm-up calls are recorded
+    assert snapshot(routing, 'primary')['calls'] == 5
+
+def test_async_timeout_fails_over():
+    primary, backup = FakeLLM(latency=0.3), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup}, timeout=0.05)
+    assert asyncio.run(routing.ainvoke("prompt"))
+    primary_stats = snapshot(routing, 'primary')
+    assert (primary_stats['calls'], primary_stats['errors']) == (1, 1)
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_stream_fails_over_before_the_first_chunk(use_async):
+    primary, backup = FakeLLM(latency=0, fail_every=1, num_tokens=5), FakeLLM(latency=0, num_tokens=5)
+    routing = router({'primary': primary, 'backup': backup})
+    assert len(stream(routing, use_async)) == 5
+    assert routing.stats()['failovers'] == 1
+    assert snapshot(routing, 'backup')['calls'] == 1
+
+def stream(routing, use_async):
+    if use_async:
+        async def collect():
+            return [chunk async for chunk in routing.astream("prompt")]
+        return asyncio.run(collect())
+    return list(routing.stream("prompt"))
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_stalled_stream_fails_over_at_the_timeout(use_async):
+    primary, backup = FakeLLM(latency=1.0, num_tokens=5), FakeLLM(latency=0, num_tokens=5)
+    routing = router({'primary': primary, 'backup': backup}, timeout=0.2)
+    start = time.monotonic()
+    assert len(stream(routing, use_async)) == 5
+    assert time.monotonic() - start < 0.5
+    assert routing.stats()['failovers'] == 1
+    primary_stats = snapshot(routing, 'primary')
+    assert (primary_stats['calls'], primary_stats['errors']) == (1, 1)
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_stream_hedge_wins_when_the_primary_stalls(use_async):
+    primary, backup = FakeLLM(latency=0.5, num_tokens=5), FakeLLM(latency=0.01, num_tokens=5)
+    routing = router({'primary': primary, 'backup': backup}, hedge=True, warm=['primary'])
+    start = time.monotonic()
+    chunks = stream(routing, use_async)
+    assert time.monotonic() - start < 0.4
+    assert ''.join(chunks) == backup.invoke("prompt")
+    stats = routing.stats()
+    assert (stats['hedges'], stats['hedge_wins'], stats['failovers']) == (1, 1, 0)
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_stream_stalling_after_its_first_chunk_fails(use_async):
+    primary, backup = StallingLLM(latency=0), FakeLLM(latency=0)
+    routing = router({'primary': primary, 'backup': backup}, timeout=0.2)
+    with pytest.raises(TimeoutError):
+        stream(routing, use_async)
+    # Output already reached the caller, so there is no failover
+    assert backup.calls == 0
+
+def test_routers_can_share_a_pool():
+    from concurrent.futures import ThreadPoolExecutor
+    pool = ThreadPoolExecutor(max_workers=2)
+    first = RoutingLLM(providers={'a': FakeLLM(latency=0)}, order=['a'], provider_stats={}, executor=pool)
+    second = RoutingLLM(providers={'a': FakeLLM(latency=0)}, order=['a'], provider_stats={}, executor=pool)
+    assert first._executor is second._executor is pool
+    assert first.invoke("prompt") == second.invoke("prompt")
+
+def test_provider_stats_snapshot():
+    stats = ProviderStats(window=10)
+    for latency in (0.1, 0.2, 0.3):
+        stats.record(latency, ok=True)
+    stats.record(5.0, ok=False)
+    snapshot = stats.snapshot()
+    assert (snapshot['calls'], snapshot['errors']) == (4, 1)
+    assert snapshot['error_rate'] == 0.25
+    assert snapshot['latency_histogram']['+Inf'] == 3
+    assert snapshot['p50'] == 0.2
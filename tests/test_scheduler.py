@@ -0,0 +1,145 @@
+import asyncio
+import time
+import pytest
+from services.jobs import (
+    DeadlineExceededError,
+    PriorityScheduler,
+    QueueFullError,
+    SchedulingClass,
+    parse_class_options
+)
+
+def drain(scheduler, blocker, tickets):
+    """Release the blocker, then each ticket as it starts; returns classes in start order."""
+    order = []
+    running = [blocker]
+    while running:
+        scheduler.release(running.pop())
+        for ticket in tickets:
+            if ticket.state == 'running' and ticket not in order:
+                order.append(ticket)
+                running.append(ticket)
+    return [ticket.job_class for ticket in order]
+
+def test_slots_are_shared_by_weight():
+    scheduler = PriorityScheduler({
+        'brief': SchedulingClass(weight=3),
+        'comprehensive': SchedulingClass(weight=1)
+    }, max_concurrency=1)
+    blocker = scheduler.submit('brief')
+    tickets = [scheduler.submit('comprehensive') for _ in range(4)] + [scheduler.submit('brief') for _ in range(12)]
+
+    order = drain(scheduler, blocker, tickets)
+    assert len(order) == 16
+    # Both classes are backlogged for the first 16 admissions: three brief per comprehensive
+    assert order[:8].count('brief') == 6
+    assert order[:8].count('comprehensive') == 2
+
+def test_idle_class_does_not_bank_credit():
+    scheduler = PriorityScheduler({'brief': SchedulingClass(), 'detailed': SchedulingClass()}, max_concurrency=1)
+    blocker = scheduler.submit('brief')
+    tickets = [scheduler.submit('brief') for _ in range(6)]
+    order = drain(scheduler, blocker, tickets)
+    assert order == ['brief'] * 6
+
+    blocker = scheduler.submit('brief')
+    tickets = [scheduler.submit('brief') for _ in range(3)] + [scheduler.submit('detailed') for _ in range(3)]
+    order = drain(scheduler, blocker, tickets)
+    # detailed rejoins at brief's pass instead of with the credit of its idle time, so they alternate
+    assert order == ['detailed', 'brief'] * 3
+
+def test_class_concurrency_cap():
+    scheduler = PriorityScheduler({
+        'brief': SchedulingClass(),
+        'comprehensive': SchedulingClass(max_concurrency=1)
+    }, max_concurrency=4)
+    deep = [scheduler.submit('comprehensive') for _ in range(3)]
+    brief = [scheduler.submit('brief') for _ in range(3)]
+    assert [ticket.state for ticket in deep] == ['running', 'queued', 'queued']
+    assert all(ticket.state == 'running' for ticket in brief)
+    stats = scheduler.stats()
+    assert stats['running'] == 4
+    assert stats['classes']['comprehensive']['queued'] == 2
+
+    scheduler.release(deep[0])
+    assert deep[1].state == 'running'
+
+def test_expired_work_is_shed_instead_of_started():
+    shed = []
+    scheduler = PriorityScheduler({'brief': SchedulingClass(deadline=0.05)}, max_concurrency=1)
+    blocker = scheduler.submit('brief')
+    late = scheduler.submit('brief', on_shed=shed.append)
+    time.sleep(0.1)
+    scheduler.release(blocker)
+    assert late.state == 'shed'
+    assert shed == [late]
+    assert scheduler.stats()['classes']['brief']['shed'] == 1
+    with pytest.raises(DeadlineExceededError):
+        scheduler.wait(late)
+
+def test_wait_sheds_at_the_deadline():
+    scheduler = PriorityScheduler({'brief': SchedulingClass(deadline=0.05)}, max_concurrency=1)
+    scheduler.submit('brief')
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        with scheduler.slot('brief'):
+            pass
+    assert time.monotonic() - start < 1
+    assert scheduler.stats()['classes']['brief']['queued'] == 0
+
+def test_full_class_queue_rejects_submissions():
+    scheduler = PriorityScheduler({'brief': SchedulingClass(max_queue=1)}, max_concurrency=1)
+    scheduler.submit('brief')
+    scheduler.submit('brief')
+    with pytest.raises(QueueFullError):
+        scheduler.submit('brief')
+    assert scheduler.stats()['classes']['brief']['rejected'] == 1
+
+def test_withdraw_only_sheds_queued_work():
+    scheduler = PriorityScheduler({'brief': SchedulingClass()}, max_concurrency=1)
+    running = scheduler.submit('brief')
+    queued = scheduler.submit('brief')
+    assert scheduler.withdraw(queued)
+    assert not scheduler.withdraw(running)
+    assert not scheduler.withdraw(queued)
+    scheduler.release(running)
+    assert scheduler.stats()['running'] == 0
+
+def test_async_slot_waits_for_a_release():
+    scheduler = PriorityScheduler({'brief': SchedulingClass()}, max_concurrency=1)
+    blocker = scheduler.submit('brief')
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, scheduler.release, blocker)
+        async with scheduler.aslot('brief') as ticket:
+            assert ticket.state == 'running'
+        return ticket
+
+    ticket = asyncio.run(main())
+    assert ticket.state == 'finished'
+    assert scheduler.stats()['classes']['brief']['completed'] == 2
+
+def test_cancelled_async_waiter_gives_up_its_place():
+    scheduler = PriorityScheduler({'brief': SchedulingClass()}, max_concurrency=1)
+    blocker = scheduler.submit('brief')
+
+    async def main():
+        waiter = asyncio.create_task(scheduler.aslot('brief').__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    scheduler.release(blocker)
+    assert scheduler.stats()['running'] == 0
+
+def test_unknown_class_and_bad_weight_are_rejected():
+    with pytest.raises(ValueError):
+        PriorityScheduler({'brief': SchedulingClass(weight=0)})
+    with pytest.raises(ValueError):
+        PriorityScheduler({'brief': SchedulingClass()}).submit('deep')
+
+def test_parse_class_options():
+    assert parse_class_options("Brief=4, detailed=2,,bad") == {'brief': 4.0, 'detailed': 2.0}
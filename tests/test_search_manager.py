@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeSearchProvider
+from services.search import SearchResult
+from services.search.dedup import canonicalize_url, dedupe_results
+from services.search.search_manager import SearchManager
+
+class ScriptedSearchProvider(FakeSearchProvider):
+    """Fake provider with a per-query latency and optional failures."""
+
+    def __init__(self, latencies=None, failing=(), latency=0.0):
+        super().__init__(latency=latency)
+        self.latencies = latencies or {}
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def search(self, query, num_results=5):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.latencies.get(query, self.latency))
+            if query in self.failing:
+                raise RuntimeError(f"upstream error for {query}")
+            return self._results(query, num_results)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    async def asearch(self, query, num_results=5):
+        self.calls += 1
+        await asyncio.sleep(self.latencies.get(query, self.latency))
+        if query in self.failing:
+            raise RuntimeError(f"upstream error for {query}")
+        return self._results(query, num_results)
+
+QUERIES = ["fusion", "history of fusion", "fusion recent developments"]
+
+def test_canonicalize_url_ignores_trivial_differences():
+    assert canonicalize_url("https://www.Example.com/a/?utm_source=x&b=2&a=1#top") == "example.com/a?a=1&b=2"
+    assert canonicalize_url("http://example.com/a") == canonicalize_url("https://example.com/a/")
+
+def test_dedupe_results_drops_same_url_and_near_duplicate_snippets():
+    results = [
+        SearchResult(title="A", url="https://example.com/a", snippet="Fusion output doubled in the latest tokamak trials."),
+        SearchResult(title="A again", url="https://www.example.com/a/?utm_medium=feed", snippet="Other text."),
+        SearchResult(title="Syndicated", url="https://mirror.net/a", snippet="Fusion output doubled in the latest tokamak trials!"),
+        SearchResult(title="B", url="https://example.com/b", snippet="Stellarators take a different route."),
+    ]
+    assert [result.title for result in dedupe_results(results)] == ["A", "B"]
+
+def test_search_many_keeps_the_base_query_results_whole_and_first():
+    manager = SearchManager(ScriptedSearchProvider(latencies={"fusion": 0.1}))
+    merged = manager.search_many(QUERIES, num_results=4, max_results=8)
+    # The topic's results lead even though its query finished last, so a brief
+    # run of the topic sees a subset of a detailed run's sources
+    assert merged[:4] == manager.search("fusion", num_results=4)
+    assert len(merged) == 8
+    assert merged[4].url.endswith("history-of-fusion") and merged[5].url.endswith("fusion-recent-developments")
+
+def test_search_many_drops_failed_and_late_queries():
+    provider = ScriptedSearchProvider(latencies={"fusion recent developments": 1.0}, failing={"history of fusion"})
+    manager = SearchManager(provider)
+    start = time.monotonic()
+    merged = manager.search_many(QUERIES, num_results=3, deadline=0.3)
+    assert time.monotonic() - start < 0.8
+    assert [result.url for result in merged] == [result.url for result in provider._results("fusion", 3)]
+
+def test_search_many_raises_when_every_query_fails():
+    manager = SearchManager(ScriptedSearchProvider(failing=set(QUERIES)))
+    with pytest.raises(RuntimeError):
+        manager.search_many(QUERIES)
+
+def test_fan_out_respects_per_call_concurrency_on_the_shared_pool():
+    provider = ScriptedSearchProvider(latency=0.05)
+    manager = SearchManager(provider, max_workers=8)
+    queries = [f"query {i}" for i in range(6)]
+    assert len(manager.search_many(queries, num_results=1, max_concurrency=2)) == 6
+    assert provider.peak == 2
+    pool = manager._executor
+    list(manager.iter_search(queries, num_results=1, max_concurrency=3))
+    # Requests reuse the manager's pool rather than building one each
+    assert manager._executor is pool and not pool._shutdown
+
+def test_queries_after_the_deadline_are_never_sent():
+    provider = ScriptedSearchProvider(latency=0.2)
+    manager = SearchManager(provider)
+    manager.search_many([f"query {i}" for i in range(5)], num_results=1, max_concurrency=1, deadline=0.3)
+    time.sleep(0.3)
+    assert provider.calls == 2
+
+def test_iter_search_yields_the_base_query_first_and_deduplicates():
+    provider = ScriptedSearchProvider(latencies={"fusion": 0.1, "fusion recent developments": 0.2})
+    manager = SearchManager(provider)
+    streamed = list(manager.iter_search(QUERIES + ["fusion"], num_results=2))
+    assert streamed[:2] == provider._results("fusion", 2)
+    assert len(streamed) == 6
+    assert len({result.url for result in streamed}) == 6
+
+def test_iter_search_releases_held_results_when_the_base_query_fails():
+    manager = SearchManager(ScriptedSearchProvider(failing={"fusion"}))
+    assert len(list(manager.iter_search(QUERIES, num_results=2))) == 4
+
+def test_iter_search_stops_at_max_results():
+    manager = SearchManager(ScriptedSearchProvider())
+    assert len(list(manager.iter_search(QUERIES, num_results=4, max_results=5))) == 5
+
+def test_async_variants_match_the_threaded_order():
+    provider = ScriptedSearchProvider(latencies={"fusion": 0.1})
+    manager = SearchManager(provider)
+
+    async def run():
+        merged = await manager.asearch_many(QUERIES, num_results=3, max_results=6)
+        streamed = [result async for result in manager.aiter_search(QUERIES, num_results=3)]
+        return merged, streamed
+
+    merged, streamed = asyncio.run(run())
+    assert merged == manager.search_many(QUERIES, num_results=3, max_results=6)
+    assert streamed[:3] == provider._results("fusion", 3)
+    assert len(streamed) == 9
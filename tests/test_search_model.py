@@ -0,0 +1,69 @@
+import dataclasses
+
+import pytest
+
+from benchmarks.fakes import FakeSearchProvider
+from services.cache import MemoryCache
+from services.search import SearchResult, create_provider, decode_results, encode_results, register_provider
+from services.search.base import PROVIDERS, domain_of
+from services.search.cached_provider import CachedSearchProvider
+from services.search.serp_provider import SerpSearchProvider
+
+def test_results_are_immutable_and_slotted():
+    result = SearchResult(title="Fusion", url="https://www.iter.org/mach", snippet="Tokamak")
+    assert result.domain == "iter.org"
+    assert not hasattr(result, '__dict__')
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.title = "changed"
+    assert dataclasses.replace(result, content="page").content == "page"
+
+def test_to_dict_round_trips_and_ignores_unknown_fields():
+    result = SearchResult(title="Fusion", url="https://example.com/a", snippet="s", position=2, relevance_score=0.5)
+    data = result.to_dict()
+    assert 'content' not in data
+    assert SearchResult.from_dict({**data, 'added_in_a_later_version': 1}) == result
+
+def test_json_encoding_round_trips():
+    results = [SearchResult(title=f"t{i}", url=f"https://example.com/{i}", snippet="s") for i in range(3)]
+    assert decode_results(encode_results(results)) == results
+    with pytest.raises(ValueError):
+        encode_results(results, format='xml')
+
+def test_serpapi_results_get_rank_domain_and_authority():
+    provider = SerpSearchProvider(api_key="key")
+    results = provider._parse_results({'organic_results': [
+        {'title': "NASA", 'link': "https://www.nasa.gov/fusion", 'snippet': "s", 'date': "Jan 1, 2025"},
+        {'title': "Blog", 'link': "https://blog.example.com/post", 'snippet': "s", 'position': 2},
+    ]}, num_results=5)
+    assert [(r.domain, r.position, r.relevance_score, r.domain_authority) for r in results] == [
+        ("nasa.gov", 1, 1.0, 0.9),
+        ("blog.example.com", 2, 0.5, 0.7),
+    ]
+    assert results[0].published_date == "Jan 1, 2025"
+    assert provider._parse_results({}, num_results=5) == []
+
+def test_cached_provider_stores_plain_dicts_and_restores_results():
+    cache = MemoryCache()
+    provider = CachedSearchProvider(FakeSearchProvider(latency=0), cache=cache)
+    first = provider.search("Fusion  power", 2)
+    assert provider.search("fusion power", 2) == first
+    assert provider.provider.calls == 1
+    # Entries are JSON-safe dicts, so every cache backend can hold them
+    stored = cache.get(provider.cache_key("fusion power", 2))
+    assert stored == [result.to_dict() for result in first]
+
+def test_providers_register_by_name():
+    @register_provider('test-fake')
+    class RegisteredFake(FakeSearchProvider):
+        pass
+
+    try:
+        assert isinstance(create_provider('test-fake', latency=0), RegisteredFake)
+        with pytest.raises(ValueError):
+            create_provider('missing')
+    finally:
+        PROVIDERS.pop('test-fake')
+
+def test_domain_of():
+    assert domain_of(" https://WWW.Example.com:8080/x ") == "example.com"
+    assert domain_of("not a url") == ""
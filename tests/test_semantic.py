@@ -0,0 +1,50 @@
+import pytest
+from services.semantic import SemanticIndex, key_terms
+
+STORED = [
+    "causes of World War I",
+    "python 3.11 new features",
+    "Bitcoin price 2023",
+    "how does fusion power work",
+    "history of the printing press"
+]
+
+@pytest.fixture
+def index(tmp_path):
+    index = SemanticIndex(str(tmp_path / 'semantic.db'))
+    for topic in STORED:
+        index.add(topic, 'brief', 'openai', {'result': topic})
+    return index
+
+def test_reworded_topic_matches(index):
+    match = index.search("fusion power explained", 'brief', 'openai', 0.9)
+    assert match.topic == "how does fusion power work"
+    assert match.payload == {'result': "how does fusion power work"}
+
+@pytest.mark.parametrize('topic', [
+    "causes of World War II",
+    "python 3.12 new features",
+    "Bitcoin price 2024",
+    "third printing press"
+])
+def test_topics_differing_in_numbers_never_match(index, topic):
+    # Close enough on wording alone to seed from (or even answer with) the stored topic
+    assert index.search(topic, 'brief', 'openai', 0.0) is None
+
+def test_matches_need_the_same_depth_and_provider(index):
+    assert index.search("fusion power explained", 'detailed', 'openai', 0.5) is None
+    assert index.search("fusion power explained", 'brief', 'anthropic', 0.5) is None
+
+def test_key_terms():
+    assert key_terms("causes of World War I") == {'i'}
+    assert key_terms("World War I causes") == {'i'}
+    assert key_terms("what can I do about inflation") == frozenset()
+    assert key_terms("Python 3.12 in 2024") == {'3', '12', '2024'}
+    assert key_terms("the second Punic war") == {'second'}
+
+def test_replaced_and_stale_entries_are_compacted(index):
+    index.add("causes of World War I", 'brief', 'openai', {'result': 'newer'})
+    assert index.search("causes of world war i", 'brief', 'openai', 0.9).payload == {'result': 'newer'}
+    index.max_age = 0
+    assert index.compact() == len(STORED)
+    assert index.stats()['entries'] == 0
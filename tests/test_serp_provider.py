@@ -0,0 +1,36 @@
+import asyncio
+import traceback
+import httpx
+import pytest
+import requests
+from services.search.serp_provider import SerpSearchProvider
+
+KEY = 'secret-serpapi-key'
+
+class RefusingSession:
+    def get(self, url, params=None, timeout=None):
+        request = requests.Request('GET', url, params=params).prepare()
+        raise requests.ConnectionError(f"Max retries exceeded with url: {request.url}", request=request)
+
+def refuse(request):
+    raise httpx.ConnectError(f"Connection refused: {request.url}", request=request)
+
+def failing(status):
+    return lambda request: httpx.Response(status, request=request)
+
+def test_connection_errors_do_not_carry_the_key():
+    provider = SerpSearchProvider(KEY, session=RefusingSession())
+    with pytest.raises(requests.ConnectionError) as caught:
+        provider.search("fusion")
+    # Not in the message, nor in a logged traceback through the original error
+    assert KEY not in ''.join(traceback.format_exception(caught.value))
+
+@pytest.mark.parametrize('handler, error', [(refuse, httpx.ConnectError), (failing(500), httpx.HTTPStatusError)])
+def test_async_errors_do_not_carry_the_key(handler, error):
+    async def search():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await SerpSearchProvider(KEY, async_client=client).asearch("fusion")
+
+    with pytest.raises(error) as caught:
+        asyncio.run(search())
+    assert KEY not in ''.join(traceback.format_exception(caught.value))
@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import time
+
+from services.cache import SQLiteCache
+from services.logging import ResearchLogger, SQLiteSessionStore
+
+def run_research(path, session_id, steps, delay, close):
+    """Runs in another process: log a research session the way a worker does."""
+    research_logger = ResearchLogger(reaper_interval=0, store=SQLiteSessionStore(path))
+    for step in steps:
+        time.sleep(delay)
+        research_logger.log_step(session_id, step, {'pid': multiprocessing.current_process().pid})
+    if close:
+        research_logger.close_session(session_id)
+
+def fill_cache(path, prefix, count):
+    """Runs in another process: write entries to a shared cache file."""
+    cache = SQLiteCache(path)
+    for n in range(count):
+        cache.set(f"{prefix}{n}", {'value': n})
+
+def start(target, *args):
+    process = multiprocessing.get_context('spawn').Process(target=target, args=args)
+    process.start()
+    return process
+
+def follow(research_logger, session_id, timeout=20):
+    """Read a session the way /stream does: wait after the last id until it is finished."""
+    cursor, events = 0, []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        logs, finished = research_logger.wait_for_logs(session_id, after_id=cursor, timeout=1)
+        for log in logs:
+            cursor = log['id']
+            events.append(log)
+        if finished:
+            return events
+    raise AssertionError(f"Stream did not finish; got {len(events)} events")
+
+def test_stream_follows_a_session_logged_by_another_process(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    reader = ResearchLogger(reaper_interval=0, store=SQLiteSessionStore(path, poll_interval=0.01))
+    reader.create_session('s1')
+    steps = ['research_started', 'search_completed', 'analysis_completed', 'research_completed']
+    writer = start(run_research, path, 's1', steps, 0.05, True)
+    events = follow(reader, 's1')
+    writer.join(10)
+    assert [event['step'] for event in events] == steps
+    assert [event['id'] for event in events] == [1, 2, 3, 4]
+    assert {event['details']['pid'] for event in events} == {writer.pid}
+
+def test_async_stream_follows_another_process(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    reader = ResearchLogger(reaper_interval=0, store=SQLiteSessionStore(path, poll_interval=0.01))
+    reader.create_session('s1')
+
+    async def main():
+        writer = start(run_research, path, 's1', ['research_started', 'research_completed'], 0.05, True)
+        cursor, steps = 0, []
+        while True:
+            logs, finished = await reader.await_logs('s1', after_id=cursor, timeout=10)
+            cursor = logs[-1]['id'] if logs else cursor
+            steps += [log['step'] for log in logs]
+            if finished:
+                break
+        await asyncio.to_thread(writer.join, 10)
+        return steps
+
+    assert asyncio.run(main()) == ['research_started', 'research_completed']
+
+def test_concurrent_writers_get_unique_ordered_event_ids(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    reader = ResearchLogger(reaper_interval=0, store=SQLiteSessionStore(path, poll_interval=0.01))
+    reader.create_session('s1')
+    writers = [start(run_research, path, 's1', [f"w{i}-{n}" for n in range(20)], 0, False) for i in range(3)]
+    for writer in writers:
+        writer.join(20)
+        assert writer.exitcode == 0
+    reader.close_session('s1')
+    events = follow(reader, 's1')
+    assert [event['id'] for event in events] == list(range(1, 61))
+    # Each writer's events keep their own order
+    for i in range(3):
+        assert [event['step'] for event in events if event['step'].startswith(f"w{i}-")] == \
+            [f"w{i}-{n}" for n in range(20)]
+
+def test_cache_entries_and_totals_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SQLiteCache(path)
+    writers = [start(fill_cache, path, prefix, 50) for prefix in ('a', 'b')]
+    for writer in writers:
+        writer.join(20)
+        assert writer.exitcode == 0
+    assert cache.get('a49') == {'value': 49} and cache.get('b0') == {'value': 0}
+    entries, size = cache._conn.execute("SELECT COUNT(*), SUM(size) FROM cache").fetchone()
+    stats = cache.stats()
+    assert entries == 100
+    assert (stats['entries'], stats['bytes']) == (entries, size)
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from services.throttling import AsyncSingleFlight, SingleFlight, TokenBucket, call_with_backoff, retry_after_seconds
+
+class RateLimited(Exception):
+    """Stands in for an HTTP error raised by requests, httpx or a provider SDK."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type('Response', (), {'headers': {'Retry-After': retry_after} if retry_after else {}})()
+
+def test_single_flight_runs_concurrent_calls_once():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, 'key', work)
+        started.wait(5)
+        followers = [executor.submit(flight.do, 'key', work) for _ in range(3)]
+        while flight.stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        assert leader.result() == ('result', False)
+        assert [follower.result() for follower in followers] == [('result', True)] * 3
+
+    assert len(calls) == 1
+    assert flight.stats() == {'executions': 1, 'coalesced': 3, 'in_flight': 0}
+
+def test_single_flight_shares_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, 'key', fail)
+        started.wait(5)
+        follower = executor.submit(flight.do, 'key', fail)
+        while flight.stats()['coalesced'] < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="upstream down"):
+                future.result()
+
+    # A failed call is not remembered; the next caller runs again
+    assert flight.do('key', lambda: 'recovered') == ('recovered', False)
+
+def test_async_single_flight_runs_concurrent_calls_once():
+    flight = AsyncSingleFlight()
+    calls = []
+    joined = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def main():
+        return await asyncio.gather(*(flight.do('key', work, on_join=lambda: joined.append(1)) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert results == [('result', False)] + [('result', True)] * 3
+    assert len(calls) == 1
+    assert len(joined) == 3
+    assert flight.stats()['in_flight'] == 0
+
+def test_async_single_flight_cancelled_follower_does_not_cancel_the_call():
+    flight = AsyncSingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def main():
+        leader = asyncio.create_task(flight.do('key', work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do('key', work))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == ('result', False)
+
+def test_token_bucket_throttles_past_its_burst():
+    bucket = TokenBucket('upstream', rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.08 <= elapsed < 0.5
+    stats = bucket.stats()
+    assert stats['acquired'] == 4
+    assert stats['throttled'] == 2
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(RateLimited(429, '3')) == 3.0
+    assert retry_after_seconds(RateLimited(503)) == 0.0
+    assert retry_after_seconds(RateLimited(500)) is None
+    assert retry_after_seconds(ValueError("not http")) is None
+
+def test_call_with_backoff_retries_rate_limits_only():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimited(429, '0.01')
+        return 'ok'
+
+    assert call_with_backoff(None, flaky) == 'ok'
+    assert len(attempts) == 3
+
+    def broken():
+        attempts.append(1)
+        raise RateLimited(500)
+
+    attempts.clear()
+    with pytest.raises(RateLimited):
+        call_with_backoff(None, broken)
+    assert len(attempts) == 1